@@ -1,9 +1,16 @@
 #!/usr/bin/env python3
-import json, os, time, threading, socket, subprocess, math, shutil, re, urllib.request, urllib.error, hashlib, struct, sqlite3
+import json, os, time, threading, socket, subprocess, math, bisect, shutil, re, urllib.request, urllib.error, hashlib, struct, sqlite3, signal, multiprocessing, csv, io, sys, base64, zlib, heapq
+from multiprocessing import shared_memory
 from pathlib import Path
 import serial
 from typing import Any, Dict, Optional, Set, List, Tuple
-from collections import deque
+from collections import deque, OrderedDict
+from concurrent.futures import Future, TimeoutError as FuturesTimeoutError
+from array import array
+try:
+    import numpy as np
+except Exception:  # see requirements.txt: the RID Kalman bank falls back to plain Python without it
+    np = None
 
 from flask import send_from_directory, send_file, Flask, jsonify, request, Response
 from flask_sock import Sock
@@ -16,6 +23,7 @@ UI_SETTINGS_FILE = os.path.join(STATE_DIR, "ui_settings.json")
 AUDIO_SETTINGS_FILE = os.path.join(STATE_DIR, "audio_settings.json")
 MAPS_SETTINGS_FILE = os.path.join(STATE_DIR, "maps_settings.json")
 ALERTS_SETTINGS_FILE = os.path.join(STATE_DIR, "alerts_settings.json")
+RF_CFAR_SETTINGS_FILE = os.path.join(STATE_DIR, "rf_cfar_settings.json")
 try:
     AUDIO_ALSA_CARD = int(os.environ.get("NDEFENDER_AUDIO_CARD", "2") or 2)
 except Exception:
@@ -154,6 +162,10 @@ sock = Sock(app)
 
 _ws_clients_lock = threading.Lock()
 _ws_clients: Set[Any] = set()
+# Legacy /ws consumers expect full contact records, not v1 deltas; the full RID record is
+# rebuilt from the event stream while at least one of them is connected.
+_ws_legacy_clients: Set[Any] = set()
+_ws_legacy_contacts: Dict[str, Dict[str, Any]] = {}
 _stop = threading.Event()
 
 # Global tracker ref for WS snapshots
@@ -162,6 +174,7 @@ _TRACKER = None
 # UNKNOWN_RF contacts (RF Sensor)
 _ANTS_LOCK = threading.Lock()
 UNKNOWN_RF_CONTACTS: Dict[str, Dict[str, Any]] = {}
+_RF_CKPT_DIRTY: Set[str] = set()  # changed since the last warm checkpoint (guarded by _ANTS_LOCK)
 _RF_SENSOR_LOCK = threading.Lock()
 RF_SENSOR_STATE = {
     "last_response_ts": None,
@@ -193,11 +206,7 @@ _ctrl_lock = threading.Lock()
 CTRL_STATE = {"status": "DISCONNECTED", "rssi_dbm": None, "uptime_seconds": None, "last_ts": None}
 FPV_STATE   = {"scan_state": "idle", "locked_channels": [], "selected": None, "freq_hz": None, "rssi_raw": None, "vrx": []}
 # ---- END Controller telemetry ----
-_ctrl_ser = None
-_ctrl_ser_lock = threading.Lock()
 
-_pending_lock = threading.Lock()
-_pending_cmd = {}  # req_id -> {"ev": threading.Event(), "resp": dict|None}
 
 
 
@@ -213,6 +222,234 @@ def atomic_write_json(path: str, obj: Dict[str, Any]) -> None:
         os.fsync(f.fileno())
     os.replace(tmp, path)
 
+# ---- Rolling rate counters ----
+class RollingCounter:
+    """
+    Event counter over the last `span` seconds: one bucket per monotonic second, reused in a ring.
+    hit() is O(1); reads touch at most `span` buckets and never allocate per event.
+    The default span keeps 60 completed seconds plus the one currently filling.
+    """
+    __slots__ = ("span", "_counts", "_secs", "_lock", "total")
+
+    def __init__(self, span: int = 61):
+        self.span = int(span)
+        self._counts = array("Q", bytes(8 * self.span))
+        self._secs = array("q", [-1] * self.span)
+        self._lock = threading.Lock()
+        self.total = 0
+
+    def hit(self, n: int = 1) -> None:
+        sec = int(time.monotonic())
+        i = sec % self.span
+        with self._lock:
+            if self._secs[i] != sec:
+                self._secs[i] = sec
+                self._counts[i] = 0
+            self._counts[i] += n
+            self.total += n
+
+    def count(self, window: int, include_current: bool = True) -> int:
+        # events in the last `window` seconds (optionally excluding the partial current second)
+        sec = int(time.monotonic())
+        hi = sec if include_current else sec - 1
+        lo = hi - min(int(window), self.span)
+        n = 0
+        for i in range(self.span):
+            s = self._secs[i]
+            if lo < s <= hi:
+                n += self._counts[i]
+        return n
+
+    def rate(self, window: int) -> float:
+        # per-second rate over completed seconds only, so the 1 s figure doesn't sag mid-second
+        window = max(1, min(int(window), self.span - 1))
+        sec = int(time.monotonic())
+        lo = sec - 1 - window
+        n = 0
+        for i in range(self.span):
+            s = self._secs[i]
+            if lo < s < sec:
+                n += self._counts[i]
+        return round(n / float(window), 2)
+
+    def rates(self) -> Dict[str, Any]:
+        return {"1s": self.rate(1), "10s": self.rate(10), "60s": self.rate(60), "total": self.total}
+
+_RATE_RF_EVENTS = RollingCounter()
+_RATE_CTRL_TELEMETRY = RollingCounter()
+_RATE_WS_SEND = RollingCounter()
+
+def rate_counters_snapshot(tracker: Optional["ContactTracker"] = None) -> Dict[str, Any]:
+    return {
+        "rid_msgs": tracker.msg_rate.rates() if tracker is not None else RollingCounter().rates(),
+        "rf_events": _RATE_RF_EVENTS.rates(),
+        "ctrl_telemetry": _RATE_CTRL_TELEMETRY.rates(),
+        "ctrl_telemetry_sent": _RATE_TELEMETRY_SENT.rates(),
+        "ws_send": _RATE_WS_SEND.rates(),
+    }
+
+# ---- Metric time series ----
+TIMESERIES_POINTS = int(os.environ.get("NDEFENDER_TIMESERIES_POINTS") or "3600")
+TIMESERIES_MAX_SERIES = int(os.environ.get("NDEFENDER_TIMESERIES_MAX_SERIES") or "256")
+TIMESERIES_MIN_INTERVAL_MS = int(os.environ.get("NDEFENDER_TIMESERIES_MIN_INTERVAL_MS") or "1000")
+TIMESERIES_SAMPLE_S = float(os.environ.get("NDEFENDER_TIMESERIES_SAMPLE_S") or "1.0")
+TIMESERIES_DEFAULT_POINTS = 800  # kiosk width
+TIMESERIES_MAX_POINTS = 5000
+
+class SeriesRing:
+    """
+    Fixed-capacity (ts ms, value) history in typed arrays, grown on demand up to cap and then
+    used as a ring. Like TrackRing, the newest sample floats until it lies min_interval_ms past
+    the one before it. Timestamps never step backwards, so windows can be found by bisection.
+    """
+    __slots__ = ("cap", "min_interval_ms", "_ts", "_v", "_head", "_n")
+
+    def __init__(self, cap: int = TIMESERIES_POINTS, min_interval_ms: int = TIMESERIES_MIN_INTERVAL_MS):
+        self.cap = max(2, int(cap))
+        self.min_interval_ms = int(min_interval_ms)
+        self._ts = array("q")
+        self._v = array("d")
+        self._head = 0
+        self._n = 0
+
+    def __len__(self) -> int:
+        return self._n
+
+    def _idx(self, k: int) -> int:
+        return (self._head + k) % self.cap
+
+    def last_ts(self) -> int:
+        return self._ts[self._idx(self._n - 1)] if self._n else 0
+
+    def append(self, ts: int, v: float) -> None:
+        n = self._n
+        if n:
+            ts = max(ts, self._ts[self._idx(n - 1)])
+        if n >= 2 and self._ts[self._idx(n - 1)] - self._ts[self._idx(n - 2)] < self.min_interval_ms:
+            i = self._idx(n - 1)
+        elif n < self.cap:
+            self._ts.append(ts)
+            self._v.append(v)
+            self._n = n + 1
+            return
+        else:
+            i = self._head
+            self._head = (i + 1) % self.cap
+        self._ts[i] = ts
+        self._v[i] = v
+
+    def _bisect(self, ts: int, right: bool) -> int:
+        # first logical index whose ts is >= ts (> ts when right)
+        lo, hi = 0, self._n
+        while lo < hi:
+            mid = (lo + hi) // 2
+            t = self._ts[self._idx(mid)]
+            if t < ts or (right and t == ts):
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def window(self, t0: Optional[int], t1: Optional[int]) -> Tuple[List[int], List[float]]:
+        # oldest first, t0 <= ts <= t1
+        a = 0 if t0 is None else self._bisect(t0, False)
+        b = self._n if t1 is None else self._bisect(t1, True)
+        if a >= b:
+            return [], []
+        i, j = self._idx(a), self._idx(b - 1)
+        if i <= j:
+            return self._ts[i:j + 1].tolist(), self._v[i:j + 1].tolist()
+        return (self._ts[i:] + self._ts[:j + 1]).tolist(), (self._v[i:] + self._v[:j + 1]).tolist()
+
+def lttb(ts: List[int], vs: List[float], threshold: int) -> List[Tuple[int, float]]:
+    """
+    Largest-Triangle-Three-Buckets: keep the first and last samples and, from each of the
+    threshold - 2 buckets between them, the sample forming the largest triangle with the
+    previously kept sample and the average of the next bucket. Peaks survive; flat runs don't.
+    """
+    n = len(ts)
+    if threshold >= n or threshold < 3:
+        return list(zip(ts, vs))
+    every = (n - 2) / (threshold - 2)
+    out = [(ts[0], vs[0])]
+    a = 0
+    for i in range(threshold - 2):
+        lo = int(i * every) + 1
+        hi = int((i + 1) * every) + 1
+        nlo, nhi = hi, min(int((i + 2) * every) + 1, n)
+        cnt = nhi - nlo
+        avg_x = sum(ts[nlo:nhi]) / cnt
+        avg_y = sum(vs[nlo:nhi]) / cnt
+        ax, ay = ts[a], vs[a]
+        dx, dy = ax - avg_x, avg_y - ay
+        best = -1.0
+        best_k = lo
+        for k in range(lo, hi):
+            area = abs(dx * (vs[k] - ay) - (ax - ts[k]) * dy)
+            if area > best:
+                best = area
+                best_k = k
+        out.append((ts[best_k], vs[best_k]))
+        a = best_k
+    out.append((ts[n - 1], vs[n - 1]))
+    return out
+
+class TimeSeriesStore:
+    """
+    Named SeriesRings behind one lock, kept in last-recorded order. Series are created on first
+    record(); past max_series the one that went quiet longest is evicted in O(1), so per-contact
+    series don't grow without bound.
+    """
+    def __init__(self, cap: int = TIMESERIES_POINTS, min_interval_ms: int = TIMESERIES_MIN_INTERVAL_MS,
+                 max_series: int = TIMESERIES_MAX_SERIES):
+        self.cap = cap
+        self.min_interval_ms = min_interval_ms
+        self.max_series = max(1, int(max_series))
+        self._series: "OrderedDict[str, SeriesRing]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.evicted = 0
+
+    def record(self, name: str, value: Any, ts: Optional[int] = None) -> None:
+        v = _float(value)
+        if v is None or not math.isfinite(v):
+            return
+        t = int(time.time() * 1000) if ts is None else int(ts)
+        with self._lock:
+            ring = self._series.get(name)
+            if ring is None:
+                if len(self._series) >= self.max_series:
+                    self._series.popitem(last=False)
+                    self.evicted += 1
+                ring = self._series[name] = SeriesRing(self.cap, self.min_interval_ms)
+            else:
+                self._series.move_to_end(name)
+            ring.append(t, v)
+
+    def names(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return sorted(({"name": k, "points": len(r), "last_ts": r.last_ts()} for k, r in self._series.items()),
+                          key=lambda x: x["name"])
+
+    def query(self, names: List[str], t0: Optional[int], t1: Optional[int], points: int) -> Dict[str, Any]:
+        out: Dict[str, Any] = {}
+        missing: List[str] = []
+        for name in names:
+            with self._lock:
+                ring = self._series.get(name)
+                win = ring.window(t0, t1) if ring is not None else None
+            if win is None:
+                missing.append(name)
+                continue
+            ts, vs = win
+            out[name] = {"total": len(ts), "points": [[t, round(v, 3)] for t, v in lttb(ts, vs, points)]}
+        return {"series": out, "missing": missing}
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"series": len(self._series), "max_series": self.max_series, "cap": self.cap,
+                    "points": sum(len(r) for r in self._series.values()), "evicted": self.evicted}
+
+_TIMESERIES = TimeSeriesStore()
 
 
 def safe_load(path: str, default: Dict[str, Any]) -> Dict[str, Any]:
@@ -237,6 +474,13 @@ DEFAULT_MAPS_SETTINGS = {
 DEFAULT_ALERTS_SETTINGS = {
     "preset": "Balanced",
 }
+DEFAULT_RF_CFAR_SETTINGS = {
+    "guard_bins": 4,
+    "train_bins": 16,
+    "pfa": 1e-6,
+    "min_snr_db": 6.0,
+    "max_detections": 64,
+}
 
 def load_settings(path: str, default: Dict[str, Any]) -> Dict[str, Any]:
     data = safe_load(path, default)
@@ -1391,16 +1635,70 @@ def ws_broadcast(obj: Dict[str, Any]) -> None:
         env = {"type": et, "timestamp": ts, "source": obj.get("source") or "backend", "data": data}
 
     payload = json.dumps(env, separators=(",", ":"), ensure_ascii=False)
+    if _PROC_ROLE == "core":
+        _core_emit(payload)
+        return
+    _ws_fanout(payload)
 
+def _ws_fanout(payload: str) -> None:
     dead: List[Any] = []
+    sent = 0
     with _ws_clients_lock:
         for ws in list(_ws_clients):
             try:
                 ws.send(payload)
+                sent += 1
             except Exception:
                 dead.append(ws)
         for ws in dead:
             _ws_clients.discard(ws)
+        if _ws_legacy_clients:
+            legacy = _ws_legacy_payload(payload)
+            dead = []
+            for ws in list(_ws_legacy_clients):
+                try:
+                    ws.send(legacy)
+                    sent += 1
+                except Exception:
+                    dead.append(ws)
+            for ws in dead:
+                _ws_legacy_clients.discard(ws)
+            if not _ws_legacy_clients:
+                _ws_legacy_contacts.clear()
+    if sent:
+        _RATE_WS_SEND.hit(sent)
+
+def _ws_legacy_payload(payload: str) -> str:
+    # Caller holds _ws_clients_lock. Only RID contact events are touched; everything else passes through.
+    if '"CONTACT_' not in payload:
+        return payload
+    try:
+        env = json.loads(payload)
+        c = (env.get("data") or {}).get("contact")
+    except Exception:
+        return payload
+    et = env.get("type")
+    if et == "CONTACT_LOST":
+        cid = (env.get("data") or {}).get("id")
+        if cid is not None:
+            _ws_legacy_contacts.pop(cid, None)
+        return payload
+    if not isinstance(c, dict) or c.get("type") != "REMOTE_ID" or c.get("id") is None or env.get("source") == "fusion":
+        return payload
+    if not c.get("delta"):
+        _ws_legacy_contacts[c["id"]] = c
+        return payload
+    base = _ws_legacy_contacts.get(c["id"])
+    if base is None:
+        return payload  # joined mid-stream before its snapshot was seeded; next full record fixes it
+    full = dict(base)
+    full.update(c)
+    full.pop("delta", None)
+    if not c.get("predicted"):
+        full.pop("predicted", None)
+        _ws_legacy_contacts[c["id"]] = full
+    env["data"] = dict(env["data"], contact=full)
+    return json.dumps(env, separators=(",", ":"), ensure_ascii=False)
 
 
 def _float(v: Any) -> Optional[float]:
@@ -1508,6 +1806,11 @@ def remoteid_status_snapshot(tracker: Optional["ContactTracker"] = None) -> Dict
         except Exception:
             stats = {"targets": 0, "msgs_60s": 0}
 
+    flood = stats.get("flood") or {"state": "normal"}
+    if flood.get("state") == "flood_detected" and status == "ok":
+        status = "degraded"
+        health_state = "DEGRADED"
+
     return {
         "status": status,
         "mode": REMOTEID_MODE,
@@ -1521,9 +1824,800 @@ def remoteid_status_snapshot(tracker: Optional["ContactTracker"] = None) -> Dict
         "source": source,
         "contacts": stats.get("targets", 0),
         "decode_rate_60s": stats.get("msgs_60s", 0),
+        "flood_state": flood.get("state"),
+        "flood": flood,
+        "ttl": stats.get("ttl"),
+        "churn": stats.get("churn"),
     }
 
-def _antsdr_contact_from_event(obj: Dict[str, Any]) -> Optional[Tuple[str, Dict[str, Any], int]]:
+class ExpiryWheel:
+    """
+    Hashed timer wheel of time.monotonic() deadlines.
+    schedule() is O(1); pop_expired() costs O(ticks elapsed + expired keys), not O(keys).
+    Deadlines further out than one rotation stay in their slot and are re-checked next lap.
+    Not thread-safe: callers hold their own lock.
+    """
+    def __init__(self, tick_s: float = 0.25, slots: int = 512):
+        self.tick_s = float(tick_s)
+        self.nslots = int(slots)
+        self._slots: List[Set[str]] = [set() for _ in range(self.nslots)]
+        self._deadline: Dict[str, float] = {}
+        self._slot_of: Dict[str, int] = {}
+        self._cursor = int(time.monotonic() / self.tick_s)
+
+    def __len__(self) -> int:
+        return len(self._deadline)
+
+    def schedule(self, key: str, deadline: float) -> None:
+        tick = max(int(math.ceil(deadline / self.tick_s)), self._cursor + 1)
+        idx = tick % self.nslots
+        old = self._slot_of.get(key)
+        if old is not None and old != idx:
+            self._slots[old].discard(key)
+        self._slots[idx].add(key)
+        self._slot_of[key] = idx
+        self._deadline[key] = deadline
+
+    def cancel(self, key: str) -> None:
+        idx = self._slot_of.pop(key, None)
+        if idx is not None:
+            self._slots[idx].discard(key)
+        self._deadline.pop(key, None)
+
+    def deadline(self, key: str) -> Optional[float]:
+        return self._deadline.get(key)
+
+    def pop_expired(self, now: Optional[float] = None) -> List[str]:
+        t = time.monotonic() if now is None else now
+        now_tick = int(t / self.tick_s)
+        if now_tick <= self._cursor:
+            return []
+        expired: List[str] = []
+        first = max(self._cursor + 1, now_tick - self.nslots + 1)
+        for tick in range(first, now_tick + 1):
+            slot = self._slots[tick % self.nslots]
+            if not slot:
+                continue
+            for key in [k for k in slot if self._deadline[k] <= t]:
+                slot.discard(key)
+                del self._slot_of[key]
+                del self._deadline[key]
+                expired.append(key)
+        self._cursor = now_tick
+        return expired
+
+# ---- Adaptive contact TTL ----
+ADAPTIVE_TTL = (os.environ.get("NDEFENDER_ADAPTIVE_TTL") or "1").strip().lower() in ("1", "true", "yes", "on")
+TTL_EWMA_ALPHA = float(os.environ.get("NDEFENDER_TTL_EWMA_ALPHA") or "0.25")
+TTL_MISSES = float(os.environ.get("NDEFENDER_TTL_MISSES") or "3")  # expected intervals a contact may miss
+TTL_BURST_GAP_S = 0.05  # arrivals closer than this are one transmission burst (RID sends several msg types at once)
+RID_TTL_MIN_S = float(os.environ.get("NDEFENDER_RID_TTL_MIN_S") or "3")
+RID_TTL_MAX_S = float(os.environ.get("NDEFENDER_RID_TTL_MAX_S") or "60")
+RF_TTL_MIN_MS = int(os.environ.get("NDEFENDER_RF_TTL_MIN_MS") or "2000")
+RF_TTL_MAX_MS = int(os.environ.get("NDEFENDER_RF_TTL_MAX_MS") or "30000")
+CHURN_WINDOW_S = float(os.environ.get("NDEFENDER_CHURN_WINDOW_S") or "30")
+
+class CadenceTtl:
+    """
+    Per-key TTL from an EWMA of message inter-arrival time and its mean deviation (the TCP RTO
+    estimator): ttl = misses * mean + 4 * dev, clamped to [min_s, max_s]. Keys with fewer than
+    two intervals, or all keys when disabled, get default_s. Not thread-safe: callers hold their own lock.
+    """
+    __slots__ = ("default_s", "min_s", "max_s", "enabled", "_state")
+
+    def __init__(self, default_s: float, min_s: float, max_s: float, enabled: bool = ADAPTIVE_TTL):
+        self.default_s = float(default_s)
+        self.min_s = float(min_s)
+        self.max_s = max(self.min_s, float(max_s))
+        self.enabled = bool(enabled)
+        self._state: Dict[str, List[float]] = {}  # key -> [last_t, mean, dev, intervals]
+
+    def __len__(self) -> int:
+        return len(self._state)
+
+    def observe(self, key: str, t: float) -> float:
+        st = self._state.get(key)
+        if st is None:
+            self._state[key] = [t, 0.0, 0.0, 0]
+            return self.default_s
+        dt = t - st[0]
+        if dt >= TTL_BURST_GAP_S:
+            st[0] = t
+            if st[3] == 0:
+                st[1], st[2] = dt, dt / 2.0
+            else:
+                err = dt - st[1]
+                st[1] += TTL_EWMA_ALPHA * err
+                st[2] += TTL_EWMA_ALPHA * (abs(err) - st[2])
+            st[3] += 1
+        return self._ttl(st)
+
+    def _ttl(self, st: List[float]) -> float:
+        if not self.enabled or st[3] < 2:
+            return self.default_s
+        return min(self.max_s, max(self.min_s, TTL_MISSES * st[1] + 4.0 * st[2]))
+
+    def ttl(self, key: str) -> float:
+        st = self._state.get(key)
+        return self.default_s if st is None else self._ttl(st)
+
+    def forget(self, key: str) -> None:
+        self._state.pop(key, None)
+
+    def export(self, key: str) -> Optional[List[float]]:
+        # [mean, dev, intervals] for a checkpoint; seed() puts it back
+        st = self._state.get(key)
+        return None if st is None else st[1:]
+
+    def seed(self, key: str, t: float, learned: Optional[List[float]]) -> float:
+        # re-arm a key last heard at monotonic `t`; returns its TTL
+        if learned and len(learned) == 3:
+            st = self._state[key] = [t, float(learned[0]), float(learned[1]), int(learned[2])]
+        else:
+            st = self._state[key] = [t, 0.0, 0.0, 0]
+        return self._ttl(st)
+
+    def stats(self) -> Dict[str, Any]:
+        ttls = sorted(self._ttl(st) for st in self._state.values() if st[3] >= 2)
+        n = len(ttls)
+        return {
+            "adaptive": self.enabled,
+            "default_s": self.default_s,
+            "min_s": self.min_s,
+            "max_s": self.max_s,
+            "learned": n,
+            "ttl_p10_s": round(ttls[n // 10], 2) if n else None,
+            "ttl_p50_s": round(ttls[n // 2], 2) if n else None,
+            "ttl_p90_s": round(ttls[(n * 9) // 10], 2) if n else None,
+        }
+
+def stale_after_ms(ttl_s: float) -> int:
+    # a contact's learned TTL as published to clients; half-second steps so the EWMA's drift
+    # doesn't turn every message into a changed record
+    return int(round(ttl_s * 2.0)) * 500
+
+class ChurnStats:
+    """NEW/LOST counters plus flaps: a NEW for a key that went LOST less than window_s earlier."""
+    __slots__ = ("window_s", "new", "lost", "flaps", "_recent_lost")
+
+    def __init__(self, window_s: float = CHURN_WINDOW_S):
+        self.window_s = float(window_s)
+        self.new = RollingCounter()
+        self.lost = RollingCounter()
+        self.flaps = RollingCounter()
+        self._recent_lost: "OrderedDict[str, float]" = OrderedDict()  # key -> monotonic LOST time
+
+    def on_new(self, key: str) -> None:
+        self.new.hit()
+        t_lost = self._recent_lost.pop(key, None)
+        if t_lost is not None and time.monotonic() - t_lost < self.window_s:
+            self.flaps.hit()
+
+    def on_lost(self, key: str) -> None:
+        self.lost.hit()
+        t = time.monotonic()
+        rl = self._recent_lost
+        rl[key] = t
+        rl.move_to_end(key)
+        while rl:
+            k, t0 = next(iter(rl.items()))
+            if t - t0 < self.window_s and len(rl) <= 4096:
+                break
+            rl.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        new_60, flaps_60 = self.new.count(60), self.flaps.count(60)
+        return {
+            "window_s": self.window_s,
+            "new_60s": new_60,
+            "lost_60s": self.lost.count(60),
+            "flaps_60s": flaps_60,
+            "flap_ratio_60s": round(flaps_60 / new_60, 3) if new_60 else 0.0,
+            "new_total": self.new.total,
+            "lost_total": self.lost.total,
+            "flaps_total": self.flaps.total,
+        }
+
+# UNKNOWN_RF expiry, cadence and churn (guarded by _ANTS_LOCK)
+_RF_EXPIRY = ExpiryWheel()
+_RF_CADENCE = CadenceTtl(RF_CONTACT_TTL_MS / 1000.0, RF_TTL_MIN_MS / 1000.0, RF_TTL_MAX_MS / 1000.0)
+_RF_CHURN = ChurnStats()
+
+# ---- RF band plan + near-frequency merging ----
+RF_BAND_PLAN_FILE = os.environ.get("NDEFENDER_RF_BAND_PLAN_FILE") or "/opt/ndefender/system/rf_band_plan.json"
+RF_BAND_PLAN_POLL_S = 2.0
+RF_MERGE_TOL_HZ = float(os.environ.get("NDEFENDER_RF_MERGE_TOL_HZ") or "500e3")  # 0 disables merging
+# Same edges as the fusion band labels always used; the JSON plan may refine or extend them.
+# Analog video carriers are ~20 MHz wide, so detections a few MHz apart are one transmitter.
+DEFAULT_RF_BAND_PLAN = [
+    {"label": "433MHz", "lo_hz": 420e6, "hi_hz": 450e6, "family": "control"},
+    {"label": "900MHz", "lo_hz": 860e6, "hi_hz": 930e6, "family": "control"},
+    {"label": "1.2GHz", "lo_hz": 1.08e9, "hi_hz": 1.36e9, "family": "video", "merge_tol_hz": 5e6},
+    {"label": "2.4GHz", "lo_hz": 2.4e9, "hi_hz": 2.5e9, "family": "ism"},
+    {"label": "5GHz", "lo_hz": 5.15e9, "hi_hz": 5.65e9, "family": "wifi"},
+    {"label": "5.8GHz", "lo_hz": 5.65e9, "hi_hz": 5.95e9, "family": "video", "merge_tol_hz": 5e6},
+]
+
+class IntervalTree:
+    """
+    Static interval tree over half-open [lo, hi) intervals. Intervals sorted by lo form an implicit
+    balanced BST (each range's midpoint is its root), augmented with the subtree's max hi, so a
+    stabbing query is O(log n + hits). Never mutated after build: reloads swap in a new tree.
+    """
+    __slots__ = ("_lo", "_hi", "_val", "_max")
+
+    def __init__(self, items: List[Tuple[float, float, Any]]):
+        items = sorted(items, key=lambda it: (it[0], it[1]))
+        self._lo = [float(it[0]) for it in items]
+        self._hi = [float(it[1]) for it in items]
+        self._val = [it[2] for it in items]
+        self._max = list(self._hi)
+        self._build(0, len(items) - 1)
+
+    def __len__(self) -> int:
+        return len(self._lo)
+
+    def _build(self, l: int, r: int) -> float:
+        if l > r:
+            return float("-inf")
+        m = (l + r) // 2
+        mx = max(self._hi[m], self._build(l, m - 1), self._build(m + 1, r))
+        self._max[m] = mx
+        return mx
+
+    def stab(self, x: float) -> List[Any]:
+        out: List[Any] = []
+        stack = [(0, len(self._lo) - 1)]
+        while stack:
+            l, r = stack.pop()
+            if l > r:
+                continue
+            m = (l + r) // 2
+            if self._max[m] <= x:
+                continue  # nothing below this node reaches x
+            stack.append((l, m - 1))
+            if self._lo[m] <= x:
+                if x < self._hi[m]:
+                    out.append(self._val[m])
+                stack.append((m + 1, r))
+        return out
+
+def parse_rf_band_plan(data: Any) -> List[Dict[str, Any]]:
+    # {"bands": [...]} or a bare list; frequencies in Hz like every other contract field
+    bands = data.get("bands") if isinstance(data, dict) else data
+    if not isinstance(bands, list):
+        raise ValueError("expected a list of bands")
+    out: List[Dict[str, Any]] = []
+    for i, b in enumerate(bands):
+        if not isinstance(b, dict):
+            raise ValueError(f"band {i}: not an object")
+        lo, hi = _float(b.get("lo_hz")), _float(b.get("hi_hz"))
+        label = _str(b.get("label"))
+        if lo is None or hi is None or not lo < hi:
+            raise ValueError(f"band {i}: need numeric lo_hz < hi_hz")
+        if not label:
+            raise ValueError(f"band {i}: label required")
+        classes = b.get("bandwidth_classes")
+        if classes is not None and not (isinstance(classes, list) and all(isinstance(c, str) for c in classes)):
+            raise ValueError(f"band {i}: bandwidth_classes must be a list of strings")
+        tol = _float(b.get("merge_tol_hz"))
+        out.append({
+            "label": label,
+            "lo_hz": lo,
+            "hi_hz": hi,
+            "family": _str(b.get("family")) or "unknown",
+            "bandwidth_classes": classes or None,
+            "merge_tol_hz": max(0.0, tol) if tol is not None else None,
+        })
+    return out
+
+class RfBandPlan:
+    """
+    Frequency -> band lookup. Among the bands containing a frequency, one whose bandwidth_classes
+    lists the detection's class wins over an unrestricted band, then the narrowest band wins.
+    """
+    __slots__ = ("bands", "version", "loaded_ts", "source", "_tree")
+
+    def __init__(self, bands: List[Dict[str, Any]], version: int = 0, source: str = "default"):
+        self.bands = bands
+        self.version = int(version)
+        self.loaded_ts = int(time.time() * 1000)  # built at import, before now_ms() exists
+        self.source = source
+        self._tree = IntervalTree([(b["lo_hz"], b["hi_hz"], b) for b in bands])
+
+    def classify(self, freq_hz: Optional[float], bandwidth_class: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        if freq_hz is None or not self._tree:
+            return None
+        best, best_key = None, None
+        for b in self._tree.stab(float(freq_hz)):
+            classes = b["bandwidth_classes"]
+            if classes is not None and bandwidth_class not in classes:
+                continue
+            key = (classes is None, b["hi_hz"] - b["lo_hz"])
+            if best_key is None or key < best_key:
+                best, best_key = b, key
+        return best
+
+    def stats(self) -> Dict[str, Any]:
+        return {"bands": len(self.bands), "version": self.version, "loaded_ts": self.loaded_ts, "source": self.source}
+
+_RF_BAND_PLAN = RfBandPlan(parse_rf_band_plan(DEFAULT_RF_BAND_PLAN))
+_RF_BAND_PLAN_LOAD_LOCK = threading.Lock()
+_RF_BAND_PLAN_MTIME: Optional[float] = None
+
+def load_rf_band_plan(bands: List[Dict[str, Any]], source: str, persist: bool = False) -> Dict[str, Any]:
+    global _RF_BAND_PLAN
+    with _RF_BAND_PLAN_LOAD_LOCK:
+        plan = RfBandPlan(bands, version=_RF_BAND_PLAN.version + 1, source=source)
+        if persist:
+            atomic_write_json(RF_BAND_PLAN_FILE, {"bands": bands})
+        _RF_BAND_PLAN = plan  # readers pick up the new plan on their next lookup; nothing waits
+    return plan.stats()
+
+def _reload_rf_band_plan_file() -> None:
+    global _RF_BAND_PLAN_MTIME
+    try:
+        mtime = os.stat(RF_BAND_PLAN_FILE).st_mtime
+    except FileNotFoundError:
+        return
+    if mtime == _RF_BAND_PLAN_MTIME:
+        return
+    _RF_BAND_PLAN_MTIME = mtime
+    try:
+        with open(RF_BAND_PLAN_FILE, "r", encoding="utf-8") as f:
+            bands = parse_rf_band_plan(json.load(f))
+        stats = load_rf_band_plan(bands, source=RF_BAND_PLAN_FILE)
+        print(f"RF_BAND_PLAN loaded bands={stats['bands']} version={stats['version']}", flush=True)
+    except Exception as e:
+        print(f"RF_BAND_PLAN load failed: {e}", flush=True)  # keep serving the previous plan
+
+def rf_band_plan_worker() -> None:
+    while not _stop.is_set():
+        _reload_rf_band_plan_file()
+        time.sleep(RF_BAND_PLAN_POLL_S)
+
+class RfMergeIndex:
+    """
+    Folds sensor detections that land within a tolerance of a live UNKNOWN_RF contact's centre
+    frequency into that contact. Canonical centres are kept sorted for bisect lookups; each sensor
+    id maps to its canonical contact, which stays alive while any of its sensor ids does.
+    Not thread-safe: callers hold _ANTS_LOCK.
+    """
+    def __init__(self):
+        self._freqs: List[float] = []
+        self._ids: List[str] = []
+        self._center: Dict[str, float] = {}
+        self._alias: Dict[str, str] = {}
+        self._members: Dict[str, Set[str]] = {}
+        self.merged = 0
+
+    def __len__(self) -> int:
+        return len(self._members)
+
+    def attach(self, sid: str, freq_hz: Optional[float], tol_hz: float) -> str:
+        cid = self._alias.get(sid)
+        if cid is None:
+            cid = self._nearest(freq_hz, tol_hz) if freq_hz is not None and tol_hz > 0 else None
+            if cid is None:
+                cid = sid
+            else:
+                self.merged += 1
+            self._alias[sid] = cid
+            self._members.setdefault(cid, set()).add(sid)
+        if freq_hz is not None and (sid == cid or cid not in self._center):
+            self._place(cid, float(freq_hz))  # only the contact's own detections move its centre
+        return cid
+
+    def detach(self, sid: str) -> Optional[str]:
+        # canonical id to drop once its last sensor id is gone; None while others keep it alive
+        cid = self._alias.pop(sid, None)
+        if cid is None:
+            return sid
+        members = self._members.get(cid)
+        if members is not None:
+            members.discard(sid)
+            if members:
+                return None
+        self.drop(cid)
+        return cid
+
+    def drop(self, cid: str) -> None:
+        for sid in self._members.pop(cid, ()):
+            self._alias.pop(sid, None)
+        self._unplace(cid)
+
+    def _nearest(self, f: float, tol_hz: float) -> Optional[str]:
+        i = bisect.bisect_left(self._freqs, f)
+        best, best_d = None, tol_hz
+        for j in (i - 1, i):
+            if 0 <= j < len(self._freqs):
+                d = abs(self._freqs[j] - f)
+                if d <= best_d:
+                    best, best_d = self._ids[j], d
+        return best
+
+    def _place(self, cid: str, f: float) -> None:
+        if self._center.get(cid) == f:
+            return
+        self._unplace(cid)
+        i = bisect.bisect_left(self._freqs, f)
+        self._freqs.insert(i, f)
+        self._ids.insert(i, cid)
+        self._center[cid] = f
+
+    def _unplace(self, cid: str) -> None:
+        f = self._center.pop(cid, None)
+        if f is None:
+            return
+        i = bisect.bisect_left(self._freqs, f)
+        while self._ids[i] != cid:
+            i += 1
+        del self._freqs[i]
+        del self._ids[i]
+
+    def stats(self) -> Dict[str, Any]:
+        return {"contacts": len(self._members), "sensor_ids": len(self._alias), "merged_total": self.merged}
+
+_RF_MERGE = RfMergeIndex()  # guarded by _ANTS_LOCK
+
+# ---- Frequency-hopping emitter clustering ----
+HOP_CLUSTER_ENABLE = (os.environ.get("NDEFENDER_HOP_CLUSTER") or "1").strip().lower() not in ("0", "false", "no", "off")
+HOP_WINDOW_S = float(os.environ.get("NDEFENDER_HOP_WINDOW_S") or "2")
+HOP_MIN_CHANNELS = int(os.environ.get("NDEFENDER_HOP_MIN_CHANNELS") or "5")  # distinct channels in the window
+HOP_SNR_TOL_DB = float(os.environ.get("NDEFENDER_HOP_SNR_TOL_DB") or "6")
+HOP_MAX_DWELL_S = float(os.environ.get("NDEFENDER_HOP_MAX_DWELL_S") or "1")  # longer-lived carriers are not hops
+HOP_CADENCE_MISSES = float(os.environ.get("NDEFENDER_HOP_CADENCE_MISSES") or "4")  # missed hops tolerated
+HOP_CADENCE_MIN_FRAC = 0.25  # a "hop" sooner than this fraction of the interval is a parallel emitter
+HOP_CHANNEL_RES_HZ = 100e3
+HOP_UPDATE_MIN_S = 1.0  # per hopping contact; the hops in between only refresh REST state
+
+class _HopCluster:
+    __slots__ = ("id", "band", "family", "snr", "channels", "hits", "total", "last_emit",
+                 "last_t", "gap_mean", "gap_dev", "gaps")
+
+    def __init__(self, cid: str, band: Dict[str, Any]):
+        self.id = cid
+        self.band = band["label"]
+        self.family = band["family"]
+        self.snr: Optional[float] = None
+        # channel bin -> (last hop time, freq), oldest first; only channels hit within the window
+        self.channels: "OrderedDict[int, Tuple[float, float]]" = OrderedDict()
+        self.hits: deque = deque()  # hop times within the window
+        self.total = 0
+        self.last_emit: Optional[float] = None
+        # hop interval EWMA (mean, mean deviation), like CadenceTtl
+        self.last_t: Optional[float] = None
+        self.gap_mean = 0.0
+        self.gap_dev = 0.0
+        self.gaps = 0
+
+    def fits(self, t: float) -> bool:
+        # on the cluster's rhythm: not a parallel hop far inside its interval, nor after a silence
+        # longer than a few missed hops
+        if self.gaps < 2 or self.last_t is None:
+            return True
+        gap = t - self.last_t
+        lo = HOP_CADENCE_MIN_FRAC * self.gap_mean - 2.0 * self.gap_dev
+        return lo <= gap <= HOP_CADENCE_MISSES * self.gap_mean + 4.0 * self.gap_dev
+
+    def add(self, f: Optional[float], snr: Optional[float], t: float) -> None:
+        if f is not None:
+            b = int(round(f / HOP_CHANNEL_RES_HZ))
+            self.channels[b] = (t, f)
+            self.channels.move_to_end(b)
+        if snr is not None:
+            self.snr = snr if self.snr is None else self.snr + 0.2 * (snr - self.snr)
+        if self.last_t is not None and t > self.last_t:
+            gap = t - self.last_t
+            if self.gaps == 0:
+                self.gap_mean, self.gap_dev = gap, gap / 2.0
+            else:
+                err = gap - self.gap_mean
+                self.gap_mean += 0.2 * err
+                self.gap_dev += 0.2 * (abs(err) - self.gap_dev)
+            self.gaps += 1
+        if self.last_t is None or t > self.last_t:
+            self.last_t = t
+        self.hits.append(t)
+        self.total += 1
+        cutoff = t - HOP_WINDOW_S
+        while self.hits and self.hits[0] < cutoff:
+            self.hits.popleft()
+        # the span follows the channels hit recently, so it shrinks when the emitter moves
+        while len(self.channels) > 1:
+            b, (ct, _) = next(iter(self.channels.items()))
+            if ct >= cutoff:
+                break
+            del self.channels[b]
+
+    def span(self) -> Tuple[Optional[float], Optional[float]]:
+        if not self.channels:
+            return None, None
+        fs = [f for _, f in self.channels.values()]
+        return min(fs), max(fs)
+
+class HopClusterer:
+    """
+    Groups short-lived detections that hop across one band into a single emitter. Per band a
+    sliding window of recent detections is kept; once HOP_MIN_CHANNELS distinct channels with
+    SNRs within HOP_SNR_TOL_DB turn up inside HOP_WINDOW_S, they form a cluster, and later
+    detections in that band and SNR range are absorbed into it if they also land on the
+    cluster's hop cadence (see _HopCluster.fits). A detection without an SNR never matches.
+    The reported span covers the channels hit within HOP_WINDOW_S. A sensor id reporting
+    continuously (no LOST, no gap over HOP_MAX_DWELL_S) for longer than HOP_MAX_DWELL_S is a
+    stationary carrier: it is not absorbed, and is released if it was.
+    Detections outside the band plan are left alone. Not thread-safe: callers hold _ANTS_LOCK.
+    """
+    def __init__(self):
+        self._window: Dict[str, deque] = {}  # band -> (t, channel bin, snr, sid, freq)
+        self._seen: "OrderedDict[str, List[float]]" = OrderedDict()  # sid -> [first_t, last_t] of its current run
+        self._absorbed: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()  # sid -> (cluster id, last_t)
+        self.clusters: Dict[str, _HopCluster] = {}
+        self._seq = 0
+        self.formed = 0
+        self.absorbed_total = 0
+        self.suppressed = 0
+
+    def _stationary(self, sid: str, t: float) -> bool:
+        run = self._seen.get(sid)
+        return run is not None and t - run[0] > HOP_MAX_DWELL_S
+
+    def _note(self, sid: str, t: float) -> None:
+        run = self._seen.get(sid)
+        if run is None or t - run[1] > HOP_MAX_DWELL_S:
+            self._seen[sid] = [t, t]  # a gap starts a new run: revisiting a channel is still a hop
+        else:
+            run[1] = t
+        self._seen.move_to_end(sid)
+        cutoff = t - HOP_WINDOW_S
+        while self._seen:
+            k, run = next(iter(self._seen.items()))
+            if run[1] >= cutoff:
+                break
+            self._seen.popitem(last=False)
+        while self._absorbed:
+            k, (cid, t0) = next(iter(self._absorbed.items()))
+            if t0 >= cutoff:
+                break
+            self._absorbed.popitem(last=False)
+
+    def offer(self, sid: str, band: Optional[Dict[str, Any]], f: Optional[float], snr: Optional[float],
+              t: float) -> Tuple[Optional[str], List[str]]:
+        """(cluster id absorbing this detection or None, sensor ids folded in by a newly formed cluster)."""
+        self._note(sid, t)
+        stationary = self._stationary(sid, t)
+        hit = self._absorbed.get(sid)
+        if hit is not None and hit[0] in self.clusters:
+            if not stationary:
+                self._absorbed[sid] = (hit[0], t)
+                self._absorbed.move_to_end(sid)
+                self.clusters[hit[0]].add(f, snr, t)
+                return hit[0], []
+            del self._absorbed[sid]  # outlived any hop dwell: a carrier that happened to match
+        if band is None or stationary or snr is None:
+            return None, []
+        best, best_d = None, None
+        for c in self.clusters.values():
+            if c.band != band["label"] or c.snr is None or not c.fits(t):
+                continue
+            d = abs(snr - c.snr)
+            if d <= HOP_SNR_TOL_DB and (best_d is None or d < best_d):
+                best, best_d = c, d
+        if best is not None:
+            self._absorb(sid, best, t)
+            best.add(f, snr, t)
+            return best.id, []
+        return self._maybe_form(sid, band, f, snr, t)
+
+    def _maybe_form(self, sid: str, band: Dict[str, Any], f: Optional[float], snr: Optional[float],
+                    t: float) -> Tuple[Optional[str], List[str]]:
+        if f is None:
+            return None, []
+        win = self._window.get(band["label"])
+        if win is None:
+            win = self._window[band["label"]] = deque(maxlen=1024)
+        cutoff = t - HOP_WINDOW_S
+        while win and win[0][0] < cutoff:
+            win.popleft()
+        win.append((t, int(round(f / HOP_CHANNEL_RES_HZ)), snr, sid, f))
+        bins: Set[int] = set()
+        members: List[Tuple[float, str, float, float]] = []
+        for wt, b, ws, wsid, wf in win:
+            if abs(ws - snr) > HOP_SNR_TOL_DB or self._stationary(wsid, t):
+                continue
+            bins.add(b)
+            members.append((wt, wsid, wf, ws))
+        if len(bins) < HOP_MIN_CHANNELS:
+            return None, []
+        self._seq += 1
+        self.formed += 1
+        cid = f"rf:hop:{band['label']}:{self._seq}"
+        c = self.clusters[cid] = _HopCluster(cid, band)
+        folded: List[str] = []
+        for wt, wsid, wf, ws in members:
+            c.add(wf, ws, wt)  # in arrival order, so the cluster starts with the window's cadence
+            if wsid not in self._absorbed:
+                self._absorb(wsid, c, t)
+                folded.append(wsid)
+        keep = {m[1] for m in members}
+        self._window[band["label"]] = deque((w for w in win if w[3] not in keep), maxlen=1024)
+        return c.id, folded
+
+    def _absorb(self, sid: str, c: _HopCluster, t: float) -> None:
+        self._absorbed[sid] = (c.id, t)
+        self._absorbed.move_to_end(sid)
+        self.absorbed_total += 1
+
+    def release(self, sid: str) -> bool:
+        # Any LOST ends the sensor id's run. For an absorbed hop it is swallowed: the cluster
+        # lives on its own TTL.
+        self._seen.pop(sid, None)
+        hit = self._absorbed.pop(sid, None)
+        return hit is not None and hit[0] in self.clusters
+
+    def drop(self, cid: str) -> None:
+        self.clusters.pop(cid, None)
+
+    def contact(self, cid: str, ts_ms: int, t: float) -> Tuple[Dict[str, Any], Optional[str]]:
+        """Current contact for a cluster and the WS event to emit now (None while rate-limited)."""
+        c = self.clusters[cid]
+        if c.last_emit is None:
+            mapped: Optional[str] = "CONTACT_NEW"
+        elif t - c.last_emit >= HOP_UPDATE_MIN_S:
+            mapped = "CONTACT_UPDATE"
+        else:
+            mapped = None
+        if mapped is not None:
+            c.last_emit = t
+        lo, hi = c.span()
+        span = lo is not None
+        return {
+            "id": cid,
+            "type": "UNKNOWN_RF",
+            "last_seen_ts": ts_ms,
+            "unknown_rf": {
+                "center_hz": int((lo + hi) / 2) if span else None,
+                "snr_db": round(c.snr, 1) if c.snr is not None else None,
+                "peak_db": None,
+                "bandwidth_class": "hopping",
+                "family_hint": "fhss",
+                "band": c.band,
+                "band_family": c.family,
+                "hopping": True,
+                "hop_lo_hz": int(lo) if span else None,
+                "hop_hi_hz": int(hi) if span else None,
+                "hop_channels": len(c.channels),
+                "hop_rate_hz": round(len(c.hits) / HOP_WINDOW_S, 1),
+                "hop_interval_ms": round(c.gap_mean * 1000.0, 1) if c.gaps else None,
+                "hop_count": c.total,
+            },
+        }, mapped
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": HOP_CLUSTER_ENABLE,
+            "clusters": len(self.clusters),
+            "formed_total": self.formed,
+            "absorbed_total": self.absorbed_total,
+            "suppressed_total": self.suppressed,
+        }
+
+_HOP = HopClusterer()  # guarded by _ANTS_LOCK
+
+def rf_band_plan_get(freq_hz: Optional[float], bandwidth_class: Optional[str]) -> Dict[str, Any]:
+    plan = _RF_BAND_PLAN
+    out: Dict[str, Any] = dict(plan.stats(), plan=plan.bands)
+    if freq_hz is not None:
+        out["match"] = plan.classify(freq_hz, bandwidth_class)
+    return out
+
+def rf_band_plan_load(bands: List[Dict[str, Any]]) -> Dict[str, Any]:
+    global _RF_BAND_PLAN_MTIME
+    stats = load_rf_band_plan(bands, source=RF_BAND_PLAN_FILE, persist=True)
+    try:
+        _RF_BAND_PLAN_MTIME = os.stat(RF_BAND_PLAN_FILE).st_mtime  # our own write, not an edit to reload
+    except OSError:
+        pass
+    return stats
+
+# ---- RF occupancy heatmap ----
+RF_HEATMAP_MIN_HZ = float(os.environ.get("NDEFENDER_RF_HEATMAP_MIN_HZ") or "300e6")
+RF_HEATMAP_MAX_HZ = float(os.environ.get("NDEFENDER_RF_HEATMAP_MAX_HZ") or "6000e6")
+RF_HEATMAP_BINS = int(os.environ.get("NDEFENDER_RF_HEATMAP_BINS") or "1024")
+RF_HEATMAP_BUCKET_S = int(os.environ.get("NDEFENDER_RF_HEATMAP_BUCKET_S") or "60")
+RF_HEATMAP_BUCKETS = int(os.environ.get("NDEFENDER_RF_HEATMAP_BUCKETS") or "60")
+FPV_CHANNEL_BW_HZ = 20e6  # analog video channel as seen by the receivers
+
+class OccupancyHeatmap:
+    """
+    Hit counts per (time bucket, frequency bin) in one flat uint16 array used as a ring of rows.
+    A row is cleared when its slot is reused for a newer bucket, so memory is fixed and the map
+    always covers the last buckets x bucket_s seconds without keeping or replaying raw events.
+    """
+    def __init__(self, f_min_hz: float, f_max_hz: float, bins: int, bucket_s: int, buckets: int):
+        self.f_min = float(f_min_hz)
+        self.f_max = float(f_max_hz)
+        self.bins = max(1, int(bins))
+        self.bucket_s = max(1, int(bucket_s))
+        self.buckets = max(1, int(buckets))
+        self.bin_hz = (self.f_max - self.f_min) / self.bins
+        self._cells = array("H", bytes(2 * self.bins * self.buckets))
+        self._row_bucket = array("q", [-1] * self.buckets)
+        self._zero_row = array("H", bytes(2 * self.bins))
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.out_of_range = 0
+        self.late = 0
+
+    def _row(self, bucket: int) -> Optional[int]:
+        # offset of the bucket's row, claiming (and clearing) its slot; caller holds the lock
+        i = bucket % self.buckets
+        held = self._row_bucket[i]
+        if held != bucket:
+            if held > bucket:
+                return None  # older than the window
+            self._cells[i * self.bins:(i + 1) * self.bins] = self._zero_row
+            self._row_bucket[i] = bucket
+        return i * self.bins
+
+    def add(self, freq_hz: Optional[float], bandwidth_hz: Optional[float] = None, ts_ms: Optional[int] = None) -> None:
+        if freq_hz is None:
+            return
+        half = 0.5 * bandwidth_hz if bandwidth_hz else 0.0
+        lo = int((freq_hz - half - self.f_min) // self.bin_hz)
+        hi = int((freq_hz + half - self.f_min) // self.bin_hz)
+        if hi < 0 or lo >= self.bins:
+            self.out_of_range += 1
+            return
+        lo, hi = max(lo, 0), min(hi, self.bins - 1)
+        t = int(time.time() * 1000) if ts_ms is None else int(ts_ms)
+        with self._lock:
+            base = self._row(t // 1000 // self.bucket_s)
+            if base is None:
+                self.late += 1
+                return
+            cells = self._cells
+            for k in range(base + lo, base + hi + 1):
+                if cells[k] < 0xFFFF:
+                    cells[k] += 1
+            self.hits += 1
+
+    def snapshot(self, now_ms_: Optional[int] = None) -> Dict[str, Any]:
+        # rows oldest first; buckets with no activity are zero rows
+        t = int(time.time() * 1000) if now_ms_ is None else int(now_ms_)
+        cur = t // 1000 // self.bucket_s
+        first = cur - self.buckets + 1
+        out = array("H")
+        with self._lock:
+            for b in range(first, cur + 1):
+                i = b % self.buckets
+                out.extend(self._cells[i * self.bins:(i + 1) * self.bins] if self._row_bucket[i] == b else self._zero_row)
+        peak = max(out) if out else 0
+        if sys.byteorder == "big":
+            out.byteswap()
+        return {
+            "freq_min_hz": self.f_min,
+            "freq_max_hz": self.f_max,
+            "bins": self.bins,
+            "bin_hz": self.bin_hz,
+            "bucket_s": self.bucket_s,
+            "buckets": self.buckets,
+            "t0_ms": first * self.bucket_s * 1000,
+            "max": peak,
+            "encoding": "u16le+zlib+base64",
+            "data": base64.b64encode(zlib.compress(out.tobytes(), 6)).decode("ascii"),
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        return {"bins": self.bins, "bucket_s": self.bucket_s, "buckets": self.buckets,
+                "hits": self.hits, "out_of_range": self.out_of_range, "late": self.late}
+
+_RF_HEATMAP = OccupancyHeatmap(RF_HEATMAP_MIN_HZ, RF_HEATMAP_MAX_HZ, RF_HEATMAP_BINS, RF_HEATMAP_BUCKET_S, RF_HEATMAP_BUCKETS)
+
+def rf_heatmap_snapshot() -> Dict[str, Any]:
+    return _RF_HEATMAP.snapshot()
+
+def _antsdr_contact_from_event(obj: Dict[str, Any]) -> Optional[Tuple[str, Dict[str, Any], int, Optional[Dict[str, Any]]]]:
     evt = obj.get("type") or obj.get("event")
     if not isinstance(evt, str) or not evt.startswith("RF_CONTACT_"):
         return None
@@ -1549,6 +2643,7 @@ def _antsdr_contact_from_event(obj: Dict[str, Any]) -> Optional[Tuple[str, Dict[
         except Exception:
             ts_ms = now_ms()
 
+    band = _RF_BAND_PLAN.classify(_float(data.get("center_hz")), data.get("bandwidth_class"))
     contact = {
         "id": cid,
         "type": "UNKNOWN_RF",
@@ -1558,34 +2653,93 @@ def _antsdr_contact_from_event(obj: Dict[str, Any]) -> Optional[Tuple[str, Dict[
             "snr_db": data.get("snr_db"),
             "peak_db": data.get("peak_db"),
             "bandwidth_class": data.get("bandwidth_class"),
+            "bandwidth_hz": data.get("bandwidth_hz"),
             "family_hint": data.get("family_hint") or "unknown",
+            "band": band["label"] if band else None,
+            "band_family": band["family"] if band else None,
         },
     }
-    return evt, contact, int(ts_ms)
+    return evt, contact, int(ts_ms), band
 
 def _handle_antsdr_event(obj: Dict[str, Any]) -> None:
     parsed = _antsdr_contact_from_event(obj)
     if not parsed:
         return
-    evt, contact, ts_ms = parsed
+    evt, contact, ts_ms, band = parsed
+    _RATE_RF_EVENTS.hit()
     with _RF_SENSOR_LOCK:
         RF_SENSOR_STATE["last_response_ts"] = int(ts_ms)
         RF_SENSOR_STATE["last_error"] = None
-    mapped = {
-        "RF_CONTACT_NEW": "CONTACT_NEW",
-        "RF_CONTACT_UPDATE": "CONTACT_UPDATE",
-        "RF_CONTACT_LOST": "CONTACT_LOST",
-    }.get(evt)
-    if mapped is None:
+    if evt not in ("RF_CONTACT_NEW", "RF_CONTACT_UPDATE", "RF_CONTACT_LOST"):
         return
 
+    # Hops of a clustered emitter stay here; other sensor ids fold into canonical contacts by
+    # frequency. NEW/UPDATE follow our own state, not the sensor's.
+    sid = contact["id"]
+    rf = contact["unknown_rf"]
+    center = _float(rf.get("center_hz"))
+    out: List[Tuple[str, Dict[str, Any]]] = []
+    mono = time.monotonic()
     with _ANTS_LOCK:
         if evt == "RF_CONTACT_LOST":
-            UNKNOWN_RF_CONTACTS.pop(contact["id"], None)
+            if _HOP.release(sid):
+                _HOP.suppressed += 1
+                return
+            cid = _RF_MERGE.detach(sid)
+            if cid is None:
+                return  # another sensor id still holds the merged contact
+            prev = _rf_drop_locked(cid)
+            out.append(("CONTACT_LOST", dict(prev, last_seen_ts=ts_ms) if prev is not None else dict(contact, id=cid)))
         else:
-            UNKNOWN_RF_CONTACTS[contact["id"]] = contact
-
-    ws_broadcast({"type": mapped, "timestamp": ts_ms, "source": "rf_sensor", "data": contact})
+            hop_id, folded = _HOP.offer(sid, band, center, _float(rf.get("snr_db")), mono) if HOP_CLUSTER_ENABLE else (None, [])
+            for f_sid in folded:
+                f_cid = _RF_MERGE.detach(f_sid)
+                prev = _rf_drop_locked(f_cid) if f_cid is not None else None
+                if prev is not None:
+                    out.append(("CONTACT_LOST", prev))
+            if hop_id is not None:
+                contact, mapped = _HOP.contact(hop_id, ts_ms, mono)
+                if mapped is None:
+                    _HOP.suppressed += 1
+            else:
+                tol = band["merge_tol_hz"] if band and band["merge_tol_hz"] is not None else RF_MERGE_TOL_HZ
+                cid = contact["id"] = _RF_MERGE.attach(sid, center, tol)
+                if cid != sid:
+                    rf["sensor_id"] = sid
+                mapped = "CONTACT_UPDATE"
+            cid = contact["id"]
+            if UNKNOWN_RF_CONTACTS.get(cid) is None:
+                _RF_CHURN.on_new(cid)
+                mapped = "CONTACT_NEW"
+            ttl_s = _RF_CADENCE.observe(cid, mono)
+            contact["stale_after_ms"] = stale_after_ms(ttl_s)
+            UNKNOWN_RF_CONTACTS[cid] = contact
+            _RF_EXPIRY.schedule(cid, mono + ttl_s)
+            _RF_CKPT_DIRTY.add(cid)
+            if mapped is not None:
+                out.append((mapped, contact))
+
+    for mapped, c in out:
+        if mapped == "CONTACT_LOST" or not FUSION_ENABLE or _FUSION.fused_into(c["id"]) is None:
+            ws_broadcast({"type": mapped, "timestamp": ts_ms, "source": "rf_sensor", "data": c})
+        if mapped == "CONTACT_LOST":
+            fusion_drop(c["id"])
+            continue
+        _RF_HEATMAP.add(_float(c["unknown_rf"].get("center_hz")), _float(c["unknown_rf"].get("bandwidth_hz")), ts_ms)
+        _TIMESERIES.record(f"{c['id']}.snr_db", c["unknown_rf"].get("snr_db"), ts_ms)
+        _TIMESERIES.record(f"{c['id']}.peak_db", c["unknown_rf"].get("peak_db"), ts_ms)
+        if FUSION_ENABLE:
+            fusion_observe("rf", c["id"], c["unknown_rf"].get("center_hz"), {"unknown_rf": c["unknown_rf"]})
+
+def _rf_drop_locked(cid: str) -> Optional[Dict[str, Any]]:
+    prev = UNKNOWN_RF_CONTACTS.pop(cid, None)
+    if prev is not None:
+        _RF_CHURN.on_lost(cid)
+        _RF_CKPT_DIRTY.add(cid)
+    _RF_EXPIRY.cancel(cid)
+    _RF_CADENCE.forget(cid)
+    _HOP.drop(cid)
+    return prev
 
 def snapshot_unknown_rf_contacts() -> List[Dict[str, Any]]:
     _purge_unknown_rf_contacts()
@@ -1593,22 +2747,318 @@ def snapshot_unknown_rf_contacts() -> List[Dict[str, Any]]:
         return sorted(UNKNOWN_RF_CONTACTS.values(), key=lambda x: x.get("last_seen_ts", 0), reverse=True)
 
 def _purge_unknown_rf_contacts(now: Optional[int] = None) -> None:
+    # TTL runs on the monotonic clock; `now` only stamps the LOST events.
     t = now_ms() if now is None else int(now)
     lost: List[Dict[str, Any]] = []
     with _ANTS_LOCK:
-        for cid, c in list(UNKNOWN_RF_CONTACTS.items()):
-            last_ts = c.get("last_seen_ts")
-            try:
-                last_ts = int(last_ts) if last_ts is not None else None
-            except Exception:
-                last_ts = None
-            if last_ts is None:
-                continue
-            if (t - last_ts) > RF_CONTACT_TTL_MS:
+        for cid in _RF_EXPIRY.pop_expired():
+            c = UNKNOWN_RF_CONTACTS.pop(cid, None)
+            _RF_CADENCE.forget(cid)
+            _RF_MERGE.drop(cid)
+            _HOP.drop(cid)
+            if c is not None:
+                _RF_CKPT_DIRTY.add(cid)
+                _RF_CHURN.on_lost(cid)
                 lost.append(c)
-                del UNKNOWN_RF_CONTACTS[cid]
     for c in lost:
         ws_broadcast({"type": "CONTACT_LOST", "timestamp": t, "source": "rf_sensor", "data": c})
+        fusion_drop(c["id"])
+
+# ---- Cross-source fusion (Remote ID + UNKNOWN_RF + FPV) ----
+FUSION_ENABLE = (os.environ.get("NDEFENDER_FUSION") or "1").strip().lower() not in ("0", "false", "no", "off")
+FUSION_FREQ_TOL_HZ = float(os.environ.get("NDEFENDER_FUSION_FREQ_TOL_HZ") or "10e6")
+FUSION_WINDOW_S = float(os.environ.get("NDEFENDER_FUSION_WINDOW_S") or "10")
+FUSION_UPDATE_MIN_S = 1.0  # per fused contact, unless membership changes
+_FUSION_KIND_TYPE = {"rid": "REMOTE_ID", "fpv": "FPV_LINK", "rf": "UNKNOWN_RF"}
+_FUSION_KIND_RANK = {"rid": 0, "fpv": 1, "rf": 2}  # primary member: identity/position beats a bare carrier
+_FUSION_STANDALONE = ("rid", "rf")  # kinds that publish their own contacts; a video lock only shows up fused
+_FUSION_BLOCKS = ("remote_id", "fpv_link", "unknown_rf")
+
+def fusion_band_label(freq_hz: Optional[float]) -> Optional[str]:
+    band = _RF_BAND_PLAN.classify(freq_hz)
+    return band["label"] if band else None
+
+class _FusionObs:
+    __slots__ = ("kind", "id", "freq_hz", "ts", "bucket", "info", "group")
+
+    def __init__(self, kind: str, cid: str, freq_hz: float, ts: int, info: Dict[str, Any]):
+        self.kind = kind
+        self.id = cid
+        self.freq_hz = freq_hz
+        self.ts = ts
+        self.bucket = int(freq_hz // FUSION_FREQ_TOL_HZ)
+        self.info = info
+        self.group: Optional[str] = None
+
+class _FusionGroup:
+    __slots__ = ("id", "members", "created_ts", "confidence", "last_emit", "shown")
+
+    def __init__(self, gid: str, ts: int):
+        self.id = gid
+        self.members: Dict[str, str] = {}  # kind -> obs id; at most one contact per source
+        self.created_ts = ts
+        self.confidence = 0.0
+        self.last_emit = 0.0
+        self.shown: Optional[str] = None  # contact id the fused view was last published under
+
+class FusionEngine:
+    """
+    Correlates live observations from different sources by carrier frequency and recency.
+    Observations sit in frequency buckets one tolerance wide, so a lookup scans three buckets
+    instead of every contact, and leave the index through an ExpiryWheel once they fall out of
+    the time window. A link is only made when exactly one candidate of the other source
+    matches; e.g. several Remote ID drones on Wi-Fi channel 6 never glue onto one 2.437 GHz
+    RF hit. A fused contact is published under its primary member's id and type, carrying the
+    members under "fusion" for provenance, so one drone stays one item: joining a Remote ID
+    contact is a CONTACT_UPDATE rather than a second CONTACT_NEW, and the other members are
+    withdrawn (fused_into) until the group dissolves.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._obs: Dict[str, _FusionObs] = {}
+        self._bands: Dict[int, Dict[str, _FusionObs]] = {}
+        self._groups: Dict[str, _FusionGroup] = {}
+        self._expiry = ExpiryWheel()
+        self._seq = 0
+        self._pending_lost: List[str] = []  # views of groups retired by a merge during _correlate
+        self._hidden: Dict[str, str] = {}  # non-primary member id -> id of the fused contact
+        self.counts = {"observed": 0, "linked": 0, "ambiguous": 0, "conflicts": 0}
+
+    def observe(self, kind: str, cid: str, freq_hz: Any, info: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        f = _float(freq_hz)
+        if f is None or f <= 0:
+            return []
+        ts = now_ts()
+        with self._lock:
+            self.counts["observed"] += 1
+            o = self._obs.get(cid)
+            if o is None:
+                o = self._obs[cid] = _FusionObs(kind, cid, f, ts, info or {})
+                self._bands.setdefault(o.bucket, {})[cid] = o
+            else:
+                o.ts = ts
+                o.info = info or o.info
+                b = int(f // FUSION_FREQ_TOL_HZ)
+                if b != o.bucket:
+                    self._bands[o.bucket].pop(cid, None)
+                    o.bucket = b
+                    self._bands.setdefault(b, {})[cid] = o
+                o.freq_hz = f
+            self._expiry.schedule(cid, time.monotonic() + FUSION_WINDOW_S)
+            changed = self._correlate(o)
+            retired = tuple(self._pending_lost)
+            self._pending_lost.clear()
+            out: List[Dict[str, Any]] = []
+            g = self._groups.get(o.group) if o.group else None
+            if g is not None and (changed or time.monotonic() - g.last_emit >= FUSION_UPDATE_MIN_S):
+                self._publish(g, out, retired)
+            return out
+
+    def drop(self, cid: str) -> List[Dict[str, Any]]:
+        # the source reported the contact lost
+        with self._lock:
+            self._expiry.cancel(cid)
+            return self._remove(cid, True)
+
+    def expire(self) -> List[Dict[str, Any]]:
+        # out of the correlation window; the source's own contact may well still be live
+        with self._lock:
+            out: List[Dict[str, Any]] = []
+            for cid in self._expiry.pop_expired():
+                out.extend(self._remove(cid, False))
+            return out
+
+    def fused_into(self, cid: str) -> Optional[str]:
+        with self._lock:
+            return self._hidden.get(cid)
+
+    def _candidates(self, o: _FusionObs) -> Dict[str, List[Tuple[float, _FusionObs]]]:
+        by_kind: Dict[str, List[Tuple[float, _FusionObs]]] = {}
+        for b in (o.bucket - 1, o.bucket, o.bucket + 1):
+            for c in (self._bands.get(b) or {}).values():
+                if c.kind == o.kind:
+                    continue
+                df = abs(c.freq_hz - o.freq_hz)
+                if df <= FUSION_FREQ_TOL_HZ:
+                    by_kind.setdefault(c.kind, []).append((df, c))
+        return by_kind
+
+    def _correlate(self, o: _FusionObs) -> Optional[str]:
+        changed: Optional[str] = None
+        for kind, cands in self._candidates(o).items():
+            if len(cands) != 1:
+                self.counts["ambiguous"] += 1
+                continue
+            df, c = cands[0]
+            if o.group is not None and o.group == c.group:
+                continue
+            ga = self._groups.get(o.group) if o.group else None
+            gb = self._groups.get(c.group) if c.group else None
+            kinds_a = set(ga.members) if ga else {o.kind}
+            kinds_b = set(gb.members) if gb else {c.kind}
+            if kinds_a & kinds_b:
+                self.counts["conflicts"] += 1
+                continue
+            conf = round(1.0 - df / FUSION_FREQ_TOL_HZ, 2)
+            if ga is None and gb is None:
+                self._seq += 1
+                g = self._groups[f"fused:{self._seq}"] = _FusionGroup(f"fused:{self._seq}", o.ts)
+                g.members = {o.kind: o.id, c.kind: c.id}
+                g.confidence = conf
+                o.group = c.group = g.id
+                changed = changed or "new"
+            else:
+                keep, other = (ga, gb) if ga is not None else (gb, ga)
+                if other is not None:
+                    # both already fused: fold the other group in and retire it
+                    for k, mid in other.members.items():
+                        keep.members[k] = mid
+                        self._obs[mid].group = keep.id
+                    self._groups.pop(other.id, None)
+                    if other.shown is not None:
+                        self._pending_lost.append(other.shown)
+                for m in (o, c):
+                    keep.members[m.kind] = m.id
+                    m.group = keep.id
+                keep.confidence = min(keep.confidence, conf) if keep.confidence else conf
+                changed = changed or "update"
+            self.counts["linked"] += 1
+        return changed
+
+    def _remove(self, cid: str, gone: bool) -> List[Dict[str, Any]]:
+        o = self._obs.pop(cid, None)
+        self._hidden.pop(cid, None)
+        if o is None:
+            return []
+        band = self._bands.get(o.bucket)
+        if band is not None:
+            band.pop(cid, None)
+            if not band:
+                del self._bands[o.bucket]
+        g = self._groups.get(o.group) if o.group else None
+        if g is None:
+            return []
+        if g.members.get(o.kind) == cid:
+            del g.members[o.kind]
+        out: List[Dict[str, Any]] = []
+        if g.shown == cid:
+            # the primary left; a source contact that is still live keeps its id, minus the fusion
+            out.append(self._lost_event(cid) if gone or o.kind not in _FUSION_STANDALONE else self._own_event(o))
+            g.shown = None
+        if len(g.members) >= 2:
+            self._publish(g, out)
+            return out
+        # a single source left is just that source's own contact again
+        for mid in g.members.values():
+            m = self._obs.get(mid)
+            if m is None:
+                continue
+            m.group = None
+            self._hidden.pop(mid, None)
+            if m.kind in _FUSION_STANDALONE:
+                out.append(self._own_event(m))
+            elif mid == g.shown:
+                out.append(self._lost_event(mid))
+        del self._groups[g.id]
+        return out
+
+    def _publish(self, g: _FusionGroup, out: List[Dict[str, Any]], retired: Tuple[str, ...] = ()) -> None:
+        members = [self._obs[mid] for mid in g.members.values() if mid in self._obs]
+        primary = min(members, key=lambda m: _FUSION_KIND_RANK.get(m.kind, 9))
+        shown = {g.shown, *retired}
+        for m in members:
+            if m is primary:
+                continue
+            # withdraw members that were on screen: standalone contacts and any earlier fused view
+            if m.id not in self._hidden and (m.kind in _FUSION_STANDALONE or m.id in shown):
+                out.append(self._lost_event(m.id))
+            self._hidden[m.id] = primary.id
+        self._hidden.pop(primary.id, None)
+        # only a video lock appears for the first time here; Remote ID was announced by the tracker
+        new = g.shown != primary.id and primary.kind not in _FUSION_STANDALONE
+        g.shown = primary.id
+        out.append(self._event("CONTACT_NEW" if new else "CONTACT_UPDATE", g))
+
+    def _contact(self, g: _FusionGroup) -> Dict[str, Any]:
+        members = [self._obs[mid] for mid in g.members.values() if mid in self._obs]
+        primary = min(members, key=lambda m: _FUSION_KIND_RANK.get(m.kind, 9))
+        c: Dict[str, Any] = {
+            "id": primary.id,
+            "type": _FUSION_KIND_TYPE.get(primary.kind, "UNKNOWN_RF"),
+            "source": "live",
+            "first_seen_ts": g.created_ts,
+            "last_seen_ts": max(m.ts for m in members),
+            "stale_after_ms": int(FUSION_WINDOW_S * 1000),
+            "fusion": {
+                "group": g.id,
+                "primary": primary.id,
+                "freq_hz": primary.freq_hz,
+                "band": fusion_band_label(primary.freq_hz),
+                "confidence": g.confidence,
+                "members": [{"id": m.id, "kind": m.kind, "type": _FUSION_KIND_TYPE.get(m.kind), "freq_hz": m.freq_hz,
+                             "last_seen_ts": m.ts} for m in sorted(members, key=lambda m: _FUSION_KIND_RANK.get(m.kind, 9))],
+            },
+        }
+        # each member contributes its contract block (remote_id / fpv_link / unknown_rf)
+        for m in members:
+            c.update(m.info)
+        return c
+
+    def _event(self, et: str, g: _FusionGroup) -> Dict[str, Any]:
+        g.last_emit = time.monotonic()
+        return {"type": et, "timestamp": now_ts(), "source": "fusion", "data": {"contact": self._contact(g)}}
+
+    def _own_event(self, o: _FusionObs) -> Dict[str, Any]:
+        # a member back on its own: the other sources' blocks and the fusion block are cleared
+        c: Dict[str, Any] = dict.fromkeys(_FUSION_BLOCKS)
+        c.update(id=o.id, type=_FUSION_KIND_TYPE.get(o.kind, "UNKNOWN_RF"), source="live", last_seen_ts=o.ts,
+                 stale_after_ms=int(FUSION_WINDOW_S * 1000), fusion=None)
+        c.update(o.info)
+        return {"type": "CONTACT_UPDATE", "timestamp": now_ts(), "source": "fusion", "data": {"contact": c}}
+
+    def _lost_event(self, cid: str) -> Dict[str, Any]:
+        return {"type": "CONTACT_LOST", "timestamp": now_ts(), "source": "fusion", "data": {"id": cid}}
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [self._contact(g) for g in self._groups.values()]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self.counts, observations=len(self._obs), fused=len(self._groups), hidden=len(self._hidden))
+
+_FUSION = FusionEngine()
+
+def fusion_observe(kind: str, cid: str, freq_hz: Any, info: Optional[Dict[str, Any]] = None) -> None:
+    if not FUSION_ENABLE:
+        return
+    for ev in _FUSION.observe(kind, cid, freq_hz, info):
+        ws_broadcast(ev)
+
+def fusion_drop(cid: str) -> None:
+    for ev in _FUSION.drop(cid):
+        ws_broadcast(ev)
+
+def snapshot_fused_contacts() -> List[Dict[str, Any]]:
+    return _FUSION.snapshot() if FUSION_ENABLE else []
+
+def merge_fused_contacts(contacts: List[Dict[str, Any]], fused: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    # One item per drone: a fused view folds into its primary member's contact (same id; the
+    # member's own fields win) and the other members drop out. Works on the shared snapshot too.
+    if not fused:
+        return contacts
+    views = {f["id"]: f for f in fused}
+    hidden = {m["id"] for f in fused for m in (f.get("fusion") or {}).get("members") or []}
+    hidden.difference_update(views)
+    out = []
+    for c in contacts:
+        cid = c.get("id")
+        if cid in hidden:
+            continue
+        f = views.pop(cid, None)
+        out.append(c if f is None else dict(f, **c))
+    out.extend(views.values())
+    return out
 
 def rf_sensor_status_snapshot() -> Dict[str, Any]:
     now = now_ms()
@@ -1639,8 +3089,27 @@ def rf_sensor_status_snapshot() -> Dict[str, Any]:
         "last_response_ago_ms": ago,
         "scan_active": scan_active,
         "last_error": last_error,
+        "ttl": _rf_ttl_stats(),
+        "churn": _RF_CHURN.stats(),
+        "merge": _rf_merge_stats(),
+        "hop": _rf_hop_stats(),
+        "heatmap": _RF_HEATMAP.stats(),
+        "sweep": rf_sweep_snapshot() if RF_SWEEP_SOCKET else None,
+        "band_plan": _RF_BAND_PLAN.stats(),
     }
 
+def _rf_ttl_stats() -> Dict[str, Any]:
+    with _ANTS_LOCK:
+        return _RF_CADENCE.stats()
+
+def _rf_hop_stats() -> Dict[str, Any]:
+    with _ANTS_LOCK:
+        return _HOP.stats()
+
+def _rf_merge_stats() -> Dict[str, Any]:
+    with _ANTS_LOCK:
+        return dict(_RF_MERGE.stats(), tol_hz=RF_MERGE_TOL_HZ)
+
 def antsdr_worker() -> None:
     fp = None
     inode = None
@@ -1681,7 +3150,7 @@ def antsdr_worker() -> None:
             pos = fp.tell()
             obj = parse_any_json_line(line)
             if obj:
-                _handle_antsdr_event(obj)
+                _submit_rf_event(obj)
         except FileNotFoundError:
             if fp is not None:
                 fp.close()
@@ -1694,9 +3163,280 @@ def antsdr_worker() -> None:
             _set_rf_sensor_error("read_error")
             time.sleep(0.1)
 
+# ---- Raw spectrum sweeps (CA-CFAR) ----
+# One sweep per datagram on a local unix socket, little-endian:
+#   magic "NDSW" | u16 version (1) | u16 flags | u32 seq | u64 ts_ms (0 = now)
+#   | f64 start_hz | f64 stop_hz | u32 nbins | nbins x f32 power
+# flags bit 0: bins are linear power instead of dB.
+RF_SWEEP_SOCKET = os.environ.get("NDEFENDER_RF_SWEEP_SOCKET", "").strip()
+RF_SWEEP_HEADER = struct.Struct("<4sHHIQddI")
+RF_SWEEP_MAGIC = b"NDSW"
+RF_SWEEP_MAX_BINS = 65536
+RF_SWEEP_FLAG_LINEAR = 0x1
+RF_SWEEP_ID_RES_HZ = 100e3  # detection ids snap to this grid; the merge index absorbs the jitter
+RF_BW_CLASSES = ((500e3, "narrow"), (5e6, "medium"))  # else "wide"
+RF_CFAR_SCALES = (1, 4, 16, 64)  # block-averaging factors; coarser passes find wideband emitters
+_RF_SWEEP_LOCK = threading.Lock()
+RF_SWEEP_STATE = {
+    "socket": None,
+    "last_error": None,
+    "sweeps": 0,
+    "skipped": 0,
+    "bad_frames": 0,
+    "detections": 0,
+    "last_sweep_ts": None,
+    "last_nbins": None,
+    "last_detections": 0,
+    "proc_ms": None,
+}
+_RATE_RF_SWEEPS = RollingCounter()
+
+class CaCfar:
+    """
+    Cell-averaging CFAR over one sweep, vectorized with NumPy. The noise estimate for each cell is
+    the mean of train_bins cells on each side beyond guard_bins, taken from one cumulative sum.
+    The threshold scale alpha = N * (pfa ** (-1/N) - 1) uses the cells actually available, so
+    band edges are not flooded with false alarms. Index windows are cached per sweep length.
+    """
+    def __init__(self, guard_bins: int, train_bins: int, pfa: float, min_snr_db: float, max_detections: int):
+        self.guard = max(0, int(guard_bins))
+        self.train = max(1, int(train_bins))
+        self.pfa = min(max(float(pfa), 1e-12), 0.5)
+        self.min_snr = 10.0 ** (float(min_snr_db) / 10.0)
+        self.max_detections = max(1, int(max_detections))
+        self._cache: Dict[int, Tuple[Any, ...]] = {}
+
+    def _windows(self, n: int) -> Tuple[Any, ...]:
+        w = self._cache.get(n)
+        if w is None:
+            idx = np.arange(n)
+            l0 = np.clip(idx - self.guard - self.train, 0, n)
+            l1 = np.clip(idx - self.guard, 0, n)
+            r0 = np.clip(idx + self.guard + 1, 0, n)
+            r1 = np.clip(idx + self.guard + 1 + self.train, 0, n)
+            cnt = (l1 - l0) + (r1 - r0)
+            nn = np.maximum(cnt, 1).astype(np.float64)
+            alpha = nn * (self.pfa ** (-1.0 / nn) - 1.0)
+            alpha[cnt == 0] = np.inf
+            w = self._cache[n] = (l0, l1, r0, r1, alpha, 1.0 / nn, idx.astype(np.float64))
+        return w
+
+    def _runs(self, p: Any, median_ratio: float) -> Optional[Tuple[Any, ...]]:
+        # (first bin, end bin, centroid bin, peak power, snr) per contiguous run of hit cells
+        n = int(p.size)
+        l0, l1, r0, r1, alpha, inv_n, fidx = self._windows(n)
+        cs = np.empty(n + 1)
+        cs[0] = 0.0
+        np.cumsum(p, out=cs[1:])
+        # local cell average, clamped to the sweep's median floor: training cells that sit inside
+        # an emitter wider than the window would otherwise hide it
+        noise = np.minimum((cs[l1] - cs[l0] + cs[r1] - cs[r0]) * inv_n, float(np.median(p)) / median_ratio)
+        hit = (p > noise * alpha) & (p >= noise * self.min_snr)
+        if not hit.any():
+            return None
+        edges = np.diff(hit.view(np.int8), prepend=np.int8(0), append=np.int8(0))
+        starts = np.flatnonzero(edges == 1)
+        ends = np.flatnonzero(edges == -1)
+        pm = np.where(hit, p, 0.0)
+        peak = np.maximum.reduceat(pm, starts)
+        centroid = np.add.reduceat(pm * fidx, starts) / np.add.reduceat(pm, starts)
+        floor = noise[np.clip(np.rint(centroid).astype(np.intp), 0, n - 1)]
+        return starts, ends, centroid, peak, peak / np.maximum(floor, 1e-30)
+
+    def detect(self, bins: Any, start_hz: float, stop_hz: float, linear: bool = False) -> List[Dict[str, Any]]:
+        n = int(bins.size)
+        if n < 3:
+            return []
+        p = bins.astype(np.float64) if linear else np.power(10.0, bins.astype(np.float64) * 0.1)
+        # The same CA-CFAR also runs on block-averaged copies of the sweep, where wideband emitters
+        # form one smooth run instead of fragments. Overlapping hits keep the best integrated SNR
+        # (snr + 5 log10 width), so a tone stays narrow and a video carrier stays whole.
+        cands: List[Tuple[float, float, float, float, float]] = []
+        span = 2 * (self.guard + self.train) + 1
+        for scale in RF_CFAR_SCALES:
+            m = n // scale
+            if m < span:
+                break
+            ps = p if scale == 1 else p[:m * scale].reshape(m, scale).mean(axis=1)
+            # median/mean of exponential noise power is ln 2; of a mean of `scale` bins ~(s - 1/3)/s
+            runs = self._runs(ps, math.log(2.0) if scale == 1 else (scale - 1.0 / 3.0) / scale)
+            if runs is None:
+                continue
+            starts, ends, centroid, peak, snr = runs
+            off = (scale - 1) / 2.0
+            cands.extend(zip((starts * scale).tolist(), (ends * scale).tolist(), (centroid * scale + off).tolist(),
+                             peak.tolist(), snr.tolist()))
+        cands.sort(key=lambda c: -(10.0 * math.log10(c[4]) + 5.0 * math.log10(c[1] - c[0])))
+        kept: List[Tuple[float, float, float, float, float]] = []
+        for c in cands:
+            if all(c[1] <= k[0] or c[0] >= k[1] for k in kept):
+                kept.append(c)
+                if len(kept) >= self.max_detections:
+                    break
+        bin_hz = (float(stop_hz) - float(start_hz)) / n
+        out = []
+        for lo, hi, cen, pk, snr in kept:
+            if hi - lo > 1:  # re-centre coarse hits on the full-resolution bins they cover
+                seg = p[int(lo):int(hi)]
+                cen = lo + float(np.dot(seg, np.arange(seg.size))) / float(seg.sum())
+            out.append((lo, hi, cen, pk, snr))
+        return [{
+            "center_hz": float(start_hz) + (cen + 0.5) * bin_hz,
+            "bandwidth_hz": (hi - lo) * bin_hz,
+            "peak_db": round(10.0 * math.log10(pk), 1) if pk > 0 else None,
+            "snr_db": round(10.0 * math.log10(snr), 1),
+        } for lo, hi, cen, pk, snr in out]
+
+def _rf_bandwidth_class(bw_hz: float) -> str:
+    for limit, label in RF_BW_CLASSES:
+        if bw_hz < limit:
+            return label
+    return "wide"
+
+def _load_rf_cfar() -> Optional[CaCfar]:
+    cfg = load_settings(RF_CFAR_SETTINGS_FILE, DEFAULT_RF_CFAR_SETTINGS)
+    try:
+        return CaCfar(cfg["guard_bins"], cfg["train_bins"], cfg["pfa"], cfg["min_snr_db"], cfg["max_detections"])
+    except Exception as e:
+        with _RF_SWEEP_LOCK:
+            RF_SWEEP_STATE["last_error"] = f"cfar_settings:{e}"
+        return None
+
+def _parse_rf_sweep(frame: memoryview) -> Optional[Tuple[int, float, float, Any, bool]]:
+    if len(frame) < RF_SWEEP_HEADER.size:
+        return None
+    magic, version, flags, _seq, ts_ms, start_hz, stop_hz, nbins = RF_SWEEP_HEADER.unpack_from(frame)
+    if magic != RF_SWEEP_MAGIC or version != 1 or not 0 < nbins <= RF_SWEEP_MAX_BINS or not stop_hz > start_hz:
+        return None
+    end = RF_SWEEP_HEADER.size + 4 * nbins
+    if len(frame) < end:
+        return None
+    bins = np.frombuffer(frame[RF_SWEEP_HEADER.size:end], dtype="<f4")
+    linear = bool(flags & RF_SWEEP_FLAG_LINEAR)
+    # one NaN/inf (or negative linear power) would poison the cumulative-sum noise estimate
+    # for every window after it, so the whole sweep counts as a bad frame
+    if not np.isfinite(bins).all() or (linear and (bins < 0).any()):
+        return None
+    return int(ts_ms) or now_ms(), start_hz, stop_hz, bins, linear
+
+def _process_rf_sweep(cfar: CaCfar, frame: memoryview) -> bool:
+    parsed = _parse_rf_sweep(frame)
+    if parsed is None:
+        with _RF_SWEEP_LOCK:
+            RF_SWEEP_STATE["bad_frames"] += 1
+        return False
+    ts_ms, start_hz, stop_hz, bins, linear = parsed
+    t0 = time.perf_counter()
+    dets = cfar.detect(bins, start_hz, stop_hz, linear)
+    for d in dets:
+        center = d["center_hz"]
+        # NEW vs UPDATE is decided by the contact flow; UPDATE keeps sweep detections sheddable
+        _submit_rf_event({
+            "type": "RF_CONTACT_UPDATE",
+            "id": f"rf:{int(round(center / RF_SWEEP_ID_RES_HZ) * RF_SWEEP_ID_RES_HZ)}",
+            "ts_ms": ts_ms,
+            "data": {
+                "center_hz": int(center),
+                "snr_db": d["snr_db"],
+                "peak_db": d["peak_db"],
+                "bandwidth_hz": int(d["bandwidth_hz"]),
+                "bandwidth_class": _rf_bandwidth_class(d["bandwidth_hz"]),
+                "family_hint": "unknown",
+            },
+        })
+    ms = (time.perf_counter() - t0) * 1000.0
+    _RATE_RF_SWEEPS.hit()
+    with _RF_SWEEP_LOCK:
+        st = RF_SWEEP_STATE
+        st["sweeps"] += 1
+        st["detections"] += len(dets)
+        st["last_detections"] = len(dets)
+        st["last_sweep_ts"] = ts_ms
+        st["last_nbins"] = int(bins.size)
+        st["proc_ms"] = round(ms if st["proc_ms"] is None else st["proc_ms"] + 0.1 * (ms - st["proc_ms"]), 3)
+    return True
+
+def rf_sweep_worker() -> None:
+    if np is None:
+        with _RF_SWEEP_LOCK:
+            RF_SWEEP_STATE["last_error"] = "numpy_missing"
+        print(f"RF_SWEEP disabled: numpy missing (pip install -r requirements.txt) socket={RF_SWEEP_SOCKET}", flush=True)
+        return
+    try:
+        if os.path.exists(RF_SWEEP_SOCKET):
+            os.unlink(RF_SWEEP_SOCKET)
+        os.makedirs(os.path.dirname(RF_SWEEP_SOCKET) or ".", exist_ok=True)
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        try:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, INGEST_DGRAM_RCVBUF)
+        except OSError:
+            pass
+        sock.bind(RF_SWEEP_SOCKET)
+    except Exception as e:
+        with _RF_SWEEP_LOCK:
+            RF_SWEEP_STATE["last_error"] = f"bind_failed:{e}"
+        return
+    with _RF_SWEEP_LOCK:
+        RF_SWEEP_STATE["socket"] = RF_SWEEP_SOCKET
+    # two buffers: drain into the spare one, so only the newest queued sweep is processed
+    bufs = [bytearray(RF_SWEEP_HEADER.size + 4 * RF_SWEEP_MAX_BINS) for _ in range(2)]
+    cfar = _load_rf_cfar()
+    cfg_mtime: Optional[float] = None
+    cfg_checked = 0.0
+    sock.settimeout(0.5)
+    try:
+        while not _stop.is_set():
+            now = time.monotonic()
+            if now - cfg_checked >= 1.0:  # kiosk edits land in the settings file
+                cfg_checked = now
+                try:
+                    mtime = os.stat(RF_CFAR_SETTINGS_FILE).st_mtime
+                except OSError:
+                    mtime = None
+                if mtime != cfg_mtime:
+                    cfg_mtime = mtime
+                    cfar = _load_rf_cfar() or cfar
+            try:
+                n = sock.recv_into(bufs[0])
+            except socket.timeout:
+                continue
+            except OSError as e:
+                with _RF_SWEEP_LOCK:
+                    RF_SWEEP_STATE["last_error"] = str(e)
+                time.sleep(0.2)
+                continue
+            cur = 0
+            skipped = 0
+            sock.setblocking(False)
+            try:
+                while True:
+                    try:
+                        m = sock.recv_into(bufs[1 - cur])
+                    except (BlockingIOError, InterruptedError):
+                        break
+                    cur, n = 1 - cur, m
+                    skipped += 1
+            finally:
+                sock.settimeout(0.5)
+            if skipped:
+                with _RF_SWEEP_LOCK:
+                    RF_SWEEP_STATE["skipped"] += skipped
+            if cfar is not None:
+                _process_rf_sweep(cfar, memoryview(bufs[cur])[:n])
+    finally:
+        sock.close()
+
+def rf_sweep_snapshot() -> Dict[str, Any]:
+    with _RF_SWEEP_LOCK:
+        st = dict(RF_SWEEP_STATE)
+    st["rates"] = _RATE_RF_SWEEPS.rates()
+    return st
+
 def unknown_rf_expire_worker() -> None:
     while not _stop.is_set():
         _purge_unknown_rf_contacts()
+        for ev in _FUSION.expire():
+            ws_broadcast(ev)
         time.sleep(0.5)
 
 def rfscan_monitor_worker() -> None:
@@ -1742,6 +3482,27 @@ def deep_find(obj, key):
         return None
     return None
 
+def _wifi_channel_hz(ch: Optional[int]) -> Optional[int]:
+    if ch is None:
+        return None
+    if ch == 14:
+        return 2484000000
+    if 1 <= ch <= 13:
+        return (2407 + 5 * ch) * 1000000
+    if 32 <= ch <= 177:
+        return (5000 + 5 * ch) * 1000000
+    return None
+
+def _rid_freq_hz(pick: Any, obj: Dict[str, Any]) -> Optional[int]:
+    # Carrier of the frame that delivered the RID message (Wi-Fi beacon/NAN); BLE has none here.
+    mhz = _float(pick("wlan_radio.frequency") or pick("radiotap.channel.freq") or obj.get("freq_mhz"))
+    if mhz is not None and mhz > 0:
+        return int(mhz * 1000000)
+    hz = _float(obj.get("freq_hz"))
+    if hz is not None and hz > 0:
+        return int(hz)
+    return _wifi_channel_hz(_to_int(pick("wlan_radio.channel") or obj.get("channel")))
+
 def normalize_event(obj: Dict[str, Any], source: str) -> Optional[Dict[str, Any]]:
     ts = _float(_get_any(obj, ["ts", "timestamp", "@timestamp"]))
     if ts is None:
@@ -1861,6 +3622,12 @@ def normalize_event(obj: Dict[str, Any], source: str) -> Optional[Dict[str, Any]
     home_lat = _float(_get_any(obj, ["home_lat", "home_latitude"]))
     home_lon = _float(_get_any(obj, ["home_lon", "home_longitude"]))
 
+    freq_hz = _rid_freq_hz(pick, obj)
+
+    # rid_live_capture: per-pack counter + pack header (same physical message => same values)
+    msg_counter = _to_int(obj.get("msg_counter"))
+    pack_hdr = _str(obj.get("pack_hdr"))
+
     return {
         "ts": ts,
         "source": source,
@@ -1876,6 +3643,9 @@ def normalize_event(obj: Dict[str, Any], source: str) -> Optional[Dict[str, Any]
         "home_lat": home_lat,
         "home_lon": home_lon,
         "frame_no": frame_no,
+        "freq_hz": freq_hz,
+        "msg_counter": msg_counter,
+        "pack_hdr": pack_hdr,
         "raw": obj,
     }
 
@@ -1903,6 +3673,98 @@ def ek_dedupe_stream(events: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]]
     after = len(out)
     return out, {"before": before, "after": after, "dupes": dupes}
 
+# ---- Remote ID cross-path dedupe (ingest stage) ----
+# Copies of one broadcast seen via several paths (live capture, EK, UDP, BLE)
+# land within a few hundred ms of each other; a drone repeats its messages at
+# ~1 Hz.  The window therefore only has to cover path skew, and must stay well
+# below the broadcast period or a hovering drone's repeats would be dropped.
+RID_DEDUPE_WINDOW_S = float(os.environ.get("NDEFENDER_RID_DEDUPE_WINDOW_S") or "0.5")
+RID_DEDUPE_MAX_KEYS = int(os.environ.get("NDEFENDER_RID_DEDUPE_MAX_KEYS") or "8192")
+
+# ASTM F3411 message type numbers, as some decoders emit them
+_RID_MSG_TYPE_NAMES = {"0": "basic_id", "1": "location", "2": "auth", "3": "self_id", "4": "system", "5": "operator_id"}
+
+def _rid_round(v: Any, nd: int) -> Any:
+    try:
+        return round(float(v), nd) if v is not None else None
+    except Exception:
+        return v
+
+class RidDeduper:
+    """
+    Time-bounded map built from two rotating generations.
+    The key is path independent (contact id + message type + normalized
+    content); the value remembers when, from which path and with which
+    per-path frame counter the message was first seen.  A match from another
+    path inside the window is a cross-path copy; a match from the same path is
+    only a copy when its frame counter is equal (or absent), so distinct
+    transmissions of identical content are kept.
+    Each generation holds at most max_keys/2 entries, so memory stays fixed under floods.
+    """
+    def __init__(self, window_s: float, max_keys: int):
+        self.window_s = max(0.05, float(window_s))
+        self.half_window_s = self.window_s / 2.0
+        self.gen_max = max(16, int(max_keys) // 2)
+        self._cur: Dict[int, Tuple[float, str, Any]] = {}
+        self._prev: Dict[int, Tuple[float, str, Any]] = {}
+        self._rotated_at = time.monotonic()
+        self._lock = threading.Lock()
+        self._per_source: Dict[str, List[int]] = {}  # source -> [seen, dupes, cross_path]
+
+    @staticmethod
+    def key_for(e: Dict[str, Any]) -> int:
+        mt = str(e.get("msg_type") or "").strip().lower()
+        content = (
+            e.get("basic_id"), e.get("operator_id"),
+            _rid_round(e.get("lat"), 7), _rid_round(e.get("lon"), 7), _rid_round(e.get("alt_m"), 1),
+            _rid_round(e.get("operator_lat"), 7), _rid_round(e.get("operator_lon"), 7),
+            _rid_round(e.get("home_lat"), 7), _rid_round(e.get("home_lon"), 7),
+        )
+        return hash((stable_contact_id(e), _RID_MSG_TYPE_NAMES.get(mt, mt), content))
+
+    @staticmethod
+    def frame_counter(e: Dict[str, Any]) -> Any:
+        if e.get("msg_counter") is not None:
+            return (e.get("msg_counter"), e.get("pack_hdr"))
+        return e.get("frame_no")
+
+    def is_duplicate(self, e: Dict[str, Any]) -> bool:
+        k = self.key_for(e)
+        src = str(e.get("source") or "unknown")
+        ctr = self.frame_counter(e)
+        with self._lock:
+            t = time.monotonic()
+            if (t - self._rotated_at) >= self.half_window_s or len(self._cur) >= self.gen_max:
+                self._prev = self._cur
+                self._cur = {}
+                self._rotated_at = t
+            counts = self._per_source.get(src)
+            if counts is None:
+                counts = self._per_source[src] = [0, 0, 0]
+            counts[0] += 1
+            seen = self._cur.get(k) or self._prev.get(k)
+            if seen is not None and (t - seen[0]) < self.window_s:
+                if seen[1] != src:
+                    counts[1] += 1
+                    counts[2] += 1
+                    return True
+                if ctr is None or seen[2] is None or ctr == seen[2]:
+                    counts[1] += 1
+                    return True
+            self._cur[k] = (t, src, ctr)
+            return False
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            per_source = {
+                src: {"seen": seen, "dupes": dupes, "cross_path": cross, "dup_rate": round(dupes / seen, 4) if seen else 0.0}
+                for src, (seen, dupes, cross) in self._per_source.items()
+            }
+            keys = len(self._cur) + len(self._prev)
+        return {"window_s": self.window_s, "keys": keys, "sources": per_source}
+
+_RID_DEDUPER = RidDeduper(RID_DEDUPE_WINDOW_S, RID_DEDUPE_MAX_KEYS)
+
 def stable_contact_id(e: Dict[str, Any]) -> str:
     bid = e.get("basic_id")
     if bid:
@@ -1927,80 +3789,1481 @@ def stable_contact_id(e: Dict[str, Any]) -> str:
     return "rid:unknown"
 
 
-class ContactTracker:
-    def __init__(self, ttl_s: float):
-        self.ttl_ms = int(float(ttl_s) * 1000)
-        self.contacts: Dict[str, Dict[str, Any]] = {}
-        self.msg_ts_60s = deque()
-
-    def _prune_60s(self, t: float) -> None:
-        while self.msg_ts_60s and (t - self.msg_ts_60s[0]) > 60000.0:
-            self.msg_ts_60s.popleft()
+# ---- Remote ID admission control (spoof-flood protection) ----
+RID_MAX_CONTACTS = int(os.environ.get("NDEFENDER_RID_MAX_CONTACTS") or "500")
+RID_ADMIT_PER_MAC_RATE = float(os.environ.get("NDEFENDER_RID_ADMIT_PER_MAC_RATE") or "0.5")   # new IDs/s per MAC
+RID_ADMIT_PER_MAC_BURST = float(os.environ.get("NDEFENDER_RID_ADMIT_PER_MAC_BURST") or "4")
+RID_ADMIT_GLOBAL_RATE = float(os.environ.get("NDEFENDER_RID_ADMIT_GLOBAL_RATE") or "20")      # new IDs/s overall
+RID_ADMIT_GLOBAL_BURST = float(os.environ.get("NDEFENDER_RID_ADMIT_GLOBAL_BURST") or "60")
+RID_ADMIT_MAX_MACS = 4096
+RID_FLOOD_REJECTS = int(os.environ.get("NDEFENDER_RID_FLOOD_REJECTS") or "25")  # rejects per window => flood
+RID_FLOOD_WINDOW_S = 10.0
+RID_FLOOD_CLEAR_S = 30.0
+
+class TokenBucket:
+    __slots__ = ("rate", "burst", "tokens", "ts")
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = float(rate)
+        self.burst = max(1.0, float(burst))
+        self.tokens = self.burst
+        self.ts = time.monotonic()
+
+    def take(self, t: float, n: float = 1.0) -> bool:
+        self.tokens = min(self.burst, self.tokens + (t - self.ts) * self.rate)
+        self.ts = t
+        if self.tokens >= n:
+            self.tokens -= n
+            return True
+        return False
 
-    def ingest(self, e: Dict[str, Any]) -> List[Dict[str, Any]]:
-        # message counter uses wall clock
-        self.msg_ts_60s.append(now_ts())
-        self._prune_60s(now_ts())
+RID_CHANGELOG_LEN = 256
+RID_SNAPSHOT_SHARDS = 64
 
-        cid = stable_contact_id(e)
+# ---- RID trajectory history ----
+RID_TRACK_POINTS = int(os.environ.get("NDEFENDER_RID_TRACK_POINTS") or "600")
+RID_TRACK_MIN_INTERVAL_MS = int(os.environ.get("NDEFENDER_RID_TRACK_MIN_INTERVAL_MS") or "1000")
+RID_TRACK_TAIL_POINTS = int(os.environ.get("NDEFENDER_RID_TRACK_TAIL_POINTS") or "30")
+RID_TRACK_EPSILON_M = float(os.environ.get("NDEFENDER_RID_TRACK_EPSILON_M") or "2.0")
 
-        if cid == "rid:unknown":
-            return []
-        prev = self.contacts.get(cid)
+class TrackRing:
+    """
+    Fixed-capacity position history in typed arrays (ts ms, lat, lon, alt; NaN = no altitude).
+    Points closer than min_interval_ms to the previous one replace it, so the tail stays current
+    while the stored rate is capped.
+    """
+    __slots__ = ("cap", "min_interval_ms", "_ts", "_lat", "_lon", "_alt", "_head", "_n")
+
+    def __init__(self, cap: int = RID_TRACK_POINTS, min_interval_ms: int = RID_TRACK_MIN_INTERVAL_MS):
+        self.cap = max(2, int(cap))
+        self.min_interval_ms = int(min_interval_ms)
+        # grown on demand up to cap, then used as a ring
+        self._ts = array("q")
+        self._lat = array("d")
+        self._lon = array("d")
+        self._alt = array("d")
+        self._head = 0  # index of the oldest point once full
+        self._n = 0
+
+    def __len__(self) -> int:
+        return self._n
+
+    def _idx(self, k: int) -> int:
+        # k-th point, oldest first
+        return (self._head + k) % self.cap
+
+    def append(self, ts: int, lat: float, lon: float, alt: Optional[float]) -> None:
+        alt_v = float(alt) if alt is not None else math.nan
+        n = self._n
+        # The newest point floats: it is overwritten until it lies min_interval_ms past the
+        # point before it, so stored points are spaced by the interval and the tail stays current.
+        if n >= 2 and self._ts[self._idx(n - 1)] - self._ts[self._idx(n - 2)] < self.min_interval_ms:
+            i = self._idx(n - 1)
+        elif n < self.cap:
+            self._ts.append(ts)
+            self._lat.append(lat)
+            self._lon.append(lon)
+            self._alt.append(alt_v)
+            self._n = n + 1
+            return
+        else:
+            i = self._head
+            self._head = (i + 1) % self.cap
+        self._ts[i] = ts
+        self._lat[i] = lat
+        self._lon[i] = lon
+        self._alt[i] = alt_v
+
+    def first_ts(self) -> Optional[int]:
+        return self._ts[self._head] if self._n else None
+
+    def to_bytes(self) -> bytes:
+        # oldest first: count, then the four columns back to back
+        h = self._head
+        cols = (self._ts, self._lat, self._lon, self._alt)
+        return struct.pack("<I", self._n) + b"".join((a[h:] + a[:h]).tobytes() for a in cols)
+
+    @classmethod
+    def from_bytes(cls, blob: bytes) -> "TrackRing":
+        ring = cls()
+        (n,) = struct.unpack_from("<I", blob, 0)
+        off = 4
+        cols = []
+        for tc in ("q", "d", "d", "d"):
+            a = array(tc)
+            a.frombytes(blob[off:off + 8 * n])
+            off += 8 * n
+            cols.append(a)
+        keep = min(n, ring.cap)
+        ring._ts, ring._lat, ring._lon, ring._alt = (c[n - keep:] for c in cols)
+        ring._n = keep
+        return ring
+
+    def points(self, since: int = 0, limit: Optional[int] = None) -> List[Tuple[int, float, float, Optional[float]]]:
+        # oldest first; `limit` keeps the newest points
+        out: List[Tuple[int, float, float, Optional[float]]] = []
+        n = self._n
+        start = 0 if limit is None else max(0, n - int(limit))
+        for k in range(start, n):
+            i = self._idx(k)
+            ts = self._ts[i]
+            if ts <= since:
+                continue
+            alt = self._alt[i]
+            out.append((ts, self._lat[i], self._lon[i], None if alt != alt else alt))
+        return out
 
-        payload = {
-            "id": cid,
-            "type": "REMOTE_ID",
-            # TTL should be wall-clock based
-            "last_ts": now_ts(),
-            "source": e.get("source"),
-            "msg_type": e.get("msg_type"),
-            "operator_id": e.get("operator_id"),
-            "basic_id": e.get("basic_id"),
-            "mac": e.get("mac"),
-            "lat": e.get("lat"),
-            "lon": e.get("lon"),
-            "alt_m": e.get("alt_m"),
-            "operator_lat": e.get("operator_lat"),
-            "operator_lon": e.get("operator_lon"),
-            "home_lat": e.get("home_lat"),
-            "home_lon": e.get("home_lon"),
+def simplify_track(points: List[Tuple[int, float, float, Optional[float]]],
+                   epsilon_m: float = RID_TRACK_EPSILON_M,
+                   max_points: Optional[int] = None) -> List[Tuple[int, float, float, Optional[float]]]:
+    """
+    Douglas-Peucker on a local equirectangular projection (metres). Each kept point's
+    significance is its deviation, capped by its parent's, so `max_points` takes the most
+    significant points without breaking the hierarchy.
+    """
+    n = len(points)
+    if n <= 2:
+        return list(points)
+    lat0 = math.radians(points[0][1])
+    kx = 111320.0 * math.cos(lat0)
+    ky = 110540.0
+    xs = [p[2] * kx for p in points]
+    ys = [p[1] * ky for p in points]
+    sig = [0.0] * n
+    sig[0] = sig[n - 1] = math.inf
+    stack = [(0, n - 1, math.inf)]
+    while stack:
+        a, b, cap = stack.pop()
+        if b - a < 2:
+            continue
+        ax, ay = xs[a], ys[a]
+        dx, dy = xs[b] - ax, ys[b] - ay
+        norm = math.hypot(dx, dy)
+        best_d = -1.0
+        best_k = a + 1
+        for k in range(a + 1, b):
+            if norm > 0.0:
+                d = abs(dy * (xs[k] - ax) - dx * (ys[k] - ay)) / norm
+            else:
+                d = math.hypot(xs[k] - ax, ys[k] - ay)
+            if d > best_d:
+                best_d = d
+                best_k = k
+        s_k = min(best_d, cap)
+        if s_k < epsilon_m:
+            continue
+        sig[best_k] = s_k
+        stack.append((a, best_k, s_k))
+        stack.append((best_k, b, s_k))
+    keep = [i for i in range(n) if sig[i] > 0.0]
+    if max_points is not None and len(keep) > max(2, int(max_points)):
+        keep = sorted(sorted(keep, key=lambda i: sig[i], reverse=True)[:max(2, int(max_points))])
+    return [points[i] for i in keep]
+
+# ---- RID Kalman predictor ----
+RID_KF_ENABLE = (os.environ.get("NDEFENDER_RID_KF") or "1").strip().lower() not in ("0", "false", "no", "off")
+RID_KF_MEAS_SIGMA_M = float(os.environ.get("NDEFENDER_RID_KF_MEAS_SIGMA_M") or "5.0")
+RID_KF_ACCEL_SIGMA = float(os.environ.get("NDEFENDER_RID_KF_ACCEL_SIGMA") or "2.0")  # m/s^2, white-noise accel
+RID_KF_VEL0_SIGMA = 15.0          # m/s, prior on a new contact's speed
+RID_KF_RESET_M = 500.0            # innovation beyond this restarts the filter (teleport / id reuse)
+RID_KF_HORIZON_S = float(os.environ.get("NDEFENDER_RID_KF_HORIZON_S") or "5.0")  # never extrapolate further
+RID_PREDICT_FPS = float(os.environ.get("NDEFENDER_RID_PREDICT_FPS") or "0")  # 0 = don't publish predictions
+RID_PREDICT_MIN_MOVE_M = 0.5
+RID_KF_VECTOR_MIN = 32            # rounds smaller than this are cheaper as scalar Python than as numpy calls
+_KF_M_PER_DEG_LAT = 110540.0
+_KF_M_PER_DEG_LON_EQ = 111320.0
+
+class KalmanBank:
+    """
+    Constant-velocity Kalman filters for every active contact, held column-wise in one flat
+    array('d') (row r of slot i at r * cap + i). With numpy the same buffer is viewed as a
+    (rows, cap) matrix and large rounds run as vector ops over all contacts; small rounds, and
+    every round when numpy is missing (or use_numpy is False), run the identical scalar update
+    in plain Python.
+    Each contact has its own local tangent plane (x east, y north, metres) anchored at its first
+    fix; x and y are filtered independently, so each axis needs only a 2x2 covariance (pp, pv, vv).
+    Times are time.monotonic() seconds.
+    """
+    # rows of the state matrix
+    T, LAT0, LON0, KX, X, Y, VX, VY, PXX, PXV, PVVX, PYY, PYV, PVVY = range(14)
+    ROWS = 14
+    _AXES = ((X, VX, PXX, PXV, PVVX), (Y, VY, PYY, PYV, PVVY))
+
+    def __init__(self, cap: int = 64, meas_sigma_m: float = RID_KF_MEAS_SIGMA_M, accel_sigma: float = RID_KF_ACCEL_SIGMA,
+                 use_numpy: bool = True):
+        self.r = meas_sigma_m ** 2
+        self.q = accel_sigma ** 2
+        self.use_numpy = use_numpy and np is not None
+        self._cap = max(1, int(cap))
+        self._buf = array("d", bytes(8 * self.ROWS * self._cap))
+        self._a = self._view()
+        self._slot: Dict[str, int] = {}
+        self._ids: List[Optional[str]] = [None] * self._cap
+        self._free: List[int] = list(range(self._cap - 1, -1, -1))
+        self.resets = 0
+
+    def _view(self) -> Any:
+        # zero-copy numpy view of _buf; writes go straight through
+        if not self.use_numpy:
+            return None
+        return np.frombuffer(self._buf, dtype=np.float64).reshape(self.ROWS, self._cap)
+
+    def __len__(self) -> int:
+        return len(self._slot)
+
+    def _alloc(self, cid: str) -> int:
+        if not self._free:
+            old = self._cap
+            buf = array("d", bytes(8 * self.ROWS * 2 * old))
+            for r in range(self.ROWS):
+                buf[r * 2 * old:r * 2 * old + old] = self._buf[r * old:(r + 1) * old]
+            self._a = None
+            self._buf, self._cap = buf, 2 * old
+            self._a = self._view()
+            self._ids.extend([None] * old)
+            self._free = list(range(2 * old - 1, old - 1, -1))
+        i = self._free.pop()
+        self._slot[cid] = i
+        self._ids[i] = cid
+        return i
+
+    def _init(self, i: int, t: float, lat: float, lon: float) -> None:
+        b, c = self._buf, self._cap
+        for r in range(self.ROWS):
+            b[r * c + i] = 0.0
+        b[self.T * c + i] = t
+        b[self.LAT0 * c + i] = lat
+        b[self.LON0 * c + i] = lon
+        b[self.KX * c + i] = _KF_M_PER_DEG_LON_EQ * math.cos(math.radians(lat))
+        b[self.PXX * c + i] = b[self.PYY * c + i] = self.r
+        b[self.PVVX * c + i] = b[self.PVVY * c + i] = RID_KF_VEL0_SIGMA ** 2
+
+    def remove(self, cid: str) -> None:
+        i = self._slot.pop(cid, None)
+        if i is not None:
+            self._ids[i] = None
+            self._free.append(i)
+
+    def _predicted(self, idx: Any, dt: Any) -> Tuple[Any, ...]:
+        # x' = F x ; P' = F P F^T + Q, per axis, for all idx at once
+        a = self._a
+        q = self.q
+        dt2 = dt * dt
+        q11 = q * dt2 * dt / 3.0
+        q12 = q * dt2 / 2.0
+        q22 = q * dt
+        out = []
+        for p, v, pp, pv, vv in self._AXES:
+            P, PV, VV = a[pp, idx], a[pv, idx], a[vv, idx]
+            out.extend((
+                a[p, idx] + a[v, idx] * dt,
+                P + 2.0 * dt * PV + dt2 * VV + q11,
+                PV + dt * VV + q12,
+                VV + q22,
+            ))
+        return tuple(out)
+
+    def step(self, fixes: List[Tuple[str, float, float, float]]) -> None:
+        # fixes: (cid, t_s, lat, lon). Repeat fixes for one contact go in later rounds so each
+        # round touches a slot at most once.
+        rounds: List[List[Tuple[int, float, float, float]]] = []
+        depth: Dict[int, int] = {}
+        for cid, t, lat, lon in fixes:
+            i = self._slot.get(cid)
+            if i is None:
+                self._init(self._alloc(cid), t, lat, lon)
+                continue
+            k = depth.get(i, 0)
+            depth[i] = k + 1
+            if k == len(rounds):
+                rounds.append([])
+            rounds[k].append((i, t, lat, lon))
+        for rnd in rounds:
+            if self._a is not None and len(rnd) >= RID_KF_VECTOR_MIN:
+                self._step_vector(rnd)
+            else:
+                for i, t, lat, lon in rnd:
+                    self._step_one(i, t, lat, lon)
+
+    def _step_one(self, i: int, t: float, lat: float, lon: float) -> None:
+        b, c, q, rr = self._buf, self._cap, self.q, self.r
+        zs = ((lon - b[self.LON0 * c + i]) * b[self.KX * c + i], (lat - b[self.LAT0 * c + i]) * _KF_M_PER_DEG_LAT)
+        dt = max(t - b[self.T * c + i], 0.0)
+        dt2 = dt * dt
+        q11, q12, q22 = q * dt2 * dt / 3.0, q * dt2 / 2.0, q * dt
+        err2 = 0.0
+        for (p, v, pp, pv, vv), z in zip(self._AXES, zs):
+            P, PV, VV = b[pp * c + i], b[pv * c + i], b[vv * c + i]
+            x = b[p * c + i] + b[v * c + i] * dt
+            P, PV, VV = P + 2.0 * dt * PV + dt2 * VV + q11, PV + dt * VV + q12, VV + q22
+            # position-only measurement: H = [1 0]
+            e = z - x
+            s = P + rr
+            kp, kv = P / s, PV / s
+            b[p * c + i] = x + kp * e
+            b[v * c + i] += kv * e
+            b[pp * c + i] = (1.0 - kp) * P
+            b[pv * c + i] = (1.0 - kp) * PV
+            b[vv * c + i] = VV - kv * PV
+            err2 += e * e
+        b[self.T * c + i] = t
+        if err2 > RID_KF_RESET_M * RID_KF_RESET_M:
+            self._init(i, t, lat, lon)
+            self.resets += 1
+
+    def _step_vector(self, rnd: List[Tuple[int, float, float, float]]) -> None:
+        a = self._a
+        idx = np.fromiter((r[0] for r in rnd), dtype=np.intp, count=len(rnd))
+        t = np.fromiter((r[1] for r in rnd), dtype=np.float64, count=len(rnd))
+        zx = (np.fromiter((r[3] for r in rnd), dtype=np.float64, count=len(rnd)) - a[self.LON0, idx]) * a[self.KX, idx]
+        zy = (np.fromiter((r[2] for r in rnd), dtype=np.float64, count=len(rnd)) - a[self.LAT0, idx]) * _KF_M_PER_DEG_LAT
+        dt = np.maximum(t - a[self.T, idx], 0.0)
+        x, pxx, pxv, pvvx, y, pyy, pyv, pvvy = self._predicted(idx, dt)
+        vx, vy = a[self.VX, idx], a[self.VY, idx]
+        # position-only measurement: H = [1 0]
+        ex, ey = zx - x, zy - y
+        sx, sy = pxx + self.r, pyy + self.r
+        kpx, kvx = pxx / sx, pxv / sx
+        kpy, kvy = pyy / sy, pyv / sy
+        a[self.T, idx] = t
+        a[self.X, idx] = x + kpx * ex
+        a[self.VX, idx] = vx + kvx * ex
+        a[self.PXX, idx] = (1.0 - kpx) * pxx
+        a[self.PXV, idx] = (1.0 - kpx) * pxv
+        a[self.PVVX, idx] = pvvx - kvx * pxv
+        a[self.Y, idx] = y + kpy * ey
+        a[self.VY, idx] = vy + kvy * ey
+        a[self.PYY, idx] = (1.0 - kpy) * pyy
+        a[self.PYV, idx] = (1.0 - kpy) * pyv
+        a[self.PVVY, idx] = pvvy - kvy * pyv
+        jumped = np.hypot(ex, ey) > RID_KF_RESET_M
+        if jumped.any():
+            for j in np.nonzero(jumped)[0]:
+                r = rnd[int(j)]
+                self._init(r[0], r[1], r[2], r[3])
+                self.resets += 1
+
+    def estimate(self, now_s: float) -> Dict[str, Any]:
+        # Predict every contact to now_s (capped at the horizon) without touching the state.
+        ids = [c for c in self._slot]
+        if not ids:
+            return {"ids": []}
+        if self._a is None:
+            return self._estimate_scalar(ids, now_s)
+        a = self._a
+        idx = np.fromiter((self._slot[c] for c in ids), dtype=np.intp, count=len(ids))
+        age = np.maximum(now_s - a[self.T, idx], 0.0)
+        x, pxx, _, _, y, pyy, _, _ = self._predicted(idx, np.minimum(age, RID_KF_HORIZON_S))
+        vx, vy = a[self.VX, idx], a[self.VY, idx]
+        return {
+            "ids": ids,
+            "age_s": age,
+            "lat": a[self.LAT0, idx] + y / _KF_M_PER_DEG_LAT,
+            "lon": a[self.LON0, idx] + x / a[self.KX, idx],
+            "ve": vx,
+            "vn": vy,
+            "speed": np.hypot(vx, vy),
+            "heading": np.degrees(np.arctan2(vx, vy)) % 360.0,
+            "sigma": np.sqrt(pxx + pyy),
+            "vel_sigma": np.sqrt(a[self.PVVX, idx] + a[self.PVVY, idx]),
         }
 
-        if prev is None:
-            self.contacts[cid] = payload
-            return [{"type": "RID_CONTACT_NEW", "ts": now_ts(), "contact": payload}]
-        else:
-            # Preserve last known coordinates/ids when an update omits them
-            for k in ["lat", "lon", "alt_m", "operator_lat", "operator_lon", "home_lat", "home_lon", "basic_id", "operator_id", "mac"]:
-                if payload.get(k) is None and prev.get(k) is not None:
-                    payload[k] = prev.get(k)
-
-            changed = any(prev.get(k) != payload.get(k) for k in [
-                "msg_type", "operator_id", "lat", "lon", "alt_m", "mac", "basic_id", "source",
-                "operator_lat", "operator_lon", "home_lat", "home_lon"
-            ])
-            self.contacts[cid].update(payload)
-            if changed:
-                return [{"type": "RID_CONTACT_UPDATE", "ts": now_ts(), "contact": self.contacts[cid]}]
-            return []
+    def _estimate_scalar(self, ids: List[str], now_s: float) -> Dict[str, Any]:
+        b, c, q = self._buf, self._cap, self.q
+        out: Dict[str, Any] = {k: [] for k in ("age_s", "lat", "lon", "ve", "vn", "speed", "heading", "sigma", "vel_sigma")}
+        out["ids"] = ids
+        for cid in ids:
+            i = self._slot[cid]
+            age = max(now_s - b[self.T * c + i], 0.0)
+            dt = min(age, RID_KF_HORIZON_S)
+            dt2 = dt * dt
+            pos, var = [], 0.0
+            for p, v, pp, pv, vv in self._AXES:
+                pos.append(b[p * c + i] + b[v * c + i] * dt)
+                var += b[pp * c + i] + 2.0 * dt * b[pv * c + i] + dt2 * b[vv * c + i] + q * dt2 * dt / 3.0
+            vx, vy = b[self.VX * c + i], b[self.VY * c + i]
+            out["age_s"].append(age)
+            out["lat"].append(b[self.LAT0 * c + i] + pos[1] / _KF_M_PER_DEG_LAT)
+            out["lon"].append(b[self.LON0 * c + i] + pos[0] / b[self.KX * c + i])
+            out["ve"].append(vx)
+            out["vn"].append(vy)
+            out["speed"].append(math.hypot(vx, vy))
+            out["heading"].append(math.degrees(math.atan2(vx, vy)) % 360.0)
+            out["sigma"].append(math.sqrt(var))
+            out["vel_sigma"].append(math.sqrt(b[self.PVVX * c + i] + b[self.PVVY * c + i]))
+        return out
 
-    def expire(self) -> List[Dict[str, Any]]:
+# ---- RID registry (allowlist / watchlist) ----
+RID_REGISTRY_FILE = os.environ.get("NDEFENDER_RID_REGISTRY_FILE") or "/opt/ndefender/system/rid_registry.json"
+RID_REGISTRY_KINDS = ("serial", "operator")
+RID_REGISTRY_LISTS = {"allow": "friendly", "watch": "watchlist"}  # list -> classification
+_RID_CLASS_RANK = {"watchlist": 0, "friendly": 1}  # watchlist wins when both match
+
+class PrefixTrie:
+    """Character trie with longest-prefix lookup. Built once, then only read (swap, don't mutate)."""
+    __slots__ = ("_root", "size")
+
+    def __init__(self):
+        self._root: Dict[str, Any] = {}
+        self.size = 0
+
+    def insert(self, key: str, value: Any) -> None:
+        node = self._root
+        for ch in key:
+            node = node.setdefault(ch, {})
+        if "" not in node:
+            self.size += 1
+        node[""] = value  # "" never collides with a one-character edge
+
+    def get(self, key: str) -> Optional[Any]:
+        node = self._root
+        for ch in key:
+            node = node.get(ch)
+            if node is None:
+                return None
+        return node.get("")
+
+    def longest_prefix(self, s: str) -> Optional[Any]:
+        node = self._root
+        best = node.get("")
+        for ch in s:
+            node = node.get(ch)
+            if node is None:
+                break
+            if "" in node:
+                best = node[""]
+        return best
+
+# ---- ANSI/CTA-2063-A serial decoding ----
+# Serial = 4-char manufacturer code + 1-char length code (1-9, A-F => 1..15) + manufacturer serial.
+# Table keys are prefixes of the whole serial: "1581" names the vendor; longer keys may name models.
+# The code registry is not redistributable, so only DJI ships; sites add the codes they see to
+# CTA2063_FILE (keys starting with "_" are notes). Unknown codes still set mfr_code, and the most
+# frequent ones are listed in the registry stats as cta2063.unknown_codes.
+CTA2063_FILE = os.environ.get("NDEFENDER_CTA2063_FILE") or "/opt/ndefender/system/cta2063_manufacturers.json"
+DEFAULT_CTA2063_MANUFACTURERS = {"1581": "DJI"}
+CTA2063_UNKNOWN_CODES_MAX = 64  # distinct unknown codes remembered for the stats
+_CTA2063_MFR_CHARS = frozenset("0123456789ABCDEFGHJKLMNPQRSTUVWXYZ")  # no O or I
+_CTA2063_LEN_CODE = {c: i + 1 for i, c in enumerate("123456789ABCDEF")}
+_CTA2063_LOCK = threading.Lock()
+CTA2063_STATE: Dict[str, Any] = {
+    "file": CTA2063_FILE,
+    "file_loaded": False,
+    "entries": len(DEFAULT_CTA2063_MANUFACTURERS),
+    "named": 0,
+    "unknown_code": 0,
+    "not_cta2063": 0,
+}
+_CTA2063_UNKNOWN: Dict[str, int] = {}
+
+def load_cta2063_table(path: str = CTA2063_FILE) -> PrefixTrie:
+    table = dict(DEFAULT_CTA2063_MANUFACTURERS)
+    loaded = False
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if isinstance(data, dict):
+            table.update({str(k).strip().upper(): str(v) for k, v in data.items()
+                          if str(k).strip() and not str(k).startswith("_") and v})
+            loaded = True
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        print(f"CTA2063 table_load_failed path={path} err={e}", flush=True)
+    trie = PrefixTrie()
+    for k, v in table.items():
+        trie.insert(k, v)
+    with _CTA2063_LOCK:
+        CTA2063_STATE.update(file=path, file_loaded=loaded, entries=trie.size)
+    if trie.size <= len(DEFAULT_CTA2063_MANUFACTURERS):
+        print(f"CTA2063 table entries={trie.size} path={path}: manufacturer stays null for codes not listed", flush=True)
+    return trie
+
+_CTA2063_TRIE = PrefixTrie()
+for _k, _v in DEFAULT_CTA2063_MANUFACTURERS.items():
+    _CTA2063_TRIE.insert(_k, _v)
+
+def decode_cta2063(serial: Optional[str]) -> Tuple[Optional[str], Optional[str]]:
+    """(manufacturer code, manufacturer name) for a well-formed CTA-2063-A serial, else (None, None)."""
+    if not serial:
+        return None, None
+    s = serial.strip().upper()
+    code = s[:4]
+    n = _CTA2063_LEN_CODE.get(s[4:5])
+    if len(s) < 6 or n is None or len(s) != 5 + n or not _CTA2063_MFR_CHARS.issuperset(code):
+        with _CTA2063_LOCK:
+            CTA2063_STATE["not_cta2063"] += 1
+        return None, None
+    name = _CTA2063_TRIE.longest_prefix(s)
+    with _CTA2063_LOCK:
+        if name is not None:
+            CTA2063_STATE["named"] += 1
+        else:
+            CTA2063_STATE["unknown_code"] += 1
+            if code in _CTA2063_UNKNOWN or len(_CTA2063_UNKNOWN) < CTA2063_UNKNOWN_CODES_MAX:
+                _CTA2063_UNKNOWN[code] = _CTA2063_UNKNOWN.get(code, 0) + 1
+    return code, name
+
+def cta2063_stats() -> Dict[str, Any]:
+    with _CTA2063_LOCK:
+        top = sorted(_CTA2063_UNKNOWN.items(), key=lambda kv: -kv[1])[:10]
+        return dict(CTA2063_STATE, unknown_codes=dict(top))
+
+class RidRegistry:
+    """
+    Immutable allow/watch index over Remote ID serials and operator IDs: exact keys in one dict,
+    `prefix` entries (serial ranges) in a trie per kind. Reloading builds a new instance and
+    swaps the module global, so ingest never waits on a load.
+    """
+    def __init__(self, entries: List[Dict[str, Any]], version: int = 0):
+        self.version = version
+        self.loaded_ts = now_ts()
+        self._exact: Dict[Tuple[str, str], Tuple[str, Optional[str]]] = {}
+        self._tries: Dict[str, PrefixTrie] = {k: PrefixTrie() for k in RID_REGISTRY_KINDS}
+        counts = {"friendly": 0, "watchlist": 0, "prefix": 0}
+        for ent in entries:
+            cls = RID_REGISTRY_LISTS[ent["list"]]
+            hit = (cls, ent.get("label"))
+            key = ent["value"]
+            if ent.get("prefix"):
+                trie = self._tries[ent["kind"]]
+                old = trie.get(key)
+                if old is not None and _RID_CLASS_RANK[old[0]] < _RID_CLASS_RANK[cls]:
+                    continue
+                trie.insert(key, hit)
+                counts["prefix"] += 1
+            else:
+                old = self._exact.get((ent["kind"], key))
+                if old is not None and _RID_CLASS_RANK[old[0]] < _RID_CLASS_RANK[cls]:
+                    continue
+                self._exact[(ent["kind"], key)] = hit
+            counts[cls] += 1
+        self.counts = dict(counts, entries=len(entries))
+        self._has_prefix = {k: t.size > 0 for k, t in self._tries.items()}
+
+    def _match(self, kind: str, value: Optional[str]) -> Optional[Tuple[str, Optional[str]]]:
+        if not value:
+            return None
+        key = value.strip().upper()
+        hit = self._exact.get((kind, key))
+        if hit is None and self._has_prefix[kind]:
+            hit = self._tries[kind].longest_prefix(key)
+        return hit
+
+    def classify(self, basic_id: Optional[str], operator_id: Optional[str]) -> Tuple[Optional[str], Optional[str]]:
+        a = self._match("serial", basic_id)
+        b = self._match("operator", operator_id)
+        if a is None or (b is not None and _RID_CLASS_RANK[b[0]] < _RID_CLASS_RANK[a[0]]):
+            a = b
+        return a if a is not None else (None, None)
+
+    def stats(self) -> Dict[str, Any]:
+        return dict(self.counts, version=self.version, loaded_ts=self.loaded_ts, cta2063=cta2063_stats())
+
+def parse_rid_registry(body: Any) -> List[Dict[str, Any]]:
+    """
+    Accepts {"entries": [{list, kind, value, label?, prefix?}, ...]}, a bare list of those, or
+    CSV text with columns list,kind,value[,label] (header optional; a trailing '*' on value
+    marks a prefix). Raises ValueError naming the first bad entry.
+    """
+    if isinstance(body, (bytes, str)):
+        text = body.decode("utf-8-sig") if isinstance(body, bytes) else body
+        stripped = text.lstrip()
+        if stripped.startswith("{") or stripped.startswith("["):
+            body = json.loads(text)
+        else:
+            rows = []
+            for i, r in enumerate(csv.reader(io.StringIO(text))):
+                if not r or not "".join(r).strip() or r[0].strip().startswith("#"):
+                    continue
+                if i == 0 and r[0].strip().lower() == "list":
+                    continue
+                if len(r) < 3:
+                    raise ValueError(f"line {i + 1}: expected list,kind,value[,label]")
+                rows.append({"list": r[0], "kind": r[1], "value": r[2], "label": r[3] if len(r) > 3 else None})
+            body = rows
+    raw = body.get("entries") if isinstance(body, dict) else body
+    if not isinstance(raw, list):
+        raise ValueError("expected a list of entries")
+    out: List[Dict[str, Any]] = []
+    for i, ent in enumerate(raw):
+        if not isinstance(ent, dict):
+            raise ValueError(f"entry {i}: not an object")
+        lst = str(ent.get("list") or "").strip().lower()
+        kind = str(ent.get("kind") or "").strip().lower()
+        value = str(ent.get("value") or "").strip().upper()
+        prefix = bool(ent.get("prefix"))
+        if value.endswith("*"):
+            value, prefix = value[:-1], True
+        if lst not in RID_REGISTRY_LISTS:
+            raise ValueError(f"entry {i}: list must be one of {sorted(RID_REGISTRY_LISTS)}")
+        if kind not in RID_REGISTRY_KINDS:
+            raise ValueError(f"entry {i}: kind must be one of {list(RID_REGISTRY_KINDS)}")
+        if not value:
+            raise ValueError(f"entry {i}: empty value")
+        label = ent.get("label")
+        out.append({"list": lst, "kind": kind, "value": value, "prefix": prefix,
+                    "label": str(label).strip() or None if label is not None else None})
+    return out
+
+_RID_REGISTRY = RidRegistry([], version=0)
+_RID_REGISTRY_LOAD_LOCK = threading.Lock()
+
+def load_rid_registry(entries: List[Dict[str, Any]], persist: bool = True) -> Dict[str, Any]:
+    global _RID_REGISTRY
+    with _RID_REGISTRY_LOAD_LOCK:
+        reg = RidRegistry(entries, version=_RID_REGISTRY.version + 1)
+        if persist:
+            atomic_write_json(RID_REGISTRY_FILE, {"entries": entries})
+        _RID_REGISTRY = reg  # single reference swap; contacts re-classify on their next message
+    return reg.stats()
+
+def _load_rid_registry_file() -> None:
+    if not os.path.isfile(RID_REGISTRY_FILE):
+        return
+    try:
+        with open(RID_REGISTRY_FILE, "rb") as f:
+            load_rid_registry(parse_rid_registry(f.read()), persist=False)
+    except Exception as e:
+        print(f"RID_REGISTRY load failed: {e}", flush=True)
+
+# Diffed contact fields, in dirty-bit order; the rest of the record (id/type/last_ts/seq) is bookkeeping.
+RID_RECORD_FIELDS = (
+    "source", "msg_type", "operator_id", "basic_id", "mac",
+    "lat", "lon", "alt_m", "operator_lat", "operator_lon", "home_lat", "home_lon",
+)
+# Fields that keep their last known value when an update omits them
+RID_RECORD_STICKY = frozenset((
+    "lat", "lon", "alt_m", "operator_lat", "operator_lon", "home_lat", "home_lon", "basic_id", "operator_id", "mac",
+))
+# Coordinates travel as a unit in deltas so clients never see half a position
+_RID_FIELD_GROUPS = (("lat", "lon", "alt_m"), ("operator_lat", "operator_lon"), ("home_lat", "home_lon"))
+_RID_GROUP_OF = {f: g for g in _RID_FIELD_GROUPS for f in g}
+# Identity fields always ride along: UI rebuilds remote_id from each event before merging
+_RID_DELTA_ALWAYS = ("source", "msg_type", "operator_id", "basic_id", "mac")
+
+_RID_FIELD_SPECS = tuple((f, 1 << i, f in RID_RECORD_STICKY) for i, f in enumerate(RID_RECORD_FIELDS))
+# Derived at ingest from the record itself or its cadence (never from the message); dirty bits follow the fields'
+RID_RECORD_DERIVED = ("classification", "class_label", "mfr_code", "manufacturer", "stale_after_ms")
+_RID_DERIVED_BIT = {f: 1 << (len(RID_RECORD_FIELDS) + i) for i, f in enumerate(RID_RECORD_DERIVED)}
+_RID_BASIC_ID_BIT = 1 << RID_RECORD_FIELDS.index("basic_id")
+_RID_ID_BITS = _RID_BASIC_ID_BIT | (1 << RID_RECORD_FIELDS.index("operator_id"))
+
+class ContactRecord:
+    """Mutable per-contact state; `dirty` has bit i set when RID_RECORD_FIELDS[i] changed since the last event."""
+    __slots__ = ("id", "last_ts", "seq", "dirty", "reg_version") + RID_RECORD_FIELDS + RID_RECORD_DERIVED
+
+    def __init__(self, cid: str):
+        self.id = cid
+        self.last_ts = 0
+        self.seq = 0
+        self.dirty = 0
+        self.reg_version = -1
+        for f in RID_RECORD_FIELDS:
+            setattr(self, f, None)
+        for f in RID_RECORD_DERIVED:
+            setattr(self, f, None)
+
+    def apply(self, e: Dict[str, Any], ts: int) -> int:
+        dirty = 0
+        for f, bit, sticky in _RID_FIELD_SPECS:
+            v = e.get(f)
+            if v is None and sticky:
+                continue
+            if getattr(self, f) != v:
+                setattr(self, f, v)
+                dirty |= bit
+        self.last_ts = ts
+        self.dirty |= dirty
+        return dirty
+
+    def set_derived(self, f: str, v: Any) -> int:
+        if getattr(self, f) == v:
+            return 0
+        setattr(self, f, v)
+        bit = _RID_DERIVED_BIT[f]
+        self.dirty |= bit
+        return bit
+
+    @classmethod
+    def from_row(cls, r: Tuple[Any, ...]) -> "ContactRecord":
+        rec = cls(r[0])
+        rec.last_ts = int(r[1])
+        rec.seq = int(r[2])
+        for f, v in zip(RID_RECORD_FIELDS + RID_RECORD_DERIVED, r[3:]):
+            setattr(rec, f, v)
+        return rec
+
+    def row(self) -> Tuple[Any, ...]:
+        # Frozen copy for snapshots: a tuple is ~40% the size of the equivalent dict
+        return (
+            self.id, self.last_ts, self.seq,
+            self.source, self.msg_type, self.operator_id, self.basic_id, self.mac,
+            self.lat, self.lon, self.alt_m, self.operator_lat, self.operator_lon, self.home_lat, self.home_lon,
+            self.classification, self.class_label, self.mfr_code, self.manufacturer, self.stale_after_ms,
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return _rid_row_dict(self.row())
+
+    def take_delta(self) -> Dict[str, Any]:
+        # Changed fields (widened to their coordinate group) + identity; clears the dirty bits
+        d = {"id": self.id, "type": "REMOTE_ID", "last_ts": self.last_ts, "seq": self.seq, "delta": True}
+        for f in _RID_DELTA_ALWAYS:
+            d[f] = getattr(self, f)
+        d["stale_after_ms"] = self.stale_after_ms  # UI falls back to a fixed default without it
+        for f, bit, _ in _RID_FIELD_SPECS:
+            if self.dirty & bit and f not in d:
+                for g in _RID_GROUP_OF.get(f, (f,)):
+                    d[g] = getattr(self, g)
+        for f in RID_RECORD_DERIVED:
+            if self.dirty & _RID_DERIVED_BIT[f]:
+                d[f] = getattr(self, f)
+        self.dirty = 0
+        return d
+
+def _rid_row_dict(r: Tuple[Any, ...]) -> Dict[str, Any]:
+    # spelled out: a literal is ~2x faster than zipping field names
+    return {
+        "id": r[0],
+        "type": "REMOTE_ID",
+        "last_ts": r[1],
+        "seq": r[2],
+        "source": r[3],
+        "msg_type": r[4],
+        "operator_id": r[5],
+        "basic_id": r[6],
+        "mac": r[7],
+        "lat": r[8],
+        "lon": r[9],
+        "alt_m": r[10],
+        "operator_lat": r[11],
+        "operator_lon": r[12],
+        "home_lat": r[13],
+        "home_lon": r[14],
+        "classification": r[15],
+        "class_label": r[16],
+        "mfr_code": r[17],
+        "manufacturer": r[18],
+        "stale_after_ms": r[19],
+    }
+
+class ShardedRows:
+    """
+    Read-only id -> row mapping split into fixed hash shards. evolve() copies only the shards a
+    publish touches and shares every other shard with the previous version, so publishing costs
+    O(shards + touched shard sizes) rather than O(contacts).
+    """
+    __slots__ = ("_shards", "_len")
+
+    def __init__(self, shards: Tuple[Dict[str, Tuple[Any, ...]], ...], n: int):
+        self._shards = shards
+        self._len = n
+
+    @classmethod
+    def empty(cls, nshards: int = RID_SNAPSHOT_SHARDS) -> "ShardedRows":
+        return cls(tuple({} for _ in range(max(1, nshards))), 0)
+
+    def _shard(self, cid: str) -> Dict[str, Tuple[Any, ...]]:
+        return self._shards[hash(cid) % len(self._shards)]
+
+    def get(self, cid: str, default: Any = None) -> Any:
+        return self._shard(cid).get(cid, default)
+
+    def __getitem__(self, cid: str) -> Tuple[Any, ...]:
+        return self._shard(cid)[cid]
+
+    def __contains__(self, cid: str) -> bool:
+        return cid in self._shard(cid)
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __iter__(self):
+        for sh in self._shards:
+            yield from sh
+
+    def values(self):
+        for sh in self._shards:
+            yield from sh.values()
+
+    def evolve(self, upserts: Dict[str, Tuple[Any, ...]], removed: Set[str]) -> "ShardedRows":
+        shards = list(self._shards)
+        nshards = len(shards)
+        copied = [False] * nshards
+        n = self._len
+        for cid in removed:
+            i = hash(cid) % nshards
+            if cid in shards[i]:
+                if not copied[i]:
+                    copied[i] = True
+                    shards[i] = dict(shards[i])
+                del shards[i][cid]
+                n -= 1
+        for cid, row in upserts.items():
+            i = hash(cid) % nshards
+            sh = shards[i]
+            if not copied[i]:
+                copied[i] = True
+                sh = shards[i] = dict(sh)
+            if cid not in sh:
+                n += 1
+            sh[cid] = row
+        return ShardedRows(tuple(shards), n)
+
+class RecencyIndex:
+    """
+    The newest recency order any snapshot of one tracker has built: (version, [(-last_ts, id), ...])
+    sorted ascending, i.e. most recently seen first. Shared by all of the tracker's snapshots, so a
+    snapshot derives its order from it plus the changelog in one linear pass instead of re-sorting.
+    """
+    __slots__ = ("base",)
+
+    def __init__(self):
+        self.base: Optional[Tuple[int, List[Tuple[int, str]]]] = None
+
+class TrackerSnapshot:
+    """
+    Immutable published view of the tracker. Contacts are held as row tuples in a ShardedRows
+    that shares unchanged shards with the previous version; the recency order and the dicts
+    REST and WS consumers want are built on first read and cached, so publishing never pays for them.
+    """
+    __slots__ = ("version", "ts", "rows", "changelog", "_recency", "_order", "_targets", "_by_id")
+
+    def __init__(self, version: int, ts: int, rows: ShardedRows,
+                 changelog: Tuple[Tuple[int, frozenset, frozenset], ...], recency: Optional[RecencyIndex] = None):
+        self.version = version
+        self.ts = ts
+        self.rows = rows
+        self.changelog = changelog    # (version, upserted ids, removed ids)
+        self._recency = recency if recency is not None else RecencyIndex()
+        self._order: Optional[Tuple[str, ...]] = None
+        self._targets: Optional[Tuple[Dict[str, Any], ...]] = None
+        self._by_id: Optional[Dict[str, Dict[str, Any]]] = None
+
+    def __contains__(self, cid: str) -> bool:
+        return cid in self.rows
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    @property
+    def order(self) -> Tuple[str, ...]:
+        # contact ids, most recently seen first (contacts seen in the same ms in no particular order)
+        if self._order is None:
+            pairs = self._recency_pairs()
+            self._order = tuple(p[1] for p in pairs)
+            base = self._recency.base
+            if base is None or base[0] < self.version:
+                self._recency.base = (self.version, pairs)
+        return self._order
+
+    def _recency_pairs(self) -> List[Tuple[int, str]]:
+        rows = self.rows
+        base = self._recency.base
+        log = self.changelog
+        if base is None or base[0] > self.version or not log or base[0] < log[0][0] - 1:
+            return sorted((-r[1], r[0]) for r in rows.values())
+        if base[0] == self.version:
+            return base[1]
+        # drop what changed since the base, then put the touched contacts back in by last_ts
+        touched: Set[str] = set()
+        drop: Set[str] = set()
+        for v, up, rm in log:
+            if base[0] < v <= self.version:
+                touched |= up
+                drop |= rm
+        drop |= touched
+        pairs = [p for p in base[1] if p[1] not in drop]
+        head = sorted((-rows[cid][1], cid) for cid in touched if cid in rows)
+        if head and pairs and head[-1] > pairs[0]:
+            return sorted(head + pairs)  # two sorted runs: timsort merges them in one pass
+        return head + pairs
+
+    @property
+    def targets(self) -> Tuple[Dict[str, Any], ...]:
+        # racing readers may both build this; they produce equal tuples and one wins
+        if self._targets is None:
+            rows = self.rows
+            self._targets = tuple(_rid_row_dict(rows[cid]) for cid in self.order)
+        return self._targets
+
+    @property
+    def by_id(self) -> Dict[str, Dict[str, Any]]:
+        if self._by_id is None:
+            self._by_id = {c["id"]: c for c in self.targets}
+        return self._by_id
+
+class ContactTracker:
+    """
+    Writers (ingest/expire) serialize on self._lock and mutate ContactRecords in place;
+    publish() freezes the contacts touched since the last publish into rows and swaps in a
+    new TrackerSnapshot that readers use without locking.
+    """
+    def __init__(self, ttl_s: float, max_contacts: int = RID_MAX_CONTACTS):
+        self.ttl_ms = int(float(ttl_s) * 1000)
+        self.contacts: Dict[str, ContactRecord] = {}
+        self._tracks: Dict[str, TrackRing] = {}
+        self.kalman = KalmanBank() if RID_KF_ENABLE else None
+        self._kf_fixes: List[Tuple[str, float, float, float]] = []  # (cid, monotonic s, lat, lon)
+        self._lock = threading.RLock()
+        self._pending_up: Set[str] = set()
+        self._pending_rm: Set[str] = set()
+        self._changelog: deque = deque(maxlen=RID_CHANGELOG_LEN)
+        self._recency = RecencyIndex()
+        self._snapshot = TrackerSnapshot(0, now_ts(), ShardedRows.empty(), (), self._recency)
+        self._expiry = ExpiryWheel()
+        self.cadence = CadenceTtl(self.ttl_ms / 1000.0, RID_TTL_MIN_S, RID_TTL_MAX_S)
+        self.churn = ChurnStats()
+        self.msg_rate = RollingCounter()
+        self.max_contacts = max(1, int(max_contacts))
+        self._admit_global = TokenBucket(RID_ADMIT_GLOBAL_RATE, RID_ADMIT_GLOBAL_BURST)
+        self._admit_by_mac: "OrderedDict[str, TokenBucket]" = OrderedDict()
+        self._reject_ts = deque()
+        self.flood_since: Optional[int] = None
+        self._flood_last_reject = 0.0
+        self.admission = {
+            "admitted": 0,
+            "rejected_mac": 0,
+            "rejected_global": 0,
+            "rejected_capacity": 0,
+            "evicted": 0,
+            "floods": 0,
+        }
+
+    def _note_reject(self, reason: str) -> None:
+        self.admission[reason] += 1
+        t = time.monotonic()
+        self._reject_ts.append(t)
+        while self._reject_ts and (t - self._reject_ts[0]) > RID_FLOOD_WINDOW_S:
+            self._reject_ts.popleft()
+        self._flood_last_reject = t
+        if self.flood_since is None and len(self._reject_ts) >= RID_FLOOD_REJECTS:
+            self.flood_since = now_ts()
+            self.admission["floods"] += 1
+
+    def _admit(self, cid: str, e: Dict[str, Any]) -> Tuple[bool, List[Dict[str, Any]]]:
+        t = time.monotonic()
+        mac = str(e.get("mac") or "").lower() or cid
+        bucket = self._admit_by_mac.get(mac)
+        if bucket is None:
+            bucket = TokenBucket(RID_ADMIT_PER_MAC_RATE, RID_ADMIT_PER_MAC_BURST)
+            self._admit_by_mac[mac] = bucket
+            if len(self._admit_by_mac) > RID_ADMIT_MAX_MACS:
+                self._admit_by_mac.popitem(last=False)
+        else:
+            self._admit_by_mac.move_to_end(mac)
+        if not bucket.take(t):
+            self._note_reject("rejected_mac")
+            return False, []
+        if not self._admit_global.take(t):
+            self._note_reject("rejected_global")
+            return False, []
+
+        evicted: List[Dict[str, Any]] = []
+        if len(self.contacts) >= self.max_contacts:
+            has_pos = e.get("lat") is not None and e.get("lon") is not None
+            victim = self._eviction_victim(allow_positioned=has_pos)
+            if victim is None:
+                self._note_reject("rejected_capacity")
+                return False, []
+            del self.contacts[victim]
+            self._forget(victim)
+            self.churn.on_lost(victim)
+            self.admission["evicted"] += 1
+            evicted.append({"type": "RID_CONTACT_LOST", "ts": now_ts(), "id": victim})
+        self.admission["admitted"] += 1
+        return True, evicted
+
+    def _eviction_victim(self, allow_positioned: bool) -> Optional[str]:
+        # Prefer dropping contacts that never reported a position, oldest first.
+        best_nopos = None
+        best_any = None
+        for cid, c in self.contacts.items():
+            last = c.last_ts
+            if c.lat is None or c.lon is None:
+                if best_nopos is None or last < best_nopos[1]:
+                    best_nopos = (cid, last)
+            if best_any is None or last < best_any[1]:
+                best_any = (cid, last)
+        if best_nopos is not None:
+            return best_nopos[0]
+        if allow_positioned and best_any is not None:
+            return best_any[0]
+        return None
+
+    def flood_stats(self) -> Dict[str, Any]:
+        # called from stats/status threads; flood_since and admission change under the ingest lock
+        with self._lock:
+            if self.flood_since is not None and (time.monotonic() - self._flood_last_reject) > RID_FLOOD_CLEAR_S:
+                self.flood_since = None
+            return {
+                "state": "flood_detected" if self.flood_since is not None else "normal",
+                "since_ts": self.flood_since,
+                "max_contacts": self.max_contacts,
+                **self.admission,
+            }
+
+    def _forget(self, cid: str) -> None:
+        self._tracks.pop(cid, None)
+        if self.kalman is not None:
+            self.kalman.remove(cid)
+        self._expiry.cancel(cid)
+        self.cadence.forget(cid)
+        self._pending_up.discard(cid)
+        self._pending_rm.add(cid)
+
+    def ingest(self, e: Dict[str, Any]) -> List[Dict[str, Any]]:
+        with self._lock:
+            events = self._ingest_locked(e)
+            self._kf_flush()
+            return events
+
+    def ingest_batch(self, batch: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        # Ingest + expire + a single publish for the whole batch
+        events: List[Dict[str, Any]] = []
+        with self._lock:
+            for e in batch:
+                events.extend(self._ingest_locked(e))
+            self._kf_flush()
+            events.extend(self._expire_locked())
+            self._publish_locked()
+        return events
+
+    def _ingest_locked(self, e: Dict[str, Any]) -> List[Dict[str, Any]]:
+        # msgs_60s window: RollingCounter buckets by monotonic second
+        self.msg_rate.hit()
+
+        cid = stable_contact_id(e)
+
+        if cid == "rid:unknown":
+            return []
+        prev = self.contacts.get(cid)
+        admit_events: List[Dict[str, Any]] = []
+        if prev is None:
+            admitted, admit_events = self._admit(cid, e)
+            if not admitted:
+                return []
+
+        # TTL follows the contact's own cadence; deadlines are monotonic
+        t = now_ts()
+        mono = time.monotonic()
+        ttl_s = self.cadence.observe(cid, mono)
+        self._expiry.schedule(cid, mono + ttl_s)
+        self._pending_up.add(cid)
+        self._pending_rm.discard(cid)
+        lat, lon = e.get("lat"), e.get("lon")
+        if lat is not None and lon is not None:
+            track = self._tracks.get(cid)
+            if track is None:
+                track = self._tracks[cid] = TrackRing()
+            track.append(t, lat, lon, e.get("alt_m"))
+            if self.kalman is not None:
+                self._kf_fixes.append((cid, mono, lat, lon))
+        if e.get("alt_m") is not None:
+            _TIMESERIES.record(f"{cid}.alt_m", e.get("alt_m"), t)
+        if prev is None:
+            rec = self.contacts[cid] = ContactRecord(cid)
+            self._enrich(rec, rec.apply(e, t))
+            rec.stale_after_ms = stale_after_ms(ttl_s)
+            rec.seq = 1
+            rec.dirty = 0
+            self.churn.on_new(cid)
+            return admit_events + [{"type": "RID_CONTACT_NEW", "ts": t, "contact": rec.to_dict()}]
+        dirty = prev.apply(e, t)
+        if dirty | self._enrich(prev, dirty) | prev.set_derived("stale_after_ms", stale_after_ms(ttl_s)):
+            prev.seq += 1
+            return [{"type": "RID_CONTACT_UPDATE", "ts": t, "contact": prev.take_delta()}]
+        return []
+
+    @staticmethod
+    def _enrich(rec: ContactRecord, dirty: int) -> int:
+        # Derived fields are recomputed only when their inputs change (or the registry is swapped).
+        out = 0
+        reg = _RID_REGISTRY
+        if dirty & _RID_ID_BITS or rec.reg_version != reg.version:
+            rec.reg_version = reg.version
+            cls, label = reg.classify(rec.basic_id, rec.operator_id)
+            out |= rec.set_derived("classification", cls) | rec.set_derived("class_label", label)
+        if dirty & _RID_BASIC_ID_BIT:
+            code, name = decode_cta2063(rec.basic_id)
+            out |= rec.set_derived("mfr_code", code) | rec.set_derived("manufacturer", name)
+        return out
+
+    def expire(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            lost = self._expire_locked()
+            if lost:
+                self._publish_locked()
+            return lost
+
+    def _expire_locked(self) -> List[Dict[str, Any]]:
+        # Monotonic deadlines: immune to NTP/GPS wall-clock steps; O(expired) per call.
+        expired = self._expiry.pop_expired()
+        if not expired:
+            return []
         t = now_ts()
         lost: List[Dict[str, Any]] = []
-        for cid, c in list(self.contacts.items()):
-            if (t - float(c.get("last_ts", 0))) > self.ttl_ms:
+        for cid in expired:
+            if self.contacts.pop(cid, None) is not None:
+                self._forget(cid)
+                self.churn.on_lost(cid)
                 lost.append({"type": "RID_CONTACT_LOST", "ts": t, "id": cid})
-                del self.contacts[cid]
         return lost
 
+    def publish(self) -> TrackerSnapshot:
+        with self._lock:
+            return self._publish_locked()
+
+    def _publish_locked(self) -> TrackerSnapshot:
+        if not self._pending_up and not self._pending_rm:
+            return self._snapshot
+        version = self._snapshot.version + 1
+        up = frozenset(self._pending_up)
+        rm = frozenset(self._pending_rm)
+        self._changelog.append((version, up, rm))
+        self._pending_up.clear()
+        self._pending_rm.clear()
+        # one row per touched contact per publish, however many messages it got in the batch;
+        # untouched shards are shared with the previous snapshot
+        contacts = self.contacts
+        rows = self._snapshot.rows.evolve({cid: contacts[cid].row() for cid in up}, rm)
+        self._snapshot = TrackerSnapshot(version, now_ts(), rows, tuple(self._changelog), self._recency)
+        return self._snapshot
+
+    def snapshot(self) -> TrackerSnapshot:
+        # Lock-free O(1): attribute reads are atomic and the snapshot is immutable.
+        return self._snapshot
+
+    @staticmethod
+    def _changed_ids(snap: TrackerSnapshot, version: int) -> Tuple[bool, Set[str], Set[str]]:
+        # (full resync needed, upserted ids, removed ids) between `version` and snap
+        if version >= snap.version:
+            return False, set(), set()
+        if version <= 0 or not snap.changelog or snap.changelog[0][0] > version + 1:
+            return True, set(snap.rows), set()
+        upserted: Set[str] = set()
+        removed: Set[str] = set()
+        for v, up, rm in snap.changelog:
+            if v <= version:
+                continue
+            upserted.difference_update(rm)
+            removed.difference_update(up)
+            upserted.update(up)
+            removed.update(rm)
+        return False, upserted, removed
+
+    def changes_since(self, version: int) -> Dict[str, Any]:
+        snap = self._snapshot
+        full, upserted, removed = self._changed_ids(snap, version)
+        if full:
+            return {"version": snap.version, "full": True, "upserted": list(snap.targets), "removed": []}
+        return {
+            "version": snap.version,
+            "full": False,
+            "upserted": [_rid_row_dict(snap.rows[cid]) for cid in upserted if cid in snap.rows],
+            "removed": sorted(removed),
+        }
+
+    def checkpoint_delta(self, version: int, track_from: Dict[str, int]) -> Dict[str, Any]:
+        # For contacts changed since `version` (see WarmCheckpoint): row, learned cadence, oldest
+        # track ts and the track points from track_from[cid] (newest ts already saved) onwards.
+        # That last saved point is sent again because the newest ring point floats.
+        snap = self._snapshot
+        full, upserted, removed = self._changed_ids(snap, version)
+        out = []
+        with self._lock:
+            for cid in upserted:
+                row = snap.rows.get(cid)
+                if row is None:
+                    continue
+                ring = self._tracks.get(cid)
+                pts = ring.points(-1 if full else track_from.get(cid, 0) - 1) if ring is not None else []
+                out.append((cid, row, pts, ring.first_ts() if ring is not None else None, self.cadence.export(cid)))
+        return {"version": snap.version, "full": full, "upserted": out, "removed": list(removed)}
+
+    def restore(self, items: List[Tuple[Tuple[Any, ...], List[Tuple[Any, ...]], Optional[List[float]]]], now_ms: int) -> int:
+        # Re-seed from a checkpoint (row, track points, learned cadence). Each contact gets back
+        # the TTL its cadence had learned, less the time since it was last heard, on the
+        # monotonic clock like live contacts.
+        restored = 0
+        mono = time.monotonic()
+        with self._lock:
+            for row, pts, learned in sorted(items, key=lambda it: it[0][1]):
+                cid = row[0]
+                if cid in self.contacts or len(self.contacts) >= self.max_contacts:
+                    continue
+                age_s = max(0.0, (now_ms - int(row[1])) / 1000.0)
+                ttl_s = self.cadence.seed(cid, mono - age_s, learned)
+                if ttl_s <= age_s:
+                    self.cadence.forget(cid)
+                    continue
+                rec = self.contacts[cid] = ContactRecord.from_row(row)
+                self._enrich(rec, _RID_ID_BITS)  # derived fields follow the tables loaded now
+                rec.stale_after_ms = stale_after_ms(ttl_s)
+                rec.dirty = 0
+                self._pending_up.add(cid)
+                self._expiry.schedule(cid, mono + ttl_s - age_s)
+                if pts:
+                    ring = self._tracks[cid] = TrackRing()
+                    for p in pts:
+                        ring.append(*p)
+                    if self.kalman is not None:
+                        last = pts[-1]
+                        self._kf_fixes.append((cid, mono - max(0.0, (now_ms - last[0]) / 1000.0), last[1], last[2]))
+                restored += 1
+            self._kf_flush()
+            self._publish_locked()
+        return restored
+
+    def track(self, cid: str, since: int = 0, max_points: Optional[int] = None,
+              epsilon_m: float = RID_TRACK_EPSILON_M) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            ring = self._tracks.get(cid)
+            if ring is None:
+                return None if cid not in self.contacts else {"id": cid, "points_total": 0, "points": []}
+            pts = ring.points(since)
+        simplified = simplify_track(pts, epsilon_m, max_points)
+        return {"id": cid, "points_total": len(pts), "points": [list(p) for p in simplified]}
+
+    def track_tails(self, limit: int = RID_TRACK_TAIL_POINTS) -> Dict[str, List[List[Any]]]:
+        with self._lock:
+            return {cid: [list(p) for p in ring.points(0, limit)] for cid, ring in self._tracks.items()}
+
+    def _kf_flush(self) -> None:
+        # one vectorized filter step per batch; skip fixes of contacts evicted later in the batch
+        if self.kalman is not None and self._kf_fixes:
+            contacts = self.contacts
+            self.kalman.step([f for f in self._kf_fixes if f[0] in contacts])
+            self._kf_fixes.clear()
+
+    def estimate_arrays(self, now_s: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        if self.kalman is None:
+            return None
+        with self._lock:
+            self._kf_flush()
+            return self.kalman.estimate(time.monotonic() if now_s is None else now_s)
+
+    def estimates(self) -> Optional[List[Dict[str, Any]]]:
+        est = self.estimate_arrays()
+        if est is None:
+            return None
+        out: List[Dict[str, Any]] = []
+        for k, cid in enumerate(est["ids"]):
+            out.append({
+                "id": cid,
+                "age_s": round(float(est["age_s"][k]), 2),
+                "lat": float(est["lat"][k]),
+                "lon": float(est["lon"][k]),
+                "vn_mps": round(float(est["vn"][k]), 2),
+                "ve_mps": round(float(est["ve"][k]), 2),
+                "speed_mps": round(float(est["speed"][k]), 2),
+                "heading_deg": round(float(est["heading"][k]), 1),
+                "pos_sigma_m": round(float(est["sigma"][k]), 1),
+                "vel_sigma_mps": round(float(est["vel_sigma"][k]), 2),
+            })
+        return out
+
     def stats(self) -> Dict[str, Any]:
-        t = now_ts()
-        self._prune_60s(t)
-        return {"targets": len(self.contacts), "msgs_60s": len(self.msg_ts_60s)}
+        snap = self._snapshot
+        return {
+            "targets": len(snap),
+            "msgs_60s": self.msg_rate.count(60),
+            "rates": self.msg_rate.rates(),
+            "version": snap.version,
+            "flood": self.flood_stats(),
+            "ttl": self._ttl_stats(),
+            "churn": self.churn.stats(),
+            "kalman": {
+                "enabled": self.kalman is not None,
+                "contacts": len(self.kalman) if self.kalman is not None else 0,
+                "resets": self.kalman.resets if self.kalman is not None else 0,
+                "predict_fps": RID_PREDICT_FPS,
+            },
+        }
+
+    def _ttl_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return self.cadence.stats()
 
     def snapshot_targets(self) -> List[Dict[str, Any]]:
-        return sorted(self.contacts.values(), key=lambda x: x.get("last_ts", 0), reverse=True)
+        return list(self._snapshot.targets)
+
+# ---- Ingest queue (readers -> single tracker/publisher stage) ----
+INGEST_QUEUE_MAX = int(os.environ.get("NDEFENDER_INGEST_QUEUE_MAX") or "2000")
+INGEST_BATCH_MAX = int(os.environ.get("NDEFENDER_INGEST_BATCH_MAX") or "200")
+INGEST_ERROR_LOG_S = float(os.environ.get("NDEFENDER_INGEST_ERROR_LOG_S") or "10")
+
+# Lower value = more valuable. Under overload the highest value is shed first.
+INGEST_PRIO_CONTROL = 0   # first sighting of a contact, RF NEW/LOST
+INGEST_PRIO_LOCATION = 1  # position-bearing Remote ID records
+INGEST_PRIO_NORMAL = 2    # everything else (RF updates, system, ...)
+INGEST_PRIO_STATIC = 3    # BasicID/OperatorID/SelfID repeats for known contacts
+INGEST_PRIO_NAMES = ("control", "location", "normal", "static")
+
+class IngestQueue:
+    """
+    Bounded queue between file/socket readers and the ingest stage.
+    Items are dequeued in arrival order; when full, the oldest item of the
+    least valuable priority level is shed (or the new item, if it is the least valuable).
+    """
+    def __init__(self, maxlen: int, levels: int = len(INGEST_PRIO_NAMES)):
+        self.maxlen = max(1, int(maxlen))
+        self._levels = [deque() for _ in range(levels)]
+        self._size = 0
+        self._seq = 0
+        self._cond = threading.Condition()
+        self.enqueued = 0
+        self.processed = 0
+        self.max_depth = 0
+        self.dropped = [0] * levels
+        self.errors: Dict[str, int] = {}
+        self.last_error: Optional[str] = None
+        self._err_logged_at = -INGEST_ERROR_LOG_S
+        self._err_suppressed = 0
+
+    def put(self, kind: str, item: Any, prio: int = INGEST_PRIO_NORMAL) -> bool:
+        prio = max(0, min(len(self._levels) - 1, int(prio)))
+        with self._cond:
+            if self._size >= self.maxlen:
+                worst = None
+                for lvl in range(len(self._levels) - 1, -1, -1):
+                    if self._levels[lvl]:
+                        worst = lvl
+                        break
+                if worst is None or worst <= prio:
+                    self.dropped[prio] += 1
+                    return False
+                self._levels[worst].popleft()
+                self._size -= 1
+                self.dropped[worst] += 1
+            self._seq += 1
+            self._levels[prio].append((self._seq, kind, item))
+            self._size += 1
+            self.enqueued += 1
+            if self._size > self.max_depth:
+                self.max_depth = self._size
+            self._cond.notify()
+        return True
+
+    def get_batch(self, max_items: int, timeout: float) -> List[Tuple[str, Any]]:
+        out: List[Tuple[str, Any]] = []
+        with self._cond:
+            if self._size == 0:
+                self._cond.wait(timeout)
+            while self._size > 0 and len(out) < max_items:
+                head = None
+                for q in self._levels:
+                    if q and (head is None or q[0][0] < head[0][0]):
+                        head = q
+                _, kind, item = head.popleft()
+                self._size -= 1
+                out.append((kind, item))
+            self.processed += len(out)
+        return out
+
+    def note_error(self, stage: str, exc: BaseException) -> None:
+        # Count every failure; log only the first one per interval so a poison
+        # stream cannot flood the journal.
+        now = time.monotonic()
+        with self._cond:
+            self.errors[stage] = self.errors.get(stage, 0) + 1
+            self.last_error = f"{stage}: {type(exc).__name__}: {exc}"
+            if now - self._err_logged_at < INGEST_ERROR_LOG_S:
+                self._err_suppressed += 1
+                return
+            suppressed, self._err_suppressed = self._err_suppressed, 0
+            self._err_logged_at = now
+        print(f"INGEST error stage={stage} err={type(exc).__name__}: {exc} suppressed={suppressed}", flush=True)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "depth": self._size,
+                "max_depth": self.max_depth,
+                "capacity": self.maxlen,
+                "enqueued": self.enqueued,
+                "processed": self.processed,
+                "dropped_total": sum(self.dropped),
+                "dropped": {INGEST_PRIO_NAMES[i]: n for i, n in enumerate(self.dropped)},
+                "errors_total": sum(self.errors.values()),
+                "errors": dict(self.errors),
+                "last_error": self.last_error,
+            }
+
+_INGEST_QUEUE = IngestQueue(INGEST_QUEUE_MAX)
+
+def _rid_ingest_priority(tracker: Optional[ContactTracker], e: Dict[str, Any]) -> int:
+    if e.get("lat") is not None and e.get("lon") is not None:
+        return INGEST_PRIO_LOCATION
+    if tracker is None or stable_contact_id(e) not in tracker.snapshot():
+        return INGEST_PRIO_CONTROL
+    if (e.get("msg_type") or "").lower() in ("basic_id", "operator_id", "self_id"):
+        return INGEST_PRIO_STATIC
+    return INGEST_PRIO_NORMAL
+
+def _submit_rid_event(tracker: Optional[ContactTracker], e: Dict[str, Any]) -> bool:
+    return _INGEST_QUEUE.put("rid", e, _rid_ingest_priority(tracker, e))
+
+def _submit_rf_event(obj: Dict[str, Any]) -> bool:
+    evt = obj.get("type") or obj.get("event")
+    prio = INGEST_PRIO_CONTROL if evt in ("RF_CONTACT_NEW", "RF_CONTACT_LOST") else INGEST_PRIO_NORMAL
+    return _INGEST_QUEUE.put("rf", obj, prio)
+
+def _fusion_observe_rid(tracker: ContactTracker, batch: List[Dict[str, Any]]) -> None:
+    latest: Dict[str, int] = {}
+    for e in batch:
+        if e.get("freq_hz"):
+            latest[stable_contact_id(e)] = e["freq_hz"]
+    if not latest:
+        return
+    rows = tracker.snapshot().rows
+    for cid, freq_hz in latest.items():
+        row = rows.get(cid)
+        if row is None:
+            continue
+        c = _rid_row_dict(row)
+        fusion_observe("rid", cid, freq_hz, {
+            "stale_after_ms": c["stale_after_ms"],
+            "remote_id": {
+                "basic_id": c["basic_id"],
+                "operator_id": c["operator_id"],
+                "model": c["msg_type"],
+                "serial_id": c["basic_id"],
+                "drone_coords": {"lat": c["lat"], "lon": c["lon"], "alt_m": c["alt_m"]} if c["lat"] is not None and c["lon"] is not None else None,
+                "pilot_coords": {"lat": c["operator_lat"], "lon": c["operator_lon"]} if c["operator_lat"] is not None and c["operator_lon"] is not None else None,
+                "home_coords": {"lat": c["home_lat"], "lon": c["home_lon"]} if c["home_lat"] is not None and c["home_lon"] is not None else None,
+            },
+        })
+
+def ingest_worker(tracker: ContactTracker) -> None:
+    # Single consumer: tracker mutation and WS publishing never block the readers.
+    while not _stop.is_set():
+        batch = _INGEST_QUEUE.get_batch(INGEST_BATCH_MAX, timeout=0.5)
+        if not batch:
+            continue
+        rid_batch: List[Dict[str, Any]] = []
+        for kind, item in batch:
+            try:
+                if kind == "rid":
+                    if not _RID_DEDUPER.is_duplicate(item):
+                        rid_batch.append(item)
+                elif kind == "rf":
+                    _handle_antsdr_event(item)
+            except Exception as e:
+                _INGEST_QUEUE.note_error(kind, e)
+        try:
+            events = tracker.ingest_batch(rid_batch)
+        except Exception as e:
+            _INGEST_QUEUE.note_error("tracker", e)
+            events = []
+        for ev in events:
+            ws_broadcast(ev)
+        if FUSION_ENABLE:
+            try:
+                _fusion_observe_rid(tracker, rid_batch)
+            except Exception as e:
+                _INGEST_QUEUE.note_error("fusion", e)
 
 def load_jsonl(path: str, source: str) -> List[Dict[str, Any]]:
     out: List[Dict[str, Any]] = []
@@ -2065,11 +5328,11 @@ def replay_worker(tracker: ContactTracker) -> None:
             if _stop.is_set():
                 break
 
-            for ev in tracker.ingest(e):
-                ws_broadcast(ev)
+            if _RID_DEDUPER.is_duplicate(e):
+                continue
 
-            # expire may also be handled by expire_worker, but keep here too
-            for ev in tracker.expire():
+            # ingest + expire (expire_worker also runs) + publish
+            for ev in tracker.ingest_batch([e]):
                 ws_broadcast(ev)
 
             t = now_ts()
@@ -2151,27 +5414,7 @@ def remoteid_live_worker(tracker: ContactTracker) -> None:
             if not obj:
                 continue
 
-            if str(obj.get("type") or "").startswith("stats"):
-                continue
-
-            src = _str(obj.get("source")) or "live"
-            e = normalize_event(obj, source=src)
-            if not e:
-                continue
-
-            if not (e.get("basic_id") or e.get("operator_id") or e.get("mac") or (e.get("lat") is not None and e.get("lon") is not None)):
-                continue
-
-            t_ms = now_ms()
-            with _RID_LOCK:
-                REMOTEID_STATE["last_response_ts"] = t_ms
-                REMOTEID_STATE["last_error"] = None
-
-            for ev in tracker.ingest(e):
-                ws_broadcast(ev)
-
-            for ev in tracker.expire():
-                ws_broadcast(ev)
+            _submit_rid_obj(tracker, obj, "live")
 
         except FileNotFoundError:
             if fp is not None:
@@ -2185,6 +5428,176 @@ def remoteid_live_worker(tracker: ContactTracker) -> None:
             _set_rid_error("read_error")
             time.sleep(0.1)
 
+def _submit_rid_obj(tracker: Optional[ContactTracker], obj: Dict[str, Any], default_source: str) -> bool:
+    # Shared by the JSONL tailer and the datagram listeners
+    if str(obj.get("type") or "").startswith("stats"):
+        return False
+
+    src = _str(obj.get("source")) or default_source
+    e = normalize_event(obj, source=src)
+    if not e:
+        return False
+
+    if not (e.get("basic_id") or e.get("operator_id") or e.get("mac") or (e.get("lat") is not None and e.get("lon") is not None)):
+        return False
+
+    t_ms = now_ms()
+    with _RID_LOCK:
+        REMOTEID_STATE["last_response_ts"] = t_ms
+        REMOTEID_STATE["last_error"] = None
+
+    return _submit_rid_event(tracker, e)
+
+# ---- Datagram sensor ingest (UDP / Unix) ----
+# Accepts the same JSON shapes as the JSONL files (RF_CONTACT_* and Remote ID records),
+# one object per datagram or several newline-separated objects per datagram.
+INGEST_UDP_BIND = os.environ.get("NDEFENDER_INGEST_UDP_BIND", "127.0.0.1:9750").strip()
+INGEST_UNIX_PATH = os.environ.get("NDEFENDER_INGEST_UNIX_PATH", "").strip()
+INGEST_DGRAM_MAX_BYTES = 65535
+INGEST_DGRAM_BATCH = int(os.environ.get("NDEFENDER_INGEST_DGRAM_BATCH") or "256")
+INGEST_DGRAM_RCVBUF = int(os.environ.get("NDEFENDER_INGEST_DGRAM_RCVBUF") or str(4 * 1024 * 1024))
+INGEST_DGRAM_MAX_SENDERS = 256
+
+_DGRAM_LOCK = threading.Lock()
+_DGRAM_SENDERS: Dict[str, Dict[str, Any]] = {}
+DGRAM_STATE = {"udp_bind": None, "unix_path": None, "last_error": None}
+
+def _dgram_account(sender: str, nbytes: int, events: int, bad: int) -> None:
+    t = now_ms()
+    with _DGRAM_LOCK:
+        st = _DGRAM_SENDERS.get(sender)
+        if st is None:
+            if len(_DGRAM_SENDERS) >= INGEST_DGRAM_MAX_SENDERS:
+                oldest = min(_DGRAM_SENDERS, key=lambda k: _DGRAM_SENDERS[k]["last_ts"])
+                _DGRAM_SENDERS.pop(oldest, None)
+            st = _DGRAM_SENDERS[sender] = {
+                "datagrams": 0, "events": 0, "bytes": 0, "bad": 0,
+                "last_ts": t, "win_start": t, "win_events": 0, "events_per_s": 0.0,
+            }
+        st["datagrams"] += 1
+        st["events"] += events
+        st["bytes"] += nbytes
+        st["bad"] += bad
+        st["last_ts"] = t
+        st["win_events"] += events
+        if (t - st["win_start"]) >= 1000:
+            st["events_per_s"] = round(st["win_events"] * 1000.0 / (t - st["win_start"]), 1)
+            st["win_start"] = t
+            st["win_events"] = 0
+
+def dgram_ingest_snapshot() -> Dict[str, Any]:
+    with _DGRAM_LOCK:
+        senders = {
+            k: {kk: vv for kk, vv in v.items() if kk not in ("win_start", "win_events")}
+            for k, v in _DGRAM_SENDERS.items()
+        }
+        state = dict(DGRAM_STATE)
+    state["senders"] = senders
+    return state
+
+def _ingest_datagram(data: bytes, sender: str) -> None:
+    events = 0
+    bad = 0
+    try:
+        text = data.decode("utf-8", errors="ignore")
+    except Exception:
+        text = ""
+    for line in text.split("\n"):
+        if not line.strip():
+            continue
+        obj = parse_any_json_line(line)
+        if not isinstance(obj, dict):
+            bad += 1
+            continue
+        evt = obj.get("type") or obj.get("event")
+        if isinstance(evt, str) and evt.startswith("RF_CONTACT_"):
+            ok = _submit_rf_event(obj)
+        else:
+            ok = _submit_rid_obj(_TRACKER, obj, "udp")
+        if ok:
+            events += 1
+    _dgram_account(sender, len(data), events, bad)
+
+def _dgram_ingest_loop(sock: socket.socket, label: str) -> None:
+    # recvmmsg-style: block for the first datagram, then drain the socket
+    # without blocking (up to INGEST_DGRAM_BATCH) before going back to sleep.
+    buf = bytearray(INGEST_DGRAM_MAX_BYTES)
+    view = memoryview(buf)
+    sock.settimeout(0.5)
+    while not _stop.is_set():
+        try:
+            n, addr = sock.recvfrom_into(buf)
+        except socket.timeout:
+            continue
+        except OSError as e:
+            with _DGRAM_LOCK:
+                DGRAM_STATE["last_error"] = f"{label}:{e}"
+            time.sleep(0.2)
+            continue
+        batch = [(bytes(view[:n]), addr)]
+        sock.setblocking(False)
+        try:
+            while len(batch) < INGEST_DGRAM_BATCH:
+                try:
+                    n, addr = sock.recvfrom_into(buf)
+                except (BlockingIOError, InterruptedError):
+                    break
+                batch.append((bytes(view[:n]), addr))
+        finally:
+            sock.settimeout(0.5)
+        for data, addr in batch:
+            if isinstance(addr, tuple) and addr:
+                sender = f"{addr[0]}:{addr[1]}"
+            else:
+                sender = f"{label}:{addr or 'anon'}"
+            try:
+                _ingest_datagram(data, sender)
+            except Exception as e:
+                _INGEST_QUEUE.note_error(f"dgram_{label}", e)
+
+def udp_ingest_worker() -> None:
+    host, _, port = INGEST_UDP_BIND.rpartition(":")
+    try:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        try:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, INGEST_DGRAM_RCVBUF)
+        except OSError:
+            pass
+        sock.bind((host or "127.0.0.1", int(port)))
+    except Exception as e:
+        with _DGRAM_LOCK:
+            DGRAM_STATE["last_error"] = f"udp_bind_failed:{e}"
+        return
+    with _DGRAM_LOCK:
+        DGRAM_STATE["udp_bind"] = INGEST_UDP_BIND
+    try:
+        _dgram_ingest_loop(sock, "udp")
+    finally:
+        sock.close()
+
+def unix_ingest_worker() -> None:
+    try:
+        if os.path.exists(INGEST_UNIX_PATH):
+            os.unlink(INGEST_UNIX_PATH)
+        os.makedirs(os.path.dirname(INGEST_UNIX_PATH) or ".", exist_ok=True)
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        try:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, INGEST_DGRAM_RCVBUF)
+        except OSError:
+            pass
+        sock.bind(INGEST_UNIX_PATH)
+    except Exception as e:
+        with _DGRAM_LOCK:
+            DGRAM_STATE["last_error"] = f"unix_bind_failed:{e}"
+        return
+    with _DGRAM_LOCK:
+        DGRAM_STATE["unix_path"] = INGEST_UNIX_PATH
+    try:
+        _dgram_ingest_loop(sock, "unix")
+    finally:
+        sock.close()
+
 def remoteid_state_writer_worker(tracker: ContactTracker) -> None:
     while not _stop.is_set():
         try:
@@ -2255,6 +5668,88 @@ def expire_worker(tracker: ContactTracker, write_state: bool = True) -> None:
                 atomic_write_json(REMOTEID_STATE_FILE, cur)
         time.sleep(0.5)
 
+def timeseries_sampler_worker(tracker: ContactTracker) -> None:
+    # Gauges that only exist as a latest value; per-contact and RSSI series are recorded at ingest
+    while not _stop.is_set():
+        t = now_ms()
+        with _RF_SENSOR_LOCK:
+            rf_last = RF_SENSOR_STATE.get("last_response_ts")
+        store = _TIMESERIES
+        store.record("rf.events_per_s", _RATE_RF_EVENTS.rate(1), t)
+        store.record("rf.contacts", len(UNKNOWN_RF_CONTACTS), t)
+        store.record("rf.sensor_age_ms", t - rf_last if rf_last else None, t)
+        store.record("rid.msgs_per_s", tracker.msg_rate.rate(1), t)
+        store.record("rid.contacts", len(tracker.contacts), t)
+        store.record("ctrl.telemetry_per_s", _RATE_CTRL_TELEMETRY.rate(1), t)
+        store.record("ws.send_per_s", _RATE_WS_SEND.rate(1), t)
+        store.record("ingest.queue_depth", _INGEST_QUEUE.stats()["depth"], t)
+        if RF_SWEEP_SOCKET:
+            with _RF_SWEEP_LOCK:
+                store.record("rf.sweep_proc_ms", RF_SWEEP_STATE.get("proc_ms"), t)
+        _stop.wait(TIMESERIES_SAMPLE_S)
+
+def rid_predict_worker(tracker: ContactTracker) -> None:
+    # Publish Kalman-predicted positions between fixes so map markers glide instead of jumping.
+    # Sent as CONTACT_UPDATE deltas marked "predicted"; last_ts stays the real fix time so the
+    # UI's staleness logic is unaffected. Nothing is extrapolated past RID_KF_HORIZON_S.
+    period = 1.0 / RID_PREDICT_FPS
+    last_pub: Dict[str, Tuple[float, float]] = {}
+    while not _stop.is_set():
+        t0 = time.monotonic()
+        try:
+            est = tracker.estimate_arrays()
+            rows = tracker.snapshot().rows
+            if est and est["ids"]:
+                ts = now_ts()
+                seen: Set[str] = set()
+                for k, cid in enumerate(est["ids"]):
+                    age = float(est["age_s"][k])
+                    row = rows.get(cid)
+                    if row is None:
+                        continue
+                    if age > RID_KF_HORIZON_S:
+                        # past the horizon: put the marker back on the last real fix, once
+                        if last_pub.pop(cid, None) is not None:
+                            ws_broadcast({"type": "RID_CONTACT_UPDATE", "ts": ts, "contact": dict(
+                                _rid_row_dict(row), delta=True, predicted=False)})
+                        continue
+                    # fresh fixes were already broadcast by ingest
+                    if age < period:
+                        continue
+                    lat, lon = float(est["lat"][k]), float(est["lon"][k])
+                    seen.add(cid)
+                    prev = last_pub.get(cid)
+                    if prev is not None:
+                        dy = (lat - prev[0]) * _KF_M_PER_DEG_LAT
+                        dx = (lon - prev[1]) * _KF_M_PER_DEG_LON_EQ * math.cos(math.radians(lat))
+                        if math.hypot(dx, dy) < RID_PREDICT_MIN_MOVE_M:
+                            continue
+                    last_pub[cid] = (lat, lon)
+                    ws_broadcast({"type": "RID_CONTACT_UPDATE", "ts": ts, "contact": {
+                        "id": cid,
+                        "type": "REMOTE_ID",
+                        "last_ts": row[1],
+                        "delta": True,
+                        "predicted": True,
+                        "source": row[3],
+                        "msg_type": row[4],
+                        "operator_id": row[5],
+                        "basic_id": row[6],
+                        "mac": row[7],
+                        "lat": lat,
+                        "lon": lon,
+                        "alt_m": row[10],
+                        "stale_after_ms": row[19],
+                        "speed_mps": round(float(est["speed"][k]), 2),
+                        "heading_deg": round(float(est["heading"][k]), 1),
+                        "pos_sigma_m": round(float(est["sigma"][k]), 1),
+                    }})
+                for cid in [c for c in last_pub if c not in seen]:
+                    last_pub.pop(cid, None)
+        except Exception:
+            pass
+        _stop.wait(max(0.0, period - (time.monotonic() - t0)))
+
 def gpsd_worker() -> None:
     gps_state = {
         "mode": 0,
@@ -2340,215 +5835,827 @@ def _esp32_set_disconnected():
         FPV_STATE["freq_hz"] = None
         FPV_STATE["rssi_raw"] = None
         FPV_STATE["vrx"] = []
+    _ctrl_publish_state(now_ms())
 
-def esp32_worker():
+def _fusion_observe_fpv(vrx: Any, scan_state: str) -> None:
+    # every receiver holding a video lock is an FPV_LINK candidate on its tuned frequency
+    for v in vrx or []:
+        try:
+            if int(v.get("lock") or 0) != 1 or v.get("f") is None:
+                continue
+            freq_hz = int(v.get("f")) * 1000000
+        except Exception:
+            continue
+        fusion_observe("fpv", f"fpv:{freq_hz}", freq_hz, {
+            "fpv_link": {
+                "freq_hz": freq_hz,
+                "rssi_dbm": None,  # uncalibrated; raw value below
+                "rssi_raw": v.get("r") if v.get("r") is not None else v.get("raw"),
+                "lock_state": "hold" if scan_state == "hold" else "locked",
+                "band": fusion_band_label(freq_hz),
+                "vrx_id": v.get("id"),
+            },
+        })
+
+# ---- Controller serial link ----
+CTRL_RECONNECT_MIN_S = 0.5
+CTRL_RECONNECT_MAX_S = 8.0
+CTRL_WRITE_QUEUE_MAX = int(os.environ.get("NDEFENDER_CTRL_WRITE_QUEUE_MAX") or "64")
+
+class SerialLink:
     """
-    Read newline-delimited JSON from the controller over USB serial and emit TELEMETRY_UPDATE.
-    Device is auto-stable via /dev/ndefender-esp32 (udev).
+    Sole owner of the controller's serial port. run() is the reader: it opens the port, hands
+    every line to on_line and reopens with exponential backoff when the port goes away. A writer
+    thread drains a bounded queue onto the same handle, so commands never reopen the port
+    (no DTR toggle, no race with the reader). Writes queued for a dropped connection are discarded;
+    their callers time out waiting for the ack.
     """
-    while not _stop.is_set():
-        # Wait for device node
-        if not os.path.exists(CTRL_DEV):
-            _esp32_set_disconnected()
-            time.sleep(1.0)
-            continue
+    def __init__(self, dev: str, baud: int, on_line: Any, on_connect: Any = None, on_disconnect: Any = None,
+                 on_idle: Any = None, queue_max: int = CTRL_WRITE_QUEUE_MAX):
+        self.dev = dev
+        self.baud = int(baud)
+        self.on_line = on_line
+        self.on_connect = on_connect
+        self.on_disconnect = on_disconnect
+        self.on_idle = on_idle
+        self.queue_max = max(1, int(queue_max))
+        self._ser = None
+        self._wq: deque = deque()
+        self._cond = threading.Condition()
+        self.connected_since: Optional[int] = None
+        self.last_error: Optional[str] = None
+        self.connects = 0
+        self.disconnects = 0
+        self.rx_bytes = 0
+        self.rx_lines = 0
+        self.tx_bytes = 0
+        self.tx_lines = 0
+        self.bad_lines = 0
+        self.write_errors = 0
+        self.write_dropped = 0
+
+    @property
+    def connected(self) -> bool:
+        return self._ser is not None
+
+    def write_line(self, data: bytes, urgent: bool = False) -> Optional[str]:
+        # queue one newline-terminated frame (urgent ones go first); returns an error string if it can't be queued
+        with self._cond:
+            if self._ser is None:
+                return "not_connected"
+            if len(self._wq) >= self.queue_max:
+                self.write_dropped += 1
+                return "queue_full"
+            if urgent:
+                self._wq.appendleft(data)
+            else:
+                self._wq.append(data)
+            self._cond.notify_all()
+        return None
 
-        ser = None
+    def _drop(self, ser: Any, err: Optional[str]) -> None:
+        with self._cond:
+            if self._ser is not ser:
+                return
+            self._ser = None
+            self.connected_since = None
+            self.disconnects += 1
+            self.write_dropped += len(self._wq)
+            self._wq.clear()
+            if err:
+                self.last_error = err
+            self._cond.notify_all()
         try:
-            ser = serial.Serial(CTRL_DEV, CTRL_BAUD, timeout=1)
-            with _ctrl_lock:
-                CTRL_STATE["status"] = "CONNECTED"
-            buf_fail = 0
-
-            while not _stop.is_set():
-                line = ser.readline()
-                if not line:
-                    # stale check
-                    with _ctrl_lock:
-                        last = CTRL_STATE.get("last_ts")
-                    if last is not None and (now_ms() - int(last)) > CTRL_STALE_MS:
-                        with _ctrl_lock:
-                            CTRL_STATE["status"] = "DISCONNECTED"
-                    continue
+            ser.close()
+        except Exception:
+            pass
 
-                try:
-                    s = line.decode("utf-8", errors="ignore").strip()
-                except Exception:
-                    continue
-                if not s or not s.startswith("{"):
-                    continue
+    def _writer(self) -> None:
+        while not _stop.is_set():
+            with self._cond:
+                while not _stop.is_set() and (self._ser is None or not self._wq):
+                    self._cond.wait(0.5)
+                if _stop.is_set():
+                    return
+                ser = self._ser
+                data = self._wq.popleft()
+            try:
+                ser.write(data)
+                ser.flush()
+                self.tx_bytes += len(data)
+                self.tx_lines += 1
+            except Exception as e:
+                self.write_errors += 1
+                self._drop(ser, f"write_failed:{e}")
+
+    def run(self) -> None:
+        threading.Thread(target=self._writer, daemon=True).start()
+        backoff = CTRL_RECONNECT_MIN_S
+        while not _stop.is_set():
+            if not os.path.exists(self.dev):
+                if self.on_disconnect:
+                    self.on_disconnect()
+                time.sleep(1.0)
+                continue
+            try:
+                ser = serial.Serial(self.dev, self.baud, timeout=1)
+            except Exception as e:
+                self.last_error = f"open_failed:{e}"
+                if self.on_disconnect:
+                    self.on_disconnect()
+                time.sleep(backoff)
+                backoff = min(backoff * 2.0, CTRL_RECONNECT_MAX_S)
+                continue
+            with self._cond:
+                self._ser = ser
+                self.connected_since = now_ms()
+                self.connects += 1
+                self._cond.notify_all()
+            if self.on_connect:
+                self.on_connect()
+            err = None
+            try:
+                while not _stop.is_set() and self._ser is ser:
+                    line = ser.readline()
+                    if not line:
+                        if self.on_idle:
+                            self.on_idle()
+                        continue
+                    self.rx_bytes += len(line)
+                    self.rx_lines += 1
+                    backoff = CTRL_RECONNECT_MIN_S  # the link carried data; retry fast next time
+                    try:
+                        self.on_line(line)
+                    except Exception as e:
+                        self.last_error = f"handler:{e}"
+            except Exception as e:
+                err = f"read_failed:{e}"
+            self._drop(ser, err)
+            if self.on_disconnect:
+                self.on_disconnect()
+            if not _stop.is_set():
+                time.sleep(backoff)
+                backoff = min(backoff * 2.0, CTRL_RECONNECT_MAX_S)
 
-                try:
-                    msg = json.loads(s)
-                except Exception:
-                    buf_fail += 1
-                    if buf_fail > 50:
-                        buf_fail = 0
-                    continue
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            depth = len(self._wq)
+        return {
+            "dev": self.dev,
+            "connected": self.connected,
+            "connected_since": self.connected_since,
+            "connects": self.connects,
+            "disconnects": self.disconnects,
+            "last_error": self.last_error,
+            "rx": {"bytes": self.rx_bytes, "lines": self.rx_lines, "bad_lines": self.bad_lines},
+            "tx": {"bytes": self.tx_bytes, "lines": self.tx_lines, "errors": self.write_errors,
+                   "dropped": self.write_dropped, "queue_depth": depth},
+        }
 
-                mtype = msg.get("type")
-                if mtype == "cmd_ack":
-                    req_id = msg.get("req_id")
-                    if req_id:
-                        with _pending_lock:
-                            slot = _pending_cmd.get(str(req_id))
-                        if slot:
-                            slot["resp"] = msg
-                            slot["ev"].set()
-                    continue
-                if mtype not in ("telemetry", "scan_report"):
-                    continue
+def _ctrl_on_connect() -> None:
+    with _ctrl_lock:
+        CTRL_STATE["status"] = "CONNECTED"
+    _ctrl_publish_state(now_ms())
 
-                ts = now_ms()
-                sel = msg.get("sel")
-                vrx = msg.get("vrx") or []
-                vrx_snapshot = []
-                try:
-                    for v in vrx:
-                        if isinstance(v, dict):
-                            vrx_snapshot.append({
-                                "id": v.get("id"),
-                                "r": v.get("r"),
-                                "raw": v.get("raw"),
-                                "f": v.get("f"),
-                                "scan": v.get("scan"),
-                                "lock": v.get("lock"),
-                            })
-                except Exception:
-                    vrx_snapshot = []
+def _ctrl_on_idle() -> None:
+    # no line within the read timeout: mark stale telemetry and tell the UI once
+    with _ctrl_lock:
+        last = CTRL_STATE.get("last_ts")
+        stale = last is not None and (now_ms() - int(last)) > CTRL_STALE_MS and CTRL_STATE.get("status") != "DISCONNECTED"
+        if stale:
+            CTRL_STATE["status"] = "DISCONNECTED"
+    if stale:
+        _ctrl_publish_state(now_ms())
+
+def _ctrl_publish_state(ts: int) -> None:
+    # every CTRL_STATE/FPV_STATE change reaches the UI through the publisher
+    with _ctrl_lock:
+        data = {
+            "esp32": dict(CTRL_STATE),
+            "fpv": {
+                "scan_state": FPV_STATE.get("scan_state"),
+                "locked_channels": FPV_STATE.get("locked_channels") or [],
+                "selected": FPV_STATE.get("selected"),
+                "freq_hz": FPV_STATE.get("freq_hz"),
+                "rssi_raw": FPV_STATE.get("rssi_raw"),
+            }
+        }
+    _CTRL_TELEMETRY.offer(ts, data)
 
-                # pick selected receiver
-                chosen = None
-                try:
-                    for v in vrx:
-                        if v.get("id") == sel:
-                            chosen = v
-                            break
-                except Exception:
-                    chosen = None
+def _ctrl_handle_line(line: bytes) -> None:
+    """
+    One newline-delimited JSON frame from the controller: cmd_ack completes a pending command,
+    telemetry/scan_report update shared state and emit TELEMETRY_UPDATE.
+    """
+    try:
+        s = line.decode("utf-8", errors="ignore").strip()
+    except Exception:
+        return
+    if not s or not s.startswith("{"):
+        return
 
-                # derive scan_state
-                ui = msg.get("ui") or {}
-                hold = int(ui.get("hold") or 0)
-                any_scan = False
-                locked = []
-                try:
-                    for v in vrx:
-                        if int(v.get("scan") or 0) == 1:
-                            any_scan = True
-                        if int(v.get("lock") or 0) == 1:
-                            locked.append(int(v.get("id")))
-                except Exception:
-                    pass
+    try:
+        msg = json.loads(s)
+    except Exception:
+        _CTRL_LINK.bad_lines += 1
+        return
 
-                scan_state = "idle"
-                if hold == 1:
-                    scan_state = "hold"
-                elif any_scan:
-                    scan_state = "scanning"
+    mtype = msg.get("type")
+    if mtype == "cmd_ack":
+        _CTRL_CMDS.on_ack(msg)
+        return
+    if mtype not in ("telemetry", "scan_report"):
+        return
 
-                freq_hz = None
-                rssi_raw = None
-                if chosen is not None:
-                    try:
-                        f = chosen.get("f")
-                        if f is not None:
-                            freq_hz = int(f) * 1000000
-                    except Exception:
-                        freq_hz = None
-                    try:
-                        rssi_raw = int(chosen.get("r") if chosen.get("r") is not None else chosen.get("raw"))
-                    except Exception:
-                        rssi_raw = None
-
-                # update shared state
-                with _ctrl_lock:
-                    CTRL_STATE["status"] = "CONNECTED"
-                    CTRL_STATE["uptime_seconds"] = float(msg.get("esp_ms") or 0) / 1000.0
-                    CTRL_STATE["last_ts"] = ts
-                    # rssi_dbm unknown calibration -> keep None
-                    CTRL_STATE["rssi_dbm"] = None
-
-                    FPV_STATE["scan_state"] = scan_state
-                    FPV_STATE["locked_channels"] = locked
-                    FPV_STATE["selected"] = sel
-                    FPV_STATE["freq_hz"] = freq_hz
-                    FPV_STATE["rssi_raw"] = rssi_raw
-                    FPV_STATE["vrx"] = vrx_snapshot
-
-                # emit WS event
-                ws_broadcast({
-                    "type": "TELEMETRY_UPDATE",
-                    "timestamp": ts,
-                    "source": "esp32",
-                    "data": {
-                        "esp32": dict(CTRL_STATE),
-                        "fpv": {
-                            "scan_state": FPV_STATE.get("scan_state"),
-                            "locked_channels": FPV_STATE.get("locked_channels") or [],
-                            "selected": FPV_STATE.get("selected"),
-                            "freq_hz": FPV_STATE.get("freq_hz"),
-                            "rssi_raw": FPV_STATE.get("rssi_raw"),
-                        }
-                    }
+    ts = now_ms()
+    sel = msg.get("sel")
+    vrx = msg.get("vrx") or []
+    vrx_snapshot = []
+    try:
+        for v in vrx:
+            if isinstance(v, dict):
+                vrx_snapshot.append({
+                    "id": v.get("id"),
+                    "r": v.get("r"),
+                    "raw": v.get("raw"),
+                    "f": v.get("f"),
+                    "scan": v.get("scan"),
+                    "lock": v.get("lock"),
                 })
+    except Exception:
+        vrx_snapshot = []
+
+    # pick selected receiver
+    chosen = None
+    try:
+        for v in vrx:
+            if v.get("id") == sel:
+                chosen = v
+                break
+    except Exception:
+        chosen = None
+
+    # derive scan_state
+    ui = msg.get("ui") or {}
+    hold = int(ui.get("hold") or 0)
+    any_scan = False
+    locked = []
+    try:
+        for v in vrx:
+            if int(v.get("scan") or 0) == 1:
+                any_scan = True
+            if int(v.get("lock") or 0) == 1:
+                locked.append(int(v.get("id")))
+    except Exception:
+        pass
+
+    scan_state = "idle"
+    if hold == 1:
+        scan_state = "hold"
+    elif any_scan:
+        scan_state = "scanning"
 
+    freq_hz = None
+    rssi_raw = None
+    if chosen is not None:
+        try:
+            f = chosen.get("f")
+            if f is not None:
+                freq_hz = int(f) * 1000000
         except Exception:
-            _esp32_set_disconnected()
-            time.sleep(1.0)
-        finally:
-            try:
-                if ser is not None:
-                    ser.close()
-            except Exception:
-                pass
+            freq_hz = None
+        try:
+            rssi_raw = int(chosen.get("r") if chosen.get("r") is not None else chosen.get("raw"))
+        except Exception:
+            rssi_raw = None
 
+    # update shared state
+    with _ctrl_lock:
+        CTRL_STATE["status"] = "CONNECTED"
+        CTRL_STATE["uptime_seconds"] = float(msg.get("esp_ms") or 0) / 1000.0
+        CTRL_STATE["last_ts"] = ts
+        # rssi_dbm unknown calibration -> keep None
+        CTRL_STATE["rssi_dbm"] = None
+
+        FPV_STATE["scan_state"] = scan_state
+        FPV_STATE["locked_channels"] = locked
+        FPV_STATE["selected"] = sel
+        FPV_STATE["freq_hz"] = freq_hz
+        FPV_STATE["rssi_raw"] = rssi_raw
+        FPV_STATE["vrx"] = vrx_snapshot
+
+    _RATE_CTRL_TELEMETRY.hit()
+    _TIMESERIES.record("fpv.rssi_raw", rssi_raw, ts)
+    for v in vrx_snapshot:
+        v_rssi = v["r"] if v["r"] is not None else v["raw"]
+        _TIMESERIES.record(f"fpv.vrx{v.get('id')}.rssi_raw", v_rssi, ts)
+        f_mhz = _float(v["f"])
+        if f_mhz is None:
+            continue
+        _FPV_SPECTRUM.observe(f_mhz, _float(v_rssi), ts)
+        if _to_int(v["lock"]) == 1:
+            _RF_HEATMAP.add(f_mhz * 1e6, FPV_CHANNEL_BW_HZ, ts)
+    if FUSION_ENABLE:
+        _fusion_observe_fpv(vrx, scan_state)
 
+    # emit WS event (diffed + rate-limited)
+    _ctrl_publish_state(ts)
 
+# ---- Controller telemetry publishing ----
+TELEMETRY_MAX_HZ = float(os.environ.get("NDEFENDER_TELEMETRY_MAX_HZ") or "5")
+TELEMETRY_KEEPALIVE_S = float(os.environ.get("NDEFENDER_TELEMETRY_KEEPALIVE_S") or "2")  # UI shows stale past 5 s
+_RATE_TELEMETRY_SENT = RollingCounter()
 
-def esp32_send_cmd(cmd_obj: dict, timeout_s: float = 1.0) -> dict:
+class TelemetryPublisher:
     """
-    Send a JSON command to the controller over serial and wait for cmd_ack matching req_id.
-    Returns dict: {"ok": bool, "resp": dict|None, "err": str|None}
+    Gate in front of TELEMETRY_UPDATE. Each candidate is compared with the last one published:
+    a transition (link status, scan state, locked set, selected receiver) goes out at once,
+    other changes (RSSI, tuned frequency) are coalesced to max_hz with the newest state winning,
+    and an unchanged state is only re-sent as a keepalive. Uptime and last_ts tick on every line
+    and never count as a change on their own. A flusher thread sends the newest coalesced state
+    as soon as its slot opens, so the trailing edge does not wait for the next line.
     """
-    req_id = str(cmd_obj.get("req_id") or "")
-    if not req_id:
-        return {"ok": False, "resp": None, "err": "missing_req_id"}
+    def __init__(self, max_hz: float = TELEMETRY_MAX_HZ, keepalive_s: float = TELEMETRY_KEEPALIVE_S):
+        self.min_interval = 1.0 / max_hz if max_hz > 0 else 0.0
+        self.keepalive_s = float(keepalive_s)
+        self._lock = threading.Lock()
+        self._cond = threading.Condition(self._lock)
+        self._flusher: Optional[threading.Thread] = None
+        self._key: Optional[Tuple[Any, ...]] = None
+        self._tkey: Optional[Tuple[Any, ...]] = None
+        self._last_sent = 0.0
+        self._pending: Optional[Tuple[int, Dict[str, Any]]] = None
+        self.offered = 0
+        self.sent = 0
+        self.transitions = 0
+        self.keepalives = 0
+        self.suppressed_unchanged = 0
+        self.suppressed_rate = 0
+
+    @staticmethod
+    def _keys(data: Dict[str, Any]) -> Tuple[Tuple[Any, ...], Tuple[Any, ...]]:
+        e, f = data["esp32"], data["fpv"]
+        tkey = (e.get("status"), f.get("scan_state"), tuple(f.get("locked_channels") or ()), f.get("selected"))
+        return tkey + (e.get("rssi_dbm"), f.get("freq_hz"), f.get("rssi_raw")), tkey
+
+    def offer(self, ts: int, data: Dict[str, Any]) -> None:
+        key, tkey = self._keys(data)
+        now = time.monotonic()
+        with self._lock:
+            self.offered += 1
+            if tkey != self._tkey:
+                self.transitions += 1
+            elif key != self._key:
+                if now - self._last_sent < self.min_interval:
+                    self._pending = (ts, data)
+                    self.suppressed_rate += 1
+                    self._arm_locked()
+                    return
+            elif now - self._last_sent >= self.keepalive_s:
+                self.keepalives += 1
+            else:
+                self._pending = None  # back to what the UI already has
+                self.suppressed_unchanged += 1
+                return
+            self._mark_locked(key, tkey, now)
+        self._publish(ts, data)
+
+    def _arm_locked(self) -> None:
+        if self._flusher is None:
+            self._flusher = threading.Thread(target=self._flush_loop, name="telemetry-flush", daemon=True)
+            self._flusher.start()
+        self._cond.notify()
+
+    def _flush_loop(self) -> None:
+        while not _stop.is_set():
+            with self._cond:
+                if self._pending is None:
+                    self._cond.wait(1.0)
+                    continue
+                delay = self._last_sent + self.min_interval - time.monotonic()
+                if delay > 0:
+                    self._cond.wait(delay)
+                    continue
+            self.flush()
+
+    def flush(self) -> None:
+        # trailing edge: send the coalesced change once its slot opens
+        now = time.monotonic()
+        with self._lock:
+            if self._pending is None or now - self._last_sent < self.min_interval:
+                return
+            ts, data = self._pending
+            key, tkey = self._keys(data)
+            self._mark_locked(key, tkey, now)
+        self._publish(ts, data)
+
+    def _mark_locked(self, key: Tuple[Any, ...], tkey: Tuple[Any, ...], now: float) -> None:
+        self._key, self._tkey = key, tkey
+        self._last_sent = now
+        self._pending = None
+        self.sent += 1
+
+    @staticmethod
+    def _publish(ts: int, data: Dict[str, Any]) -> None:
+        _RATE_TELEMETRY_SENT.hit()
+        ws_broadcast({"type": "TELEMETRY_UPDATE", "timestamp": ts, "source": "esp32", "data": data})
 
-    slot = {"ev": threading.Event(), "resp": None}
-    with _pending_lock:
-        _pending_cmd[req_id] = slot
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "max_hz": round(1.0 / self.min_interval, 2) if self.min_interval else None,
+                "keepalive_s": self.keepalive_s,
+                "offered": self.offered,
+                "sent": self.sent,
+                "transitions": self.transitions,
+                "keepalives": self.keepalives,
+                "suppressed_unchanged": self.suppressed_unchanged,
+                "suppressed_rate": self.suppressed_rate,
+                "pending": self._pending is not None,
+            }
 
-    try:
-        line = (json.dumps(cmd_obj, separators=(",", ":"), ensure_ascii=False) + "\n").encode("utf-8")
+_CTRL_TELEMETRY = TelemetryPublisher()
+
+# ---- FPV RSSI spectrum + waterfall ----
+FPV_SPECTRUM_MIN_MHZ = float(os.environ.get("NDEFENDER_FPV_SPECTRUM_MIN_MHZ") or "5300")
+FPV_SPECTRUM_MAX_MHZ = float(os.environ.get("NDEFENDER_FPV_SPECTRUM_MAX_MHZ") or "6000")
+FPV_SPECTRUM_STEP_MHZ = float(os.environ.get("NDEFENDER_FPV_SPECTRUM_STEP_MHZ") or "1")
+FPV_PEAK_HOLD_S = float(os.environ.get("NDEFENDER_FPV_PEAK_HOLD_S") or "5")
+FPV_PEAK_DECAY_S = float(os.environ.get("NDEFENDER_FPV_PEAK_DECAY_S") or "10")
+FPV_WATERFALL_ROW_S = float(os.environ.get("NDEFENDER_FPV_WATERFALL_ROW_S") or "1")
+FPV_WATERFALL_ROWS = int(os.environ.get("NDEFENDER_FPV_WATERFALL_ROWS") or "120")
+FPV_SPECTRUM_WS_HZ = float(os.environ.get("NDEFENDER_FPV_SPECTRUM_WS_HZ") or "1")  # 0 = REST only
+FPV_SPECTRUM_KEYFRAME_S = float(os.environ.get("NDEFENDER_FPV_SPECTRUM_KEYFRAME_S") or "10")
+FPV_SPECTRUM_LIVE_S = 30.0  # bins unheard for longer drop out of the sparse spectrum
+
+class FpvSpectrum:
+    """
+    Per-frequency RSSI from receiver telemetry and scan reports, in float32 arrays indexed by
+    frequency bin (raw controller units; NaN = no reading). `cur` is the latest reading per bin.
+    `peak` holds the highest reading for hold_s, then decays exponentially toward the live level
+    with time constant decay_s. The waterfall is a ring of rows, each the per-bin max over row_s.
+    Each bin remembers the version of its last reading, so spectrum(since=v) returns only the bins
+    that changed after version v.
+    """
+    def __init__(self, f_min_mhz: float, f_max_mhz: float, step_mhz: float, hold_s: float, decay_s: float,
+                 row_s: float, rows: int):
+        self.f_min = float(f_min_mhz)
+        self.step = max(0.001, float(step_mhz))
+        self.bins = max(1, int((float(f_max_mhz) - self.f_min) / self.step) + 1)
+        self.hold_s = max(0.0, float(hold_s))
+        self.decay_s = max(0.001, float(decay_s))
+        self.row_ms = max(1, int(float(row_s) * 1000))
+        self.rows = max(1, int(rows))
+        nan_row = [math.nan] * self.bins
+        self._cur = array("f", nan_row)
+        self._cur_t = array("d", [0.0] * self.bins)  # monotonic
+        self._peak = array("f", nan_row)
+        self._peak_t = array("d", [0.0] * self.bins)
+        self._ver = array("q", [0] * self.bins)
+        self._nan_row = array("f", nan_row)
+        self._wf = array("f", nan_row * self.rows)
+        self._wf_row = array("q", [-1] * self.rows)
+        self._lock = threading.Lock()
+        self._col_lo = self.bins  # columns ever observed, to crop the waterfall
+        self._col_hi = 0
+        self.version = 0
+        self.samples = 0
+        self.out_of_range = 0
+
+    def _peak_at(self, i: int, now: float) -> float:
+        p = self._peak[i]
+        age = now - self._peak_t[i]
+        if p != p or age <= self.hold_s:
+            return p
+        c = self._cur[i]
+        return c + (p - c) * math.exp(-(age - self.hold_s) / self.decay_s)
+
+    def observe(self, f_mhz: float, rssi: Optional[float], ts_ms: Optional[int] = None) -> None:
+        if rssi is None or not math.isfinite(rssi):
+            return
+        i = int(round((f_mhz - self.f_min) / self.step))
+        if not 0 <= i < self.bins:
+            self.out_of_range += 1
+            return
+        now = time.monotonic()
+        row = (int(time.time() * 1000) if ts_ms is None else int(ts_ms)) // self.row_ms
+        with self._lock:
+            eff = self._peak_at(i, now)
+            self._cur[i] = rssi
+            self._cur_t[i] = now
+            if eff != eff or rssi >= eff:
+                self._peak[i] = rssi
+                self._peak_t[i] = now
+            elif now - self._peak_t[i] > self.hold_s:
+                # re-base the decaying peak on the new live level without restarting the hold
+                self._peak[i] = eff
+                self._peak_t[i] = now - self.hold_s
+            self.version += 1
+            self._ver[i] = self.version
+            r = row % self.rows
+            held = self._wf_row[r]
+            if held != row:
+                if held > row:
+                    return  # older than the waterfall
+                self._wf[r * self.bins:(r + 1) * self.bins] = self._nan_row
+                self._wf_row[r] = row
+            k = r * self.bins + i
+            w = self._wf[k]
+            if w != w or rssi > w:
+                self._wf[k] = rssi
+            self._col_lo = min(self._col_lo, i)
+            self._col_hi = max(self._col_hi, i + 1)
+            self.samples += 1
+
+    def spectrum(self, live_s: float = FPV_SPECTRUM_LIVE_S, since: int = -1) -> Dict[str, Any]:
+        # sparse: [freq_mhz, current, peak, age_ms] for every bin heard within live_s,
+        # or with since >= 0 only the bins read after that version
+        now = time.monotonic()
+        out = []
+        with self._lock:
+            for i in range(self.bins):
+                t = self._cur_t[i]
+                if t and now - t <= live_s and self._ver[i] > since:
+                    out.append([round(self.f_min + i * self.step, 3), round(self._cur[i], 1),
+                                round(self._peak_at(i, now), 1), int((now - t) * 1000)])
+            version = self.version
+        return {"ts": now_ms(), "version": version, "since": since if since >= 0 else None, "step_mhz": self.step,
+                "live_s": live_s, "hold_s": self.hold_s, "decay_s": self.decay_s, "bins": out}
+
+    def waterfall(self) -> Dict[str, Any]:
+        # rows oldest first, cropped to the columns ever observed; f32le, NaN = no reading
+        cur = int(time.time() * 1000) // self.row_ms
+        first = cur - self.rows + 1
+        grid = array("f")
+        with self._lock:
+            c0, c1 = (self._col_lo, self._col_hi) if self._col_hi else (0, 0)
+            nan_row = self._nan_row[c0:c1]
+            for b in range(first, cur + 1):
+                r = b % self.rows
+                base = r * self.bins
+                grid.extend(self._wf[base + c0:base + c1] if self._wf_row[r] == b else nan_row)
+        if sys.byteorder == "big":
+            grid.byteswap()
+        return {
+            "t0_ms": first * self.row_ms,
+            "row_ms": self.row_ms,
+            "rows": self.rows,
+            "col0_mhz": round(self.f_min + c0 * self.step, 3),
+            "cols": c1 - c0,
+            "step_mhz": self.step,
+            "encoding": "f32le+zlib+base64",
+            "data": base64.b64encode(zlib.compress(grid.tobytes(), 6)).decode("ascii"),
+        }
 
-        # write
-        with _ctrl_ser_lock:
-            # open a dedicated serial writer each time (safe, simple)
-            # (esp32_worker uses its own serial for reading)
-            try:
-                ser = serial.Serial(CTRL_DEV, CTRL_BAUD, timeout=1)
-            except Exception as e:
-                return {"ok": False, "resp": None, "err": f"open_failed:{e}"}
-            try:
-                ser.write(line)
-                ser.flush()
-            finally:
-                try: ser.close()
-                except Exception: pass
+    def stats(self) -> Dict[str, Any]:
+        return {"bins": self.bins, "samples": self.samples, "out_of_range": self.out_of_range,
+                "hold_s": self.hold_s, "decay_s": self.decay_s}
 
-        # wait for ack
-        if not slot["ev"].wait(timeout=timeout_s):
-            return {"ok": False, "resp": None, "err": "timeout"}
+_FPV_SPECTRUM = FpvSpectrum(FPV_SPECTRUM_MIN_MHZ, FPV_SPECTRUM_MAX_MHZ, FPV_SPECTRUM_STEP_MHZ, FPV_PEAK_HOLD_S,
+                            FPV_PEAK_DECAY_S, FPV_WATERFALL_ROW_S, FPV_WATERFALL_ROWS)
 
-        resp = slot["resp"]
-        ok = bool(resp.get("ok")) if isinstance(resp, dict) else False
-        err = resp.get("err") if isinstance(resp, dict) else "bad_resp"
-        return {"ok": ok, "resp": resp, "err": err}
+def fpv_spectrum_snapshot(with_waterfall: bool = False) -> Dict[str, Any]:
+    out = _FPV_SPECTRUM.spectrum()
+    if with_waterfall:
+        out["waterfall"] = _FPV_SPECTRUM.waterfall()
+    return out
 
-    finally:
-        with _pending_lock:
-            _pending_cmd.pop(req_id, None)
+def fpv_spectrum_worker() -> None:
+    """
+    Push TELEMETRY_UPDATE {fpv_spectrum} whenever new readings came in. Normally only the bins read
+    since the previous push go out ("since" = that push's version); a client holding version v may
+    apply a delta whose since <= v and otherwise waits for the next full keyframe (since null),
+    sent every FPV_SPECTRUM_KEYFRAME_S, or fetches /api/v1/fpv/spectrum. Bins age out client-side
+    after live_s; peaks decay with hold_s/decay_s.
+    """
+    sent_version = -1
+    last_full = 0.0
+    while not _stop.wait(1.0 / FPV_SPECTRUM_WS_HZ):
+        version = _FPV_SPECTRUM.version
+        full = time.monotonic() - last_full >= FPV_SPECTRUM_KEYFRAME_S
+        if version == sent_version and not (full and version):
+            continue
+        spec = _FPV_SPECTRUM.spectrum(since=-1 if full or sent_version < 0 else sent_version)
+        if spec["since"] is None:
+            last_full = time.monotonic()
+        sent_version = spec["version"]
+        ws_broadcast({"type": "TELEMETRY_UPDATE", "timestamp": spec["ts"], "source": "esp32", "data": {"fpv_spectrum": spec}})
+
+def _ctrl_on_disconnect() -> None:
+    _esp32_set_disconnected()
+    _CTRL_CMDS.fail_all("disconnected")
+
+_CTRL_LINK = SerialLink(CTRL_DEV, CTRL_BAUD, _ctrl_handle_line, _ctrl_on_connect, _ctrl_on_disconnect, _ctrl_on_idle)
+
+# ---- Controller command pipeline ----
+CTRL_CMD_WINDOW = int(os.environ.get("NDEFENDER_CTRL_CMD_WINDOW") or "4")
+CTRL_CMD_QUEUE_MAX = int(os.environ.get("NDEFENDER_CTRL_CMD_QUEUE_MAX") or "64")
+CTRL_URGENT_CMDS = frozenset({"FPV_HOLD_SET", "FPV_SCAN_STOP"})
+
+class _PendingCmd:
+    __slots__ = ("req_id", "frame", "urgent", "deadline", "t_submit", "fut")
+
+    def __init__(self, req_id: str, frame: bytes, urgent: bool, deadline: float, fut: Future):
+        self.req_id = req_id
+        self.frame = frame
+        self.urgent = urgent
+        self.deadline = deadline
+        self.t_submit = time.monotonic()
+        self.fut = fut
+
+class CommandDispatcher:
+    """
+    Pipelined controller commands. Up to `window` req_ids are in flight on the link at once and
+    the rest wait in FIFO order; urgent ones (hold/stop) skip the queue and the window, and go to
+    the front of the link's write queue. submit() never blocks: it returns a Future resolved with
+    {"ok", "resp", "err"} by the matching cmd_ack, a send failure or the deadline. One timer
+    thread owns every deadline; the deadline covers queueing and the round trip.
+    """
+    def __init__(self, link: SerialLink, window: int = CTRL_CMD_WINDOW, queue_max: int = CTRL_CMD_QUEUE_MAX):
+        self.link = link
+        self.window = max(1, int(window))
+        self.queue_max = max(1, int(queue_max))
+        self._queued: deque = deque()
+        self._inflight: Dict[str, _PendingCmd] = {}
+        self._known: Dict[str, _PendingCmd] = {}  # queued or in flight, by req_id
+        self._deadlines: List[Tuple[float, str]] = []
+        self._cond = threading.Condition()
+        self._timer_started = False
+        self.submitted = 0
+        self.urgent = 0
+        self.acked = 0
+        self.timeouts = 0
+        self.failed = 0
+        self.late_acks = 0
+        self.max_inflight = 0
+        self.rtt_ms_ewma: Optional[float] = None
+
+    def submit(self, cmd_obj: Dict[str, Any], timeout_s: float = 1.0, urgent: Optional[bool] = None) -> Future:
+        fut: Future = Future()
+        req_id = str(cmd_obj.get("req_id") or "")
+        if not req_id:
+            fut.set_result({"ok": False, "resp": None, "err": "missing_req_id"})
+            return fut
+        if not self.link.connected:
+            fut.set_result({"ok": False, "resp": None, "err": "not_connected"})
+            return fut
+        if urgent is None:
+            urgent = str(cmd_obj.get("cmd") or "").upper() in CTRL_URGENT_CMDS
+        frame = (json.dumps(cmd_obj, separators=(",", ":"), ensure_ascii=False) + "\n").encode("utf-8")
+        p = _PendingCmd(req_id, frame, bool(urgent), time.monotonic() + max(0.05, float(timeout_s)), fut)
+        with self._cond:
+            if req_id in self._known:
+                err = "duplicate_req_id"
+            elif len(self._queued) >= self.queue_max and not urgent:
+                err = "queue_full"
+            else:
+                err = None
+                self.submitted += 1
+                self._known[req_id] = p
+                heapq.heappush(self._deadlines, (p.deadline, req_id))
+                if urgent:
+                    self.urgent += 1
+                    done = [self._send_locked(p)]
+                else:
+                    self._queued.append(p)
+                    done = self._pump_locked()
+                if not self._timer_started:
+                    self._timer_started = True
+                    threading.Thread(target=self._timer, daemon=True).start()
+                self._cond.notify_all()
+        if err is not None:
+            fut.set_result({"ok": False, "resp": None, "err": err})
+            return fut
+        self._resolve_all(done)
+        return fut
+
+    def _send_locked(self, p: _PendingCmd) -> Optional[Tuple[_PendingCmd, Dict[str, Any]]]:
+        err = self.link.write_line(p.frame, urgent=p.urgent)
+        if err is not None:
+            self._known.pop(p.req_id, None)
+            self.failed += 1
+            return p, {"ok": False, "resp": None, "err": err}
+        self._inflight[p.req_id] = p
+        if len(self._inflight) > self.max_inflight:
+            self.max_inflight = len(self._inflight)
+        return None
+
+    def _pump_locked(self) -> List[Optional[Tuple[_PendingCmd, Dict[str, Any]]]]:
+        done = []
+        while self._queued and len(self._inflight) < self.window:
+            done.append(self._send_locked(self._queued.popleft()))
+        return done
+
+    @staticmethod
+    def _resolve_all(done: List[Optional[Tuple[_PendingCmd, Dict[str, Any]]]]) -> None:
+        # outside the lock: done-callbacks may send on a WebSocket
+        for d in done:
+            if d is not None:
+                d[0].fut.set_result(d[1])
+
+    def on_ack(self, msg: Dict[str, Any]) -> None:
+        req_id = str(msg.get("req_id") or "")
+        with self._cond:
+            p = self._inflight.pop(req_id, None)
+            if p is None:
+                self.late_acks += 1
+                return
+            self._known.pop(req_id, None)
+            self.acked += 1
+            rtt = (time.monotonic() - p.t_submit) * 1000.0
+            self.rtt_ms_ewma = rtt if self.rtt_ms_ewma is None else self.rtt_ms_ewma + 0.2 * (rtt - self.rtt_ms_ewma)
+            done = self._pump_locked()
+        done.append((p, {"ok": bool(msg.get("ok")), "resp": msg, "err": msg.get("err")}))
+        self._resolve_all(done)
+
+    def fail_all(self, err: str) -> None:
+        with self._cond:
+            if not self._known:
+                return
+            pending = list(self._known.values())
+            self._known.clear()
+            self._inflight.clear()
+            self._queued.clear()
+            self.failed += len(pending)
+        self._resolve_all([(p, {"ok": False, "resp": None, "err": err}) for p in pending])
+
+    def _timer(self) -> None:
+        while not _stop.is_set():
+            done = []
+            with self._cond:
+                now = time.monotonic()
+                while self._deadlines and self._deadlines[0][0] <= now:
+                    deadline, req_id = heapq.heappop(self._deadlines)
+                    p = self._known.get(req_id)
+                    if p is None or p.deadline != deadline:
+                        continue  # already resolved (or a reused req_id)
+                    del self._known[req_id]
+                    if self._inflight.pop(req_id, None) is None:
+                        self._queued.remove(p)
+                    self.timeouts += 1
+                    done.append((p, {"ok": False, "resp": None, "err": "timeout"}))
+                if done:
+                    done.extend(self._pump_locked())
+                else:
+                    self._cond.wait(min(0.5, self._deadlines[0][0] - now) if self._deadlines else 0.5)
+            self._resolve_all(done)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "window": self.window,
+                "inflight": len(self._inflight),
+                "queued": len(self._queued),
+                "max_inflight": self.max_inflight,
+                "submitted": self.submitted,
+                "urgent": self.urgent,
+                "acked": self.acked,
+                "timeouts": self.timeouts,
+                "failed": self.failed,
+                "late_acks": self.late_acks,
+                "rtt_ms_ewma": round(self.rtt_ms_ewma, 2) if self.rtt_ms_ewma is not None else None,
+            }
+
+_CTRL_CMDS = CommandDispatcher(_CTRL_LINK)
+
+def esp32_worker():
+    """
+    Run the controller link (device is auto-stable via /dev/ndefender-esp32 udev symlink).
+    """
+    _CTRL_LINK.run()
+
+def esp32_submit_cmd(cmd_obj: dict, timeout_s: float = 1.0, urgent: Optional[bool] = None) -> Future:
+    """
+    Queue a JSON command for the controller without blocking.
+    The Future resolves to {"ok": bool, "resp": dict|None, "err": str|None}.
+    """
+    if _PROC_ROLE != "serve":
+        return _CTRL_CMDS.submit(cmd_obj, timeout_s, urgent)
+    out: Future = Future()
+
+    def _done(f: Future) -> None:
+        try:
+            out.set_result(f.result())
+        except Exception as e:
+            out.set_result({"ok": False, "resp": None, "err": f"core_unavailable:{e}"})
+
+    _core_call_async("esp32_send_cmd", cmd_obj, timeout_s, urgent).add_done_callback(_done)
+    return out
+
+def esp32_send_cmd(cmd_obj: dict, timeout_s: float = 1.0, urgent: Optional[bool] = None) -> dict:
+    """
+    Send a JSON command to the controller over serial and wait for cmd_ack matching req_id.
+    Returns dict: {"ok": bool, "resp": dict|None, "err": str|None}
+    """
+    if _PROC_ROLE == "serve":
+        try:
+            return _core_call("esp32_send_cmd", cmd_obj, timeout_s, urgent, timeout=float(timeout_s) + 2.0)
+        except Exception as e:
+            return {"ok": False, "resp": None, "err": f"core_unavailable:{e}"}
+    try:
+        return _CTRL_CMDS.submit(cmd_obj, timeout_s, urgent).result(float(timeout_s) + 1.0)
+    except Exception:
+        return {"ok": False, "resp": None, "err": "timeout"}
 
 
 def _play_local_beep(duration_ms: int, freq_hz: int = 880, volume: float = 0.2) -> bool:
@@ -2641,6 +6748,11 @@ def _run_buzzer_test(duration_ms: int, req_id: Optional[str] = None, timeout_s:
     }
 
 def _pick_strongest_vrx_id() -> Optional[int]:
+    if _PROC_ROLE == "serve":
+        try:
+            return _core_call("_pick_strongest_vrx_id")
+        except Exception:
+            return None
     try:
         with _ctrl_lock:
             vrx = list(FPV_STATE.get("vrx") or [])
@@ -2761,7 +6873,7 @@ def build_status_v0() -> Dict[str, Any]:
     })
     return {"ok": True, "ts": now_ts(), "remoteid": remoteid, "gps": gps}
 
-def to_status_snapshot_v1(v0: Dict[str, Any]) -> Dict[str, Any]:
+def to_status_snapshot_v1(v0: Dict[str, Any], persist_settings: bool = True) -> Dict[str, Any]:
     ts_ms = now_ms()
     free_gb, total_gb = get_storage_gb("/")
     remoteid = v0.get("remoteid") or {}
@@ -2777,13 +6889,15 @@ def to_status_snapshot_v1(v0: Dict[str, Any]) -> Dict[str, Any]:
             contacts = contacts + _TRACKER.snapshot_targets()
         except Exception:
             pass
+    contacts = merge_fused_contacts(contacts, snapshot_fused_contacts())
 
     maps_settings = load_settings(MAPS_SETTINGS_FILE, DEFAULT_MAPS_SETTINGS)
     maps_settings = _normalize_maps_settings(maps_settings)
-    try:
-        save_settings(MAPS_SETTINGS_FILE, maps_settings)
-    except Exception:
-        pass
+    if persist_settings:
+        try:
+            save_settings(MAPS_SETTINGS_FILE, maps_settings)
+        except Exception:
+            pass
     snap = {
         "timestamp": ts_ms,
         "overall_ok": bool(v0.get("ok")),
@@ -2800,8 +6914,10 @@ def to_status_snapshot_v1(v0: Dict[str, Any]) -> Dict[str, Any]:
             "audio": load_settings(AUDIO_SETTINGS_FILE, DEFAULT_AUDIO_SETTINGS),
             "maps": maps_settings,
             "alerts": load_settings(ALERTS_SETTINGS_FILE, DEFAULT_ALERTS_SETTINGS),
+            "rf_cfar": load_settings(RF_CFAR_SETTINGS_FILE, DEFAULT_RF_CFAR_SETTINGS),
         },
-        "esp32": (lambda: (CTRL_STATE.copy()) if "CTRL_STATE" in globals() else {"status":"DISCONNECTED","rssi_dbm":None,"uptime_seconds":None})(),
+        "esp32": dict(CTRL_STATE, link=_CTRL_LINK.stats(), commands=_CTRL_CMDS.stats(), telemetry=_CTRL_TELEMETRY.stats(),
+                      spectrum=_FPV_SPECTRUM.stats()),
         "gps": {
             "mode": _to_int(gps.get("mode")) or 0,
             "fix_quality": min(max(_to_int(gps.get("mode")) or 0, 0), 3),
@@ -2833,6 +6949,10 @@ def to_status_snapshot_v1(v0: Dict[str, Any]) -> Dict[str, Any]:
                 "last_error": rid_health.get("last_error"),
             },
             "contacts": _to_int(rid_health.get("contacts")) or 0,
+            "flood_state": rid_health.get("flood_state") or "normal",
+            "flood": rid_health.get("flood"),
+            "ttl": rid_health.get("ttl"),
+            "churn": rid_health.get("churn"),
         },
         "rf_sensor": rf_sensor_status_snapshot(),
         "contacts": contacts,
@@ -2852,14 +6972,220 @@ def to_status_snapshot_v1(v0: Dict[str, Any]) -> Dict[str, Any]:
         "replay": {
             "active": bool(REPLAY_STATE.get("active")),
         },
+        "ingest": dict(_INGEST_QUEUE.stats(), rid_dedupe=_RID_DEDUPER.stats(), datagram=dgram_ingest_snapshot()),
+        "rates": rate_counters_snapshot(_TRACKER),
+        "fusion": dict(_FUSION.stats(), enabled=FUSION_ENABLE),
+        "checkpoint": dict(CHECKPOINT_STATE),
+        "registry": _RID_REGISTRY.stats(),
     }
     return snap
 
 @app.get("/api/v1/status")
 def api_v1_status():
+    if _PROC_ROLE == "serve":
+        shared = _read_shared_snapshot()
+        if shared and isinstance(shared.get("status"), dict):
+            snap = dict(shared["status"])
+            # settings are written by this process; don't serve them a snapshot period late
+            maps_settings = _normalize_maps_settings(load_settings(MAPS_SETTINGS_FILE, DEFAULT_MAPS_SETTINGS))
+            snap["settings"] = {
+                "ui": load_settings(UI_SETTINGS_FILE, DEFAULT_UI_SETTINGS),
+                "audio": load_settings(AUDIO_SETTINGS_FILE, DEFAULT_AUDIO_SETTINGS),
+                "maps": maps_settings,
+                "alerts": load_settings(ALERTS_SETTINGS_FILE, DEFAULT_ALERTS_SETTINGS),
+                "rf_cfar": load_settings(RF_CFAR_SETTINGS_FILE, DEFAULT_RF_CFAR_SETTINGS),
+            }
+            # WS sends happen in this process, not in the core
+            snap["rates"] = dict(snap.get("rates") or {}, ws_send=_RATE_WS_SEND.rates())
+            snap["process"] = {"mode": "split", "snapshot_version": shared.get("version"), "snapshot_ts": shared.get("ts")}
+            return jsonify(snap)
     v0 = build_status_v0()
     return jsonify(to_status_snapshot_v1(v0))
 
+def tracker_changes_since(version: int) -> Dict[str, Any]:
+    if _TRACKER is None:
+        return {"version": 0, "full": True, "upserted": [], "removed": []}
+    return _TRACKER.changes_since(version)
+
+def rid_track(cid: str, since: int, max_points: Optional[int], epsilon_m: float) -> Optional[Dict[str, Any]]:
+    if _TRACKER is None:
+        return None
+    return _TRACKER.track(cid, since, max_points, epsilon_m)
+
+def rid_registry_load(entries: List[Dict[str, Any]]) -> Dict[str, Any]:
+    return load_rid_registry(entries)
+
+def rid_registry_stats() -> Dict[str, Any]:
+    return _RID_REGISTRY.stats()
+
+@app.get("/api/v1/registry")
+def api_registry_get():
+    try:
+        return jsonify({"ok": True, "registry": _core_call("rid_registry_stats")})
+    except Exception as e:
+        return jsonify({"ok": False, "error": str(e)}), 503
+
+@app.post("/api/v1/registry")
+def api_registry_load():
+    # Replace the allow/watch registry: JSON {"entries":[...]} or CSV (list,kind,value[,label])
+    try:
+        entries = parse_rid_registry(request.get_data(cache=False) or b"")
+    except Exception as e:
+        return jsonify({"ok": False, "error": f"invalid registry: {e}"}), 400
+    try:
+        return jsonify({"ok": True, "registry": _core_call("rid_registry_load", entries, timeout=30.0)})
+    except Exception as e:
+        return jsonify({"ok": False, "error": str(e)}), 503
+
+@app.get("/api/v1/rf/band-plan")
+def api_rf_band_plan_get():
+    freq_hz = _float(request.args.get("freq_hz"))
+    try:
+        res = _core_call("rf_band_plan_get", freq_hz, request.args.get("bandwidth_class"))
+    except Exception as e:
+        return jsonify({"ok": False, "error": str(e)}), 503
+    res["ok"] = True
+    return jsonify(res)
+
+@app.post("/api/v1/rf/band-plan")
+def api_rf_band_plan_load():
+    try:
+        bands = parse_rf_band_plan(request.get_json(silent=True))
+    except Exception as e:
+        return jsonify({"ok": False, "error": f"invalid band plan: {e}"}), 400
+    try:
+        return jsonify({"ok": True, "band_plan": _core_call("rf_band_plan_load", bands)})
+    except Exception as e:
+        return jsonify({"ok": False, "error": str(e)}), 503
+
+@app.get("/api/v1/rf/heatmap")
+def api_rf_heatmap():
+    # u16 hit counts, rows = time buckets oldest first, columns = frequency bins
+    try:
+        res = _core_call("rf_heatmap_snapshot")
+    except Exception as e:
+        return jsonify({"ok": False, "error": str(e)}), 503
+    res.update(ok=True, ts=now_ms())
+    return jsonify(res)
+
+@app.get("/api/v1/fpv/spectrum")
+def api_fpv_spectrum():
+    # ?waterfall=1 adds the time x frequency grid
+    try:
+        res = _core_call("fpv_spectrum_snapshot", _parse_bool(request.args.get("waterfall")) is True)
+    except Exception as e:
+        return jsonify({"ok": False, "error": str(e)}), 503
+    res["ok"] = True
+    return jsonify(res)
+
+def rid_estimates() -> Optional[List[Dict[str, Any]]]:
+    return _TRACKER.estimates() if _TRACKER is not None else []
+
+@app.get("/api/v1/contacts/estimates")
+def api_contact_estimates():
+    try:
+        res = _core_call("rid_estimates")
+    except Exception as e:
+        return jsonify({"ok": False, "error": str(e)}), 503
+    if res is None:
+        return jsonify({"ok": False, "error": "kalman disabled (NDEFENDER_RID_KF=0)"}), 503
+    return jsonify({"ok": True, "ts": now_ts(), "estimates": res})
+
+def rid_track_tails() -> Dict[str, List[List[Any]]]:
+    return _TRACKER.track_tails() if _TRACKER is not None else {}
+
+@app.get("/api/v1/contacts/<path:cid>/track")
+def api_contact_track(cid: str):
+    since = _to_int(request.args.get("since")) or 0
+    max_points = _to_int(request.args.get("max_points"))
+    if max_points is not None and max_points < 2:
+        return jsonify({"ok": False, "error": "max_points must be >= 2"}), 400
+    eps = _float(request.args.get("epsilon_m"))
+    try:
+        res = _core_call("rid_track", cid, since, max_points, RID_TRACK_EPSILON_M if eps is None else max(0.0, eps))
+    except Exception as e:
+        return jsonify({"ok": False, "error": str(e)}), 503
+    if res is None:
+        return jsonify({"ok": False, "error": "unknown contact"}), 404
+    res["ok"] = True
+    return jsonify(res)
+
+def timeseries_list() -> Dict[str, Any]:
+    return {"stats": _TIMESERIES.stats(), "series": _TIMESERIES.names()}
+
+def timeseries_query(names: List[str], t0: Optional[int], t1: Optional[int], points: int) -> Dict[str, Any]:
+    return _TIMESERIES.query(names, t0, t1, points)
+
+@app.get("/api/v1/timeseries")
+def api_timeseries():
+    # ?series=a,b&from=&to=&points= ; without series, list what is recorded
+    names = [n.strip() for n in (request.args.get("series") or "").split(",") if n.strip()]
+    try:
+        if not names:
+            res = _core_call("timeseries_list")
+            res.update(ok=True, ts=now_ms())
+            return jsonify(res)
+        points = _to_int(request.args.get("points"))
+        points = TIMESERIES_DEFAULT_POINTS if points is None else points
+        if not 3 <= points <= TIMESERIES_MAX_POINTS:
+            return jsonify({"ok": False, "error": f"points must be 3..{TIMESERIES_MAX_POINTS}"}), 400
+        res = _core_call("timeseries_query", names, _to_int(request.args.get("from")),
+                         _to_int(request.args.get("to")), points)
+    except Exception as e:
+        return jsonify({"ok": False, "error": str(e)}), 503
+    if not res["series"]:
+        return jsonify({"ok": False, "error": "unknown series", "missing": res["missing"]}), 404
+    res.update(ok=True, ts=now_ms())
+    return jsonify(res)
+
+# Comma-separated values match case-insensitively; "none" selects contacts where the field is unset.
+# manufacturer is only known for codes in the site's CTA-2063 table; mfr_code works for every
+# well-formed serial.
+CONTACT_QUERY_FILTERS = ("type", "classification", "manufacturer", "mfr_code")
+
+def filter_contacts(contacts: List[Dict[str, Any]], filters: Dict[str, str]) -> List[Dict[str, Any]]:
+    wanted = []
+    for f in CONTACT_QUERY_FILTERS:
+        raw = filters.get(f)
+        if raw:
+            wanted.append((f, {v.strip().lower() for v in raw.split(",") if v.strip()}))
+    if not wanted:
+        return contacts
+    out = []
+    for c in contacts:
+        for f, vals in wanted:
+            v = c.get(f)
+            if (str(v).lower() if v is not None else "none") not in vals:
+                break
+        else:
+            out.append(c)
+    return out
+
+@app.get("/api/v1/contacts")
+def api_contacts():
+    if _PROC_ROLE == "serve":
+        snap = _read_shared_snapshot() or {}
+        contacts = (snap.get("rf_contacts") or []) + (snap.get("rid_targets") or [])
+        fused = snap.get("fused_contacts") or []
+    else:
+        contacts = snapshot_unknown_rf_contacts()
+        if _TRACKER is not None:
+            contacts = contacts + _TRACKER.snapshot_targets()
+        fused = snapshot_fused_contacts()
+    contacts = merge_fused_contacts(contacts, fused)
+    contacts = filter_contacts(contacts, request.args)
+    return jsonify({"ok": True, "ts": now_ms(), "count": len(contacts), "contacts": contacts})
+
+@app.get("/api/v1/contacts/changes")
+def api_contacts_changes():
+    since = _to_int(request.args.get("since")) or 0
+    try:
+        res = _core_call("tracker_changes_since", since)
+    except Exception as e:
+        return jsonify({"ok": False, "error": str(e)}), 503
+    res["ok"] = True
+    return jsonify(res)
+
 # ---- end API v1 StatusSnapshot ----
 
 # ---- Settings + System API (v1) ----
@@ -3326,6 +7652,30 @@ def api_settings_alerts():
     save_settings(ALERTS_SETTINGS_FILE, settings)
     return jsonify({"ok": True, "settings": settings})
 
+@app.route("/api/v1/settings/rf_cfar", methods=["PUT"])
+def api_settings_rf_cfar():
+    # Applied by the sweep worker within a second of the file changing
+    payload = _json_body()
+    settings = load_settings(RF_CFAR_SETTINGS_FILE, DEFAULT_RF_CFAR_SETTINGS)
+    for key, lo, hi in (("guard_bins", 0, 64), ("train_bins", 1, 256), ("max_detections", 1, 512)):
+        if key in payload:
+            v = _clamp_int(payload.get(key), lo, hi)
+            if v is None:
+                return jsonify({"ok": False, "error": f"invalid_{key}"}), 400
+            settings[key] = v
+    if "pfa" in payload:
+        v = _float(payload.get("pfa"))
+        if v is None or not 0.0 < v < 0.5:
+            return jsonify({"ok": False, "error": "invalid_pfa"}), 400
+        settings["pfa"] = v
+    if "min_snr_db" in payload:
+        v = _float(payload.get("min_snr_db"))
+        if v is None or not -10.0 <= v <= 60.0:
+            return jsonify({"ok": False, "error": "invalid_min_snr_db"}), 400
+        settings["min_snr_db"] = v
+    save_settings(RF_CFAR_SETTINGS_FILE, settings)
+    return jsonify({"ok": True, "settings": settings})
+
 @app.route("/api/v1/system/reboot_ui", methods=["POST"])
 def api_reboot_ui():
     payload = _json_body()
@@ -3663,18 +8013,20 @@ def status():
 def ws_session(ws):
     # On connect: send snapshot as CONTACT_NEW events (contract) and then join broadcast set.
     try:
-        if _TRACKER is not None:
-            for c in _TRACKER.snapshot_targets():
-                # legacy tracker emits RID_CONTACT_*; normalize here
-                ws.send(json.dumps(_ws_env("CONTACT_NEW", "backend", {"contact": c}), separators=(",",":")))
-        for c in snapshot_unknown_rf_contacts():
+        rid_contacts, rf_contacts = _ws_connect_contacts()
+        for c in rid_contacts:
+            # legacy tracker emits RID_CONTACT_*; normalize here
+            ws.send(json.dumps(_ws_env("CONTACT_NEW", "backend", {"contact": c}), separators=(",",":")))
+        for c in rf_contacts:
             ws.send(json.dumps(_ws_env("CONTACT_NEW", "rf_sensor", c), separators=(",",":")))
     except Exception:
         # If snapshot fails, still allow the socket to join broadcasts
-        pass
+        rid_contacts = []
 
     with _ws_clients_lock:
-        _ws_clients.add(ws)
+        for c in rid_contacts:
+            _ws_legacy_contacts.setdefault(c["id"], {k: v for k, v in c.items() if k != "track"})
+        _ws_legacy_clients.add(ws)
 
     try:
         while True:
@@ -3689,7 +8041,9 @@ def ws_session(ws):
             ws.send(json.dumps(_ws_env("COMMAND_ACK", "backend", {"ok": True}), separators=(",",":")))
     finally:
         with _ws_clients_lock:
-            _ws_clients.discard(ws)
+            _ws_legacy_clients.discard(ws)
+            if not _ws_legacy_clients:
+                _ws_legacy_contacts.clear()
 
 
 
@@ -3703,6 +8057,25 @@ def _ws_env(msg_type: str, source: str, data: dict):
         "data": data,
     }
 
+def _ws_send_cmd_ack(ws: Any, req_id: Any, cmd: Any, fut: Future) -> None:
+    try:
+        res = fut.result()
+    except Exception as e:
+        res = {"ok": False, "resp": None, "err": str(e)}
+    ack = {
+        "target": "esp32",
+        "req_id": req_id,
+        "cmd": cmd,
+        "ok": bool(res.get("ok")),
+        "err": res.get("err"),
+    }
+    if isinstance(res.get("resp"), dict):
+        ack["resp"] = res["resp"]
+    try:
+        ws.send(json.dumps(_ws_env("COMMAND_ACK", "backend", ack), separators=(",",":")))
+    except Exception:
+        pass  # client went away
+
 def ws_session_v1(ws):
     # WS v1: snapshot + COMMAND->controller bridge
     # Incoming UI command envelope:
@@ -3710,10 +8083,10 @@ def ws_session_v1(ws):
 
     # snapshot (UI late-join safe)
     try:
-        if _TRACKER is not None:
-            for c in _TRACKER.snapshot_targets():
-                ws.send(json.dumps(_ws_env("CONTACT_NEW", "remote_id", {"contact": c}), separators=(",",":")))
-        for c in snapshot_unknown_rf_contacts():
+        rid_contacts, rf_contacts = _ws_connect_contacts()
+        for c in rid_contacts:
+            ws.send(json.dumps(_ws_env("CONTACT_NEW", "remote_id", {"contact": c}), separators=(",",":")))
+        for c in rf_contacts:
             ws.send(json.dumps(_ws_env("CONTACT_NEW", "rf_sensor", c), separators=(",",":")))
     except Exception:
         pass
@@ -3838,7 +8211,7 @@ def ws_session_v1(ws):
 
                         # also accept flat fields inside data
                         for k, v in data.items():
-                            if k in ("target","req_id","id","cmd","command","args","timeout_s"):
+                            if k in ("target","req_id","id","cmd","command","args","timeout_s","priority"):
                                 continue
                             cmd_obj[k] = v
 
@@ -3861,18 +8234,12 @@ def ws_session_v1(ws):
                             cmd_obj["cmd"] = "VIDEO_SELECT"
                             cmd_obj["sel"] = int(sel)
 
-                        res = esp32_send_cmd(cmd_obj, timeout_s=float(data.get("timeout_s") or 1.5))
-                        ack = {
-                            "target": "esp32",
-                            "req_id": req_id,
-                            "cmd": orig_cmd,
-                            "ok": bool(res.get("ok")),
-                            "err": res.get("err"),
-                        }
-                        if isinstance(res.get("resp"), dict):
-                            ack["resp"] = res["resp"]
-
-                        ws.send(json.dumps(_ws_env("COMMAND_ACK", "backend", ack), separators=(",",":")))
+                        # pipelined: the ack goes out when the controller answers, and this
+                        # socket keeps reading so rapid UI actions don't wait on each other
+                        prio = str(data.get("priority") or "").lower()
+                        fut = esp32_submit_cmd(cmd_obj, timeout_s=float(data.get("timeout_s") or 1.5),
+                                               urgent=True if prio == "urgent" else (False if prio == "normal" else None))
+                        fut.add_done_callback(lambda f, req_id=req_id, orig_cmd=orig_cmd: _ws_send_cmd_ack(ws, req_id, orig_cmd, f))
                         continue
 
             # default: keep tool ACK behavior
@@ -3889,7 +8256,376 @@ def ws_handler(ws):
 @sock.route("/api/v1/ws")
 def ws_handler_v1(ws):
     return ws_session_v1(ws)
-def main():
+# ---- Warm restart checkpoint ----
+# Live RID contacts (+ tracks) and UNKNOWN_RF contacts are checkpointed into SQLite every few
+# seconds, writing only rows changed since the previous checkpoint and only the track points
+# appended since then. On startup they are restored with their learned cadence TTLs shortened
+# by the downtime, before HTTP/WS start serving (in split mode the serving process waits for
+# the core's first snapshot).
+CHECKPOINT_FILE = os.environ.get("NDEFENDER_CHECKPOINT_FILE") or os.path.join(STATE_DIR, "warm_state.sqlite")
+CHECKPOINT_PERIOD_S = float(os.environ.get("NDEFENDER_CHECKPOINT_PERIOD_S") or "2")
+CHECKPOINT_SCHEMA = "2"  # a file with another layout is discarded, it only holds seconds of state
+CHECKPOINT_STATE: Dict[str, Any] = {"enabled": CHECKPOINT_PERIOD_S > 0, "last_write_ts": None, "last_write_ms": None,
+                                    "rows_written": 0, "points_written": 0, "restored_rid": 0, "restored_rf": 0,
+                                    "restore_ms": None, "last_error": None}
+
+class WarmCheckpoint:
+    """Incremental upsert/delete of live contact state into a small WAL-mode SQLite file."""
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        c = self.conn
+        c.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        found = c.execute("SELECT value FROM meta WHERE key='schema'").fetchone()
+        if found is None or found[0] != CHECKPOINT_SCHEMA:
+            for table in ("rid", "rid_pt", "rf"):
+                c.execute(f"DROP TABLE IF EXISTS {table}")
+            c.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('schema', ?)", (CHECKPOINT_SCHEMA,))
+        c.execute("CREATE TABLE IF NOT EXISTS rid (id TEXT PRIMARY KEY, last_ts INTEGER, row TEXT, cadence TEXT)")
+        c.execute("CREATE TABLE IF NOT EXISTS rid_pt (id TEXT, ts INTEGER, lat REAL, lon REAL, alt REAL, "
+                  "PRIMARY KEY (id, ts)) WITHOUT ROWID")
+        c.execute("CREATE TABLE IF NOT EXISTS rf (id TEXT PRIMARY KEY, last_seen_ts INTEGER, contact TEXT, cadence TEXT)")
+        self._lock = threading.Lock()
+        self.rid_version = 0
+        self._track_to: Dict[str, int] = {}  # cid -> ts of the newest track point saved
+
+    def write(self, tracker: "ContactTracker") -> Tuple[int, int]:
+        delta = tracker.checkpoint_delta(self.rid_version, self._track_to)
+        with _ANTS_LOCK:
+            rf_ids = list(_RF_CKPT_DIRTY)
+            _RF_CKPT_DIRTY.clear()
+            rf_rows = [(cid, UNKNOWN_RF_CONTACTS.get(cid), _RF_CADENCE.export(cid)) for cid in rf_ids]
+        rows, points, rewind, trim = [], [], [], []
+        track_to: Dict[str, int] = {}
+        for cid, row, pts, first_ts, learned in delta["upserted"]:
+            rows.append((cid, row[1], json.dumps(row, separators=(",", ":")), json.dumps(learned) if learned else None))
+            if pts:
+                if cid in self._track_to and not delta["full"]:
+                    rewind.append((cid, self._track_to[cid]))
+                points.extend((cid,) + tuple(p) for p in pts)
+                track_to[cid] = pts[-1][0]
+            if first_ts is not None:
+                trim.append((cid, first_ts))  # points the ring has since overwritten
+        with self._lock:
+            c = self.conn
+            c.execute("BEGIN")
+            try:
+                if delta["full"]:
+                    c.execute("DELETE FROM rid")
+                    c.execute("DELETE FROM rid_pt")
+                if delta["removed"]:
+                    gone = [(cid,) for cid in delta["removed"]]
+                    c.executemany("DELETE FROM rid WHERE id=?", gone)
+                    c.executemany("DELETE FROM rid_pt WHERE id=?", gone)
+                if rows:
+                    c.executemany("INSERT OR REPLACE INTO rid (id, last_ts, row, cadence) VALUES (?,?,?,?)", rows)
+                if rewind:
+                    c.executemany("DELETE FROM rid_pt WHERE id=? AND ts>=?", rewind)
+                if trim:
+                    c.executemany("DELETE FROM rid_pt WHERE id=? AND ts<?", trim)
+                if points:
+                    c.executemany("INSERT OR REPLACE INTO rid_pt (id, ts, lat, lon, alt) VALUES (?,?,?,?,?)", points)
+                for cid, rc, learned in rf_rows:
+                    if rc is None:
+                        c.execute("DELETE FROM rf WHERE id=?", (cid,))
+                    else:
+                        c.execute("INSERT OR REPLACE INTO rf (id, last_seen_ts, contact, cadence) VALUES (?,?,?,?)",
+                                  (cid, int(rc.get("last_seen_ts") or 0), json.dumps(rc, separators=(",", ":")),
+                                   json.dumps(learned) if learned else None))
+                c.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('saved_ts', ?)", (str(now_ts()),))
+                c.execute("COMMIT")
+            except Exception:
+                c.execute("ROLLBACK")
+                with _ANTS_LOCK:
+                    _RF_CKPT_DIRTY.update(rf_ids)
+                raise
+            if delta["full"]:
+                self._track_to.clear()
+            for cid in delta["removed"]:
+                self._track_to.pop(cid, None)
+            self._track_to.update(track_to)
+            self.rid_version = delta["version"]
+        return len(rows) + len(delta["removed"]) + len(rf_rows), len(points)
+
+    def restore(self, tracker: "ContactTracker") -> Tuple[int, int]:
+        t = now_ts()
+        with self._lock:
+            tracks: Dict[str, List[Tuple[Any, ...]]] = {}
+            for cid, ts, lat, lon, alt in self.conn.execute("SELECT id, ts, lat, lon, alt FROM rid_pt ORDER BY id, ts"):
+                tracks.setdefault(cid, []).append((ts, lat, lon, alt))
+            rid = [(tuple(json.loads(row)), tracks.get(cid) or [], json.loads(cad) if cad else None)
+                   for cid, row, cad in self.conn.execute("SELECT id, row, cadence FROM rid")]
+            rf = [(json.loads(rc), json.loads(cad) if cad else None)
+                  for rc, cad in self.conn.execute("SELECT contact, cadence FROM rf")]
+        n_rid = tracker.restore(rid, t)
+        n_rf = 0
+        mono = time.monotonic()
+        with _ANTS_LOCK:
+            for rc, learned in rf:
+                cid = rc.get("id")
+                if cid is None or cid in UNKNOWN_RF_CONTACTS:
+                    continue
+                age_s = max(0.0, (t - int(rc.get("last_seen_ts") or 0)) / 1000.0)
+                ttl_s = _RF_CADENCE.seed(cid, mono - age_s, learned)
+                if ttl_s <= age_s:
+                    _RF_CADENCE.forget(cid)
+                    continue
+                rc["stale_after_ms"] = stale_after_ms(ttl_s)
+                UNKNOWN_RF_CONTACTS[cid] = rc
+                _RF_MERGE.attach(cid, _float((rc.get("unknown_rf") or {}).get("center_hz")), 0.0)
+                _RF_EXPIRY.schedule(cid, mono + ttl_s - age_s)
+                n_rf += 1
+        # the restored tracker starts at a fresh version; the next write resyncs the rid tables
+        self.rid_version = 0
+        self._track_to.clear()
+        return n_rid, n_rf
+
+_CHECKPOINT: Optional[WarmCheckpoint] = None
+
+def warm_restore(tracker: "ContactTracker") -> None:
+    global _CHECKPOINT
+    if not CHECKPOINT_STATE["enabled"]:
+        return
+    t0 = time.perf_counter()
+    try:
+        _CHECKPOINT = WarmCheckpoint(CHECKPOINT_FILE)
+        n_rid, n_rf = _CHECKPOINT.restore(tracker)
+    except Exception as e:
+        CHECKPOINT_STATE["last_error"] = f"restore:{e}"
+        print(f"WARM_RESTORE failed: {e}", flush=True)
+        return
+    ms = round((time.perf_counter() - t0) * 1000.0, 1)
+    CHECKPOINT_STATE.update(restored_rid=n_rid, restored_rf=n_rf, restore_ms=ms)
+    print(f"WARM_RESTORE rid={n_rid} rf={n_rf} ms={ms} file={CHECKPOINT_FILE}", flush=True)
+
+def checkpoint_worker(tracker: "ContactTracker") -> None:
+    while not _stop.wait(CHECKPOINT_PERIOD_S):
+        if _CHECKPOINT is None:
+            return
+        t0 = time.perf_counter()
+        try:
+            n, n_pts = _CHECKPOINT.write(tracker)
+            CHECKPOINT_STATE["last_error"] = None
+        except Exception as e:
+            CHECKPOINT_STATE["last_error"] = str(e)
+            continue
+        CHECKPOINT_STATE["last_write_ts"] = now_ts()
+        CHECKPOINT_STATE["last_write_ms"] = round((time.perf_counter() - t0) * 1000.0, 2)
+        CHECKPOINT_STATE["rows_written"] += n
+        CHECKPOINT_STATE["points_written"] += n_pts
+
+# ---- Process split (optional): core (ingest/tracker/serial) + serving (HTTP/WS) ----
+# NDEFENDER_PROCESS_MODE=split: main() becomes a supervisor that forks both processes.
+# The core publishes a versioned snapshot into shared memory and streams WS payloads
+# plus RPC results over one duplex pipe; the serving process never touches the tracker.
+PROCESS_MODE = (os.environ.get("NDEFENDER_PROCESS_MODE") or "single").strip().lower()
+SNAPSHOT_SHM_BYTES = int(os.environ.get("NDEFENDER_SNAPSHOT_SHM_BYTES") or str(4 * 1024 * 1024))
+SNAPSHOT_PERIOD_S = float(os.environ.get("NDEFENDER_SNAPSHOT_PERIOD_S") or "0.25")
+SPLIT_SERVE_WAIT_S = float(os.environ.get("NDEFENDER_SPLIT_SERVE_WAIT_S") or "15")
+CORE_EVENT_QUEUE_MAX = 5000
+_SNAPSHOT_HDR = struct.Struct("<QQ")  # version (odd while writing), body length
+
+_PROC_ROLE = "single"  # "single" | "core" | "serve"
+_PROC_SHM = None
+_PROC_CONN = None
+_PROC_SEND_LOCK = threading.Lock()
+_CORE_EVENTS: deque = deque(maxlen=CORE_EVENT_QUEUE_MAX)
+_CORE_EVENTS_EV = threading.Event()
+_CORE_CALL_LOCK = threading.Lock()
+_CORE_CALL_PENDING: Dict[int, Future] = {}
+_CORE_CALL_SEQ = 0
+_SNAPSHOT_CACHE: Dict[str, Any] = {"version": 0, "data": None}
+PROC_STATE = {"snapshot_version": 0, "snapshot_bytes": 0, "snapshot_error": None, "events_dropped": 0}
+
+def _proc_send(msg: Tuple[Any, ...]) -> None:
+    with _PROC_SEND_LOCK:
+        _PROC_CONN.send(msg)
+
+def _core_emit(payload: str) -> None:
+    # Called from ws_broadcast in the core process; never blocks ingest on the pipe.
+    if len(_CORE_EVENTS) >= CORE_EVENT_QUEUE_MAX:
+        PROC_STATE["events_dropped"] += 1
+    _CORE_EVENTS.append(payload)
+    _CORE_EVENTS_EV.set()
+
+def _core_event_sender_worker() -> None:
+    while not _stop.is_set():
+        _CORE_EVENTS_EV.wait(0.5)
+        _CORE_EVENTS_EV.clear()
+        while _CORE_EVENTS:
+            payload = _CORE_EVENTS.popleft()
+            try:
+                _proc_send(("event", payload))
+            except Exception:
+                _stop.set()
+                return
+
+def _write_shared_snapshot(obj: Dict[str, Any]) -> None:
+    body = json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    buf = _PROC_SHM.buf
+    if len(body) > len(buf) - _SNAPSHOT_HDR.size:
+        PROC_STATE["snapshot_error"] = f"snapshot_too_large:{len(body)}"
+        return
+    version = PROC_STATE["snapshot_version"]
+    # seqlock: odd version while the body is being rewritten
+    _SNAPSHOT_HDR.pack_into(buf, 0, version + 1, len(body))
+    buf[_SNAPSHOT_HDR.size:_SNAPSHOT_HDR.size + len(body)] = body
+    _SNAPSHOT_HDR.pack_into(buf, 0, version + 2, len(body))
+    PROC_STATE["snapshot_version"] = version + 2
+    PROC_STATE["snapshot_bytes"] = len(body)
+    PROC_STATE["snapshot_error"] = None
+
+def _read_shared_snapshot() -> Optional[Dict[str, Any]]:
+    if _PROC_SHM is None:
+        return None
+    buf = _PROC_SHM.buf
+    for _ in range(50):
+        v1, length = _SNAPSHOT_HDR.unpack_from(buf, 0)
+        if v1 == 0:
+            return None
+        if v1 == _SNAPSHOT_CACHE["version"]:
+            return _SNAPSHOT_CACHE["data"]
+        if v1 & 1:
+            time.sleep(0.0005)
+            continue
+        body = bytes(buf[_SNAPSHOT_HDR.size:_SNAPSHOT_HDR.size + length])
+        v2, _ = _SNAPSHOT_HDR.unpack_from(buf, 0)
+        if v1 != v2:
+            continue
+        try:
+            data = json.loads(body.decode("utf-8"))
+        except Exception:
+            continue
+        _SNAPSHOT_CACHE["version"] = v1
+        _SNAPSHOT_CACHE["data"] = data
+        return data
+    return _SNAPSHOT_CACHE["data"]
+
+def _build_core_snapshot() -> Dict[str, Any]:
+    return {
+        "version": PROC_STATE["snapshot_version"] + 2,
+        "ts": now_ms(),
+        "status": to_status_snapshot_v1(build_status_v0(), persist_settings=False),
+        "rid_targets": _TRACKER.snapshot_targets() if _TRACKER is not None else [],
+        "rf_contacts": snapshot_unknown_rf_contacts(),
+        "fused_contacts": snapshot_fused_contacts(),
+    }
+
+def core_snapshot_worker() -> None:
+    while not _stop.is_set():
+        try:
+            _write_shared_snapshot(_build_core_snapshot())
+        except Exception as e:
+            PROC_STATE["snapshot_error"] = str(e)
+        time.sleep(SNAPSHOT_PERIOD_S)
+
+def _core_run_call(call_id: int, name: str, args: Tuple[Any, ...]) -> None:
+    fn = _CORE_CALLABLE.get(name)
+    try:
+        if fn is None:
+            raise KeyError(f"unknown_call:{name}")
+        msg = ("result", call_id, True, fn(*args))
+    except Exception as e:
+        msg = ("result", call_id, False, str(e))
+    try:
+        _proc_send(msg)
+    except Exception:
+        pass
+
+def core_rpc_worker() -> None:
+    while not _stop.is_set():
+        try:
+            if not _PROC_CONN.poll(0.5):
+                continue
+            msg = _PROC_CONN.recv()
+        except (EOFError, OSError):
+            _stop.set()
+            return
+        if isinstance(msg, tuple) and msg and msg[0] == "call":
+            _, call_id, name, args = msg
+            # calls may block (serial round-trips), so keep the pipe reader free
+            threading.Thread(target=_core_run_call, args=(call_id, name, args), daemon=True).start()
+
+def serve_pipe_worker() -> None:
+    while not _stop.is_set():
+        try:
+            if not _PROC_CONN.poll(0.5):
+                continue
+            msg = _PROC_CONN.recv()
+        except (EOFError, OSError):
+            _stop.set()
+            os._exit(3)  # core is gone; let the supervisor restart the pair
+        if not isinstance(msg, tuple) or not msg:
+            continue
+        if msg[0] == "event":
+            _ws_fanout(msg[1])
+        elif msg[0] == "result":
+            _, call_id, ok, value = msg
+            with _CORE_CALL_LOCK:
+                fut = _CORE_CALL_PENDING.pop(call_id, None)
+            if fut is not None:
+                if ok:
+                    fut.set_result(value)
+                else:
+                    fut.set_exception(RuntimeError(value))
+
+def _core_call_async(name: str, *args: Any) -> Future:
+    # Start a whitelisted core function; the Future resolves when the core replies.
+    fut: Future = Future()
+    if _PROC_ROLE != "serve":
+        try:
+            fut.set_result(_CORE_CALLABLE[name](*args))
+        except Exception as e:
+            fut.set_exception(e)
+        return fut
+    global _CORE_CALL_SEQ
+    with _CORE_CALL_LOCK:
+        _CORE_CALL_SEQ += 1
+        call_id = _CORE_CALL_SEQ
+        _CORE_CALL_PENDING[call_id] = fut
+    fut.call_id = call_id  # type: ignore[attr-defined]
+    try:
+        _proc_send(("call", call_id, name, args))
+    except Exception as e:
+        with _CORE_CALL_LOCK:
+            _CORE_CALL_PENDING.pop(call_id, None)
+        fut.set_exception(e)
+    return fut
+
+def _core_call(name: str, *args: Any, timeout: float = 5.0) -> Any:
+    # Run a whitelisted core function; local call unless this is the serving process.
+    if _PROC_ROLE != "serve":
+        return _CORE_CALLABLE[name](*args)
+    fut = _core_call_async(name, *args)
+    try:
+        return fut.result(timeout)
+    except FuturesTimeoutError:
+        with _CORE_CALL_LOCK:
+            _CORE_CALL_PENDING.pop(getattr(fut, "call_id", None), None)
+        raise TimeoutError(f"core_call_timeout:{name}")
+
+def _ws_connect_contacts() -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    # RID contacts carry their recent track so a (re)connecting UI can draw paths immediately
+    if _PROC_ROLE == "serve":
+        snap = _read_shared_snapshot() or {}
+        rid, rf, fused = snap.get("rid_targets") or [], snap.get("rf_contacts") or [], snap.get("fused_contacts") or []
+        try:
+            tails = _core_call("rid_track_tails")
+        except Exception:
+            tails = {}
+    else:
+        rid = _TRACKER.snapshot_targets() if _TRACKER is not None else []
+        rf, fused = snapshot_unknown_rf_contacts(), snapshot_fused_contacts()
+        tails = rid_track_tails()
+    if fused:
+        merged = merge_fused_contacts(rid + rf, fused)
+        rid = [c for c in merged if c.get("type") == "REMOTE_ID"]
+        rf = [c for c in merged if c.get("type") != "REMOTE_ID"]
+    return [dict(c, track=tails.get(c.get("id")) or []) for c in rid], rf
+
+def _init_state_files() -> None:
     os.makedirs(STATE_DIR, exist_ok=True)
     atomic_write_json(REMOTEID_STATE_FILE, {
         "health": {"state":"DISCONNECTED","source":REMOTEID_MODE,"updated_ts":now_ts()},
@@ -3901,10 +8637,18 @@ def main():
         "speed_mps":None,"track_deg":None,"sats":None,"last_ts":0
     })
 
+def start_core_workers() -> ContactTracker:
     tracker = ContactTracker(ttl_s=RID_TTL_S)
-    global _TRACKER
+    global _TRACKER, _CTA2063_TRIE
     _TRACKER = tracker
-    _preload_audio_assets()
+    _CTA2063_TRIE = load_cta2063_table()
+    _load_rid_registry_file()
+    warm_restore(tracker)
+    if _CHECKPOINT is not None:
+        threading.Thread(target=checkpoint_worker, args=(tracker,), daemon=True).start()
+    threading.Thread(target=ingest_worker, args=(tracker,), daemon=True).start()
+    if RID_PREDICT_FPS > 0 and tracker.kalman is not None:
+        threading.Thread(target=rid_predict_worker, args=(tracker,), daemon=True).start()
 
     if REMOTEID_MODE in ("live", "replay"):
         threading.Thread(target=remoteid_live_worker, args=(tracker,), daemon=True).start()
@@ -3920,12 +8664,113 @@ def main():
     else:
         threading.Thread(target=replay_worker, args=(tracker,), daemon=True).start()
         threading.Thread(target=expire_worker, args=(tracker, True), daemon=True).start()
+    _reload_rf_band_plan_file()
+    threading.Thread(target=rf_band_plan_worker, daemon=True).start()
     threading.Thread(target=antsdr_worker, daemon=True).start()
+    if RF_SWEEP_SOCKET:
+        threading.Thread(target=rf_sweep_worker, daemon=True).start()
     threading.Thread(target=unknown_rf_expire_worker, daemon=True).start()
     threading.Thread(target=rfscan_monitor_worker, daemon=True).start()
+    if INGEST_UDP_BIND:
+        threading.Thread(target=udp_ingest_worker, daemon=True).start()
+    if INGEST_UNIX_PATH:
+        threading.Thread(target=unix_ingest_worker, daemon=True).start()
     threading.Thread(target=gpsd_worker, daemon=True).start()
     threading.Thread(target=esp32_worker, daemon=True).start()
+    if FPV_SPECTRUM_WS_HZ > 0:
+        threading.Thread(target=fpv_spectrum_worker, daemon=True).start()
+    threading.Thread(target=timeseries_sampler_worker, args=(tracker,), daemon=True).start()
+    return tracker
+
+def _core_process_main(shm: Any, conn: Any) -> None:
+    global _PROC_ROLE, _PROC_SHM, _PROC_CONN
+    _PROC_ROLE, _PROC_SHM, _PROC_CONN = "core", shm, conn
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    start_core_workers()
+    threading.Thread(target=_core_event_sender_worker, daemon=True).start()
+    threading.Thread(target=core_snapshot_worker, daemon=True).start()
+    core_rpc_worker()
+
+def _serve_process_main(shm: Any, conn: Any) -> None:
+    global _PROC_ROLE, _PROC_SHM, _PROC_CONN
+    _PROC_ROLE, _PROC_SHM, _PROC_CONN = "serve", shm, conn
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    threading.Thread(target=serve_pipe_worker, daemon=True).start()
+    _preload_audio_assets()
+    # the core publishes its first snapshot after the warm restore; don't serve an empty one
+    deadline = time.monotonic() + SPLIT_SERVE_WAIT_S
+    while _read_shared_snapshot() is None and time.monotonic() < deadline and not _stop.is_set():
+        time.sleep(0.05)
     app.run(host="0.0.0.0", port=APP_PORT, debug=False)
 
+def supervise_split() -> None:
+    _init_state_files()
+    ctx = multiprocessing.get_context("fork")
+    shm = shared_memory.SharedMemory(create=True, size=SNAPSHOT_SHM_BYTES)
+    procs: List[Any] = []
+
+    def _shutdown(*_):
+        _stop.set()
+
+    signal.signal(signal.SIGTERM, _shutdown)
+    signal.signal(signal.SIGINT, _shutdown)
+    try:
+        while not _stop.is_set():
+            _SNAPSHOT_HDR.pack_into(shm.buf, 0, 0, 0)  # a restarted core publishes afresh
+            core_conn, serve_conn = ctx.Pipe(duplex=True)
+            core = ctx.Process(target=_core_process_main, args=(shm, core_conn), name="ndefender-core", daemon=True)
+            serve = ctx.Process(target=_serve_process_main, args=(shm, serve_conn), name="ndefender-serve", daemon=True)
+            core.start()
+            serve.start()
+            procs = [core, serve]
+            print(f"SPLIT core_pid={core.pid} serve_pid={serve.pid}", flush=True)
+            while not _stop.is_set() and all(p.is_alive() for p in procs):
+                _stop.wait(0.5)
+            for p in procs:
+                if p.is_alive():
+                    p.terminate()
+            for p in procs:
+                p.join(timeout=5.0)
+                print(f"SPLIT {p.name} exited code={p.exitcode}", flush=True)
+            core_conn.close()
+            serve_conn.close()
+            if not _stop.is_set():
+                time.sleep(2.0)
+    finally:
+        for p in procs:
+            if p.is_alive():
+                p.kill()
+        shm.close()
+        shm.unlink()
+
+def main():
+    if PROCESS_MODE == "split":
+        supervise_split()
+        return
+    _init_state_files()
+    start_core_workers()
+    _preload_audio_assets()
+    app.run(host="0.0.0.0", port=APP_PORT, debug=False)
+
+# Functions the serving process may run in the core (see _core_call)
+_CORE_CALLABLE = {
+    "esp32_send_cmd": esp32_send_cmd,
+    "_pick_strongest_vrx_id": _pick_strongest_vrx_id,
+    "tracker_changes_since": tracker_changes_since,
+    "rid_track": rid_track,
+    "rid_track_tails": rid_track_tails,
+    "rid_estimates": rid_estimates,
+    "rid_registry_load": rid_registry_load,
+    "rid_registry_stats": rid_registry_stats,
+    "rf_band_plan_get": rf_band_plan_get,
+    "rf_band_plan_load": rf_band_plan_load,
+    "rf_heatmap_snapshot": rf_heatmap_snapshot,
+    "fpv_spectrum_snapshot": fpv_spectrum_snapshot,
+    "timeseries_list": timeseries_list,
+    "timeseries_query": timeseries_query,
+}
+
 if __name__ == "__main__":
     main()
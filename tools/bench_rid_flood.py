@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Spoofed-ID flood replay against ContactTracker admission control.
+
+Replays N BasicID messages with random IDs on random MACs, interleaved with a
+small set of real drones that report positions, and reports ingest cost,
+admitted/evicted counts, whether the real drones survived and peak memory.
+
+  tools/bench_rid_flood.py                  # default admission limits
+  tools/bench_rid_flood.py --no-global      # global bucket off: exercise the contact cap
+  tools/bench_rid_flood.py --mem            # peak traced memory instead of timing
+"""
+import argparse, os, random, sys, time, tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+import app  # noqa: E402
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--spoofed", type=int, default=10000)
+    ap.add_argument("--legit", type=int, default=20)
+    ap.add_argument("--legit-every", type=int, default=50, help="replay the real drones every N spoofed messages")
+    ap.add_argument("--no-global", action="store_true", help="disable the global admission bucket")
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--mem", action="store_true", help="trace peak memory (slows the timing several times)")
+    args = ap.parse_args()
+
+    rnd = random.Random(args.seed)
+    t = app.ContactTracker(15)
+    if args.no_global:
+        t._admit_global = app.TokenBucket(1e9, 1e9)
+    legit = [{"basic_id": f"LEGIT{i}", "mac": f"11:00:00:00:00:{i:02x}", "msg_type": "location",
+              "lat": 10 + i * 0.001, "lon": 20.0, "source": "live"} for i in range(args.legit)]
+    for e in legit:
+        t.ingest(e)
+
+    if args.mem:
+        tracemalloc.start()
+    n = 0
+    t0 = time.perf_counter()
+    for i in range(args.spoofed):
+        t.ingest({
+            "basic_id": f"SPOOF{rnd.getrandbits(40):x}",
+            "mac": "%02x:%02x:%02x:%02x:%02x:%02x" % tuple(rnd.getrandbits(8) for _ in range(6)),
+            "msg_type": "basic_id", "source": "live",
+        })
+        n += 1
+        if i % args.legit_every == 0:
+            for e in legit:
+                t.ingest(e)
+                n += 1
+    dt = time.perf_counter() - t0
+    peak = tracemalloc.get_traced_memory()[1] if args.mem else 0
+
+    kept = sum(1 for e in legit if "rid:" + e["basic_id"] in t.contacts)
+    fl = t.flood_stats()
+    print(f"msgs={n} {dt * 1e6 / n:.1f} us/msg contacts={len(t.contacts)} legit_kept={kept}/{len(legit)}"
+          + (f" peak_kib={peak // 1024}" if args.mem else ""))
+    print(f"state={fl['state']} admitted={fl['admitted']} evicted={fl['evicted']} "
+          f"rejected_mac={fl['rejected_mac']} rejected_global={fl['rejected_global']} rejected_capacity={fl['rejected_capacity']}")
+
+
+if __name__ == "__main__":
+    main()
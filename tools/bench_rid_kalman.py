@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+RID Kalman bank benchmark at N contacts, plus a tracking accuracy check.
+
+Times one batched filter step over N fixes, single-fix steps (the replay path)
+and predicting every contact to "now" — with numpy (vector path) and with the
+plain-Python fallback that runs when numpy is not installed.
+
+  tools/bench_rid_kalman.py --contacts 500
+"""
+import argparse, math, os, random, sys, time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+import app  # noqa: E402
+
+
+def make_bank(use_numpy: bool) -> "app.KalmanBank":
+    return app.KalmanBank(use_numpy=use_numpy)
+
+
+def bench(label: str, use_numpy: bool, n: int, rounds: int) -> None:
+    kb = make_bank(use_numpy)
+    kb.step([("c%d" % i, 0.0, 50 + i * 1e-3, 8.0) for i in range(n)])
+    fixes = [[("c%d" % i, 1.0 + r, 50 + i * 1e-3 + r * 1e-5, 8.0 + r * 1e-5) for i in range(n)] for r in range(rounds)]
+    t0 = time.perf_counter()
+    for f in fixes:
+        kb.step(f)
+    batch = (time.perf_counter() - t0) / rounds
+    singles = [("c%d" % (k % n), 100.0 + k * 1e-3, 50 + (k % n) * 1e-3, 8.0) for k in range(5000)]
+    t0 = time.perf_counter()
+    for f in singles:
+        kb.step([f])
+    single = (time.perf_counter() - t0) / len(singles)
+    t0 = time.perf_counter()
+    for _ in range(50):
+        kb.estimate(120.0)
+    est = (time.perf_counter() - t0) / 50
+    assert (kb._a is not None) == use_numpy, "bank ran on the wrong path"
+    print(f"{label:8s} step {n} fixes {batch * 1e3:6.2f} ms ({batch / n * 1e6:.2f} us/fix)   "
+          f"single-fix step {single * 1e6:5.1f} us   estimate {n} {est * 1e3:.2f} ms")
+
+
+def accuracy(use_numpy: bool) -> str:
+    # straight line at 10 m/s, heading 45 deg, 1 Hz fixes with 5 m noise; predict 2 s past the last fix
+    kb = make_bank(use_numpy)
+    lat0, lon0 = 50.0, 8.0
+    kx = 111320 * math.cos(math.radians(lat0))
+    rnd = random.Random(1)
+    s45 = math.sin(math.radians(45))
+    for k in range(30):
+        x = y = 10 * s45 * k
+        kb.step([("a", 1000.0 + k, lat0 + (y + rnd.gauss(0, 5)) / 110540, lon0 + (x + rnd.gauss(0, 5)) / kx)])
+    e = kb.estimate(1031.0)
+    x = y = 10 * s45 * 31
+    err = math.hypot((e["lat"][0] - lat0) * 110540 - y, (e["lon"][0] - lon0) * kx - x)
+    return f"speed {float(e['speed'][0]):.2f} m/s heading {float(e['heading'][0]):.1f} deg sigma {float(e['sigma'][0]):.1f} m 2 s-ahead error {err:.1f} m"
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--contacts", type=int, default=500)
+    ap.add_argument("--rounds", type=int, default=50)
+    args = ap.parse_args()
+    if app.np is not None:
+        bench("numpy", True, args.contacts, args.rounds)
+    else:
+        print("numpy not installed: only the plain-Python path is measured")
+    bench("python", False, args.contacts, args.rounds)
+    print("accuracy:", accuracy(app.np is not None))
+    print("accuracy (python):", accuracy(False))
+
+
+if __name__ == "__main__":
+    main()
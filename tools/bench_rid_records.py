@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Remote ID contact record cost: ingest ns/msg, publish ns per touched contact,
+memory per contact and CONTACT_UPDATE size.
+
+Drives ContactTracker with N contacts for R rounds of one location message each
+(the same shape the live capture produces) and compares the memory of the
+slotted record + snapshot row against a plain per-contact dict of the same fields.
+
+  tools/bench_rid_records.py --contacts 500 --rounds 40
+"""
+import argparse, json, os, sys, time, tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+import app  # noqa: E402
+
+
+def events(n: int, r: int):
+    return [app.normalize_event({
+        "type": "RID", "mac": "aa:bb:cc:00:%02x:%02x" % (i // 256, i % 256), "basic_id": "ID%d" % i,
+        "operator_id": "OP%d" % i, "lat": 1.0 + r * 1e-4, "lon": 2.0, "alt_m": 100.0 + r, "timestamp": time.time(),
+    }, "live") for i in range(n)]
+
+
+def new_tracker(n: int) -> "app.ContactTracker":
+    t = app.ContactTracker(600, max_contacts=n * 4)
+    t._admit = lambda cid, e: (True, [])
+    return t
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--contacts", type=int, default=500)
+    ap.add_argument("--rounds", type=int, default=40)
+    ap.add_argument("--repeat", type=int, default=5, help="report the best of N runs")
+    args = ap.parse_args()
+    n = args.contacts
+
+    best_ing = best_pub = None
+    ev_bytes = ev_count = 0
+    for _ in range(args.repeat):
+        t = new_tracker(n)
+        t.ingest_batch(events(n, 0))
+        batches = [events(n, r) for r in range(1, args.rounds + 1)]
+        ing = pub = 0
+        for b in batches:
+            a = time.perf_counter_ns()
+            out = []
+            with t._lock:
+                for e in b:
+                    out.extend(t._ingest_locked(e))
+            c = time.perf_counter_ns()
+            t.publish()
+            d = time.perf_counter_ns()
+            ing += c - a
+            pub += d - c
+            ev_bytes += sum(len(json.dumps(o["contact"], separators=(",", ":"))) for o in out)
+            ev_count += len(out)
+        msgs = n * args.rounds
+        best_ing = ing / msgs if best_ing is None else min(best_ing, ing / msgs)
+        best_pub = pub / msgs if best_pub is None else min(best_pub, pub / msgs)
+
+    # memory: live records, then + the published rows
+    tracemalloc.start()
+    t2 = new_tracker(n)
+    es = events(n, 0)
+    s0 = tracemalloc.get_traced_memory()[0]
+    with t2._lock:
+        for e in es:
+            t2._ingest_locked(e)
+    s1 = tracemalloc.get_traced_memory()[0]
+    ref = {c: {**{"id": c, "type": "REMOTE_ID", "last_ts": 0}, **{f: getattr(r, f) for f in app.RID_RECORD_FIELDS}}
+           for c, r in t2.contacts.items()}
+    s2 = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del ref
+    # small tuples come from CPython free lists that tracemalloc does not see, so size rows directly
+    snap = t2.publish()
+    row_bytes = sum(sys.getsizeof(snap.rows[c]) for c in snap.rows) + sum(sys.getsizeof(sh) for sh in snap.rows._shards)
+
+    print(f"contacts={n} rounds={args.rounds} (best of {args.repeat})")
+    print(f"ingest            {best_ing:.0f} ns/msg")
+    print(f"publish           {best_pub:.0f} ns per touched contact")
+    print(f"CONTACT_UPDATE    {ev_bytes / max(1, ev_count):.0f} B average contact body")
+    print(f"memory            {(s1 - s0) / n:.0f} B/contact live state (record, track, cadence, expiry)")
+    print(f"                  {row_bytes / n:.0f} B/contact published snapshot row")
+    print(f"reference dict    {(s2 - s1) / n:.0f} B/contact for a plain dict of the same fields")
+
+
+if __name__ == "__main__":
+    main()
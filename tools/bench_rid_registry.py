@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Allow/watch registry lookup cost at 100k entries.
+
+Builds a RidRegistry of --entries serials (every 10th on the watch list) plus
+--prefixes serial-range prefixes, then times classify() for an exact hit, a
+prefix hit and a miss. Finally measures tracker ingest with that registry loaded
+against an empty one.
+
+  tools/bench_rid_registry.py --entries 99000 --prefixes 1000
+"""
+import argparse, os, sys, time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+import app  # noqa: E402
+
+
+def best_us(fn, n: int, rounds: int = 5) -> float:
+    best = float("inf")
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        for _ in range(n):
+            fn()
+        best = min(best, (time.perf_counter() - t0) / n)
+    return best * 1e6
+
+
+def ingest_us(msgs: int) -> float:
+    t = app.ContactTracker(15, max_contacts=1000)
+    evs = [{"basic_id": f"1581F{i:08d}", "mac": f"m{i}", "msg_type": "location", "lat": 1 + i * 1e-5, "lon": 2.0}
+           for i in range(500)]
+    for e in evs:
+        t.ingest(e)
+    t0 = time.perf_counter()
+    for k in range(msgs):
+        e = evs[k % len(evs)]
+        e["lat"] += 1e-7
+        t.ingest(e)
+    return (time.perf_counter() - t0) * 1e6 / msgs
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--entries", type=int, default=99000, help="exact serial entries")
+    ap.add_argument("--prefixes", type=int, default=1000, help="serial prefix entries")
+    ap.add_argument("--lookups", type=int, default=200000)
+    ap.add_argument("--msgs", type=int, default=50000, help="ingest messages for the tracker comparison")
+    args = ap.parse_args()
+
+    ents = [{"list": "watch" if i % 10 == 0 else "allow", "kind": "serial", "value": f"1581F{i:08d}"}
+            for i in range(args.entries)]
+    ents += [{"list": "allow", "kind": "serial", "value": f"1596A{i:04d}", "prefix": True} for i in range(args.prefixes)]
+    probes = (("exact-hit", "1581F00000500"), ("prefix-hit", "1596A0001XYZ"), ("miss", "1748Z99999999"))
+
+    t0 = time.perf_counter()
+    reg = app.RidRegistry(ents, 1)
+    build_ms = (time.perf_counter() - t0) * 1000
+    print(f"entries={len(ents)} build={build_ms:.0f} ms")
+    for name, bid in probes:
+        us = best_us(lambda: reg.classify(bid, ""), args.lookups)
+        print(f"  {name:<10} {str(reg.classify(bid, '')):<22} {us:.2f} us/lookup")
+
+    app.load_rid_registry([], persist=False)
+    empty = ingest_us(args.msgs)
+    app.load_rid_registry(ents, persist=False)
+    loaded = ingest_us(args.msgs)
+    print(f"tracker ingest: empty registry {empty:.1f} us/msg, {len(ents)} entries {loaded:.1f} us/msg")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,375 @@
+#!/usr/bin/env python3
+"""
+Pty-based test double for the FPV controller, plus measurements against it.
+
+Opens a pty pair and symlinks the slave to --dev, so the backend (started here
+with NDEFENDER_CTRL_DEV pointing at it) talks to this process exactly as it
+would to the USB-serial controller: newline-delimited JSON, one cmd_ack per
+command, telemetry lines at --tele-hz.
+
+  rtt       COMMAND -> COMMAND_ACK round trip over the WS for --count PINGs;
+            with --unplug, also pull the device and time reconnect-to-first-ack
+  pipeline  the device takes --ack-delay-ms per command; times a burst of 20,
+            an urgent hold queued behind 10 tunes, and 5 commands queued
+            behind one whose ack is lost (compare --window 1 with the default)
+  telemetry TELEMETRY_UPDATE rate with RSSI jitter, trailing-edge delay of a
+            coalesced change after the line stream pauses, keepalive gap on an
+            unchanged state, lock latency, and DISCONNECTED push on unplug
+  spectrum  receiver 1 sweeps 5300-6000 MHz in 1 MHz steps (scan_report and
+            telemetry lines alternating); WS fpv_spectrum entries and bytes per
+            second, and whether a client seeded from REST and applying the pushes
+            ends up matching the REST view
+
+  tools/ctrl_pty_double.py rtt --count 200
+  tools/ctrl_pty_double.py rtt --unplug --split
+  tools/ctrl_pty_double.py pipeline --ack-delay-ms 20 --window 1
+  tools/ctrl_pty_double.py telemetry --tele-hz 50
+  tools/ctrl_pty_double.py spectrum --tele-hz 50 --seconds 20
+"""
+import argparse, json, os, pty, random, select, statistics, subprocess, sys, threading, time, tty, urllib.request
+
+from simple_websocket import Client
+
+BACKEND_APP = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend", "app.py")
+BASE_URL = "http://127.0.0.1:8000"
+WS_URL = "ws://127.0.0.1:8000/api/v1/ws"
+
+
+class PtyController:
+    """The controller end of a pty: acks every command, streams telemetry until unplugged."""
+    def __init__(self, link: str, tele_hz: float = 10.0, ack_delay_s: float = 0.0, lose: tuple = ()):
+        self.link = link
+        self.tele_hz = tele_hz
+        self.ack_delay_s = ack_delay_s
+        self.lose = frozenset(lose)  # commands the device runs but never acks
+        self.commands = []  # cmd names in the order the device read them
+        self.vrx = {"id": 1, "f": 5800, "r": 120, "lock": 0, "scan": 1}
+        self.jitter = False  # RSSI wobbles by +-2 on one line in five
+        self.sweep = []  # (f, r) steps receiver 1 walks through, one per line
+        self.paused = False
+        self.alive = True
+        self.master, self.slave = pty.openpty()
+        tty.setraw(self.slave)
+        try:
+            os.unlink(link)
+        except FileNotFoundError:
+            pass
+        os.symlink(os.ttyname(self.slave), link)
+        self._wlock = threading.Lock()
+        threading.Thread(target=self._rx, daemon=True).start()
+        if tele_hz > 0:
+            threading.Thread(target=self._telemetry, daemon=True).start()
+
+    def write(self, obj: dict) -> None:
+        with self._wlock:
+            os.write(self.master, (json.dumps(obj) + "\n").encode())
+
+    def _rx(self) -> None:
+        buf = b""
+        while self.alive:
+            r, _, _ = select.select([self.master], [], [], 0.2)
+            if not r:
+                continue
+            try:
+                buf += os.read(self.master, 4096)
+            except OSError:
+                return
+            while b"\n" in buf:
+                line, buf = buf.split(b"\n", 1)
+                try:
+                    cmd = json.loads(line)
+                except ValueError:
+                    continue
+                self.commands.append(cmd.get("cmd"))
+                if self.ack_delay_s:
+                    time.sleep(self.ack_delay_s)  # firmware handles one command at a time
+                if cmd.get("cmd") not in self.lose:
+                    try:
+                        self.write({"type": "cmd_ack", "req_id": cmd.get("req_id"), "ok": True})
+                    except OSError:
+                        return
+
+    def _telemetry(self) -> None:
+        i = 0
+        while self.alive:
+            i += 1
+            v = dict(self.vrx)
+            if self.jitter and i % 5 == 0:
+                v["r"] += random.randint(-2, 2)
+            if self.sweep:
+                v["f"], v["r"] = self.sweep[i % len(self.sweep)]
+                v["r"] += random.randint(-2, 2)
+            if not self.paused:
+                try:
+                    self.send_telemetry(i, v)
+                except OSError:
+                    return
+            time.sleep(1.0 / self.tele_hz)
+
+    def send_telemetry(self, i: int, v: dict) -> None:
+        kind = "scan_report" if self.sweep and i % 2 else "telemetry"
+        self.write({"type": kind, "esp_ms": int(i * 1000 / self.tele_hz), "sel": 1, "ui": {"hold": 0}, "vrx": [v]})
+
+    def unplug(self) -> None:
+        self.alive = False
+        os.unlink(self.link)
+        os.close(self.master)
+        os.close(self.slave)
+
+
+def start_backend(dev: str, split: bool, log: str, env_extra: dict) -> subprocess.Popen:
+    env = dict(os.environ, NDEFENDER_CTRL_DEV=dev, **env_extra)
+    if split:
+        env["NDEFENDER_PROCESS_MODE"] = "split"
+    p = subprocess.Popen([sys.executable, BACKEND_APP], env=env, stdout=open(log, "w"), stderr=subprocess.STDOUT)
+    t_end = time.time() + 20
+    while time.time() < t_end:
+        try:
+            urllib.request.urlopen(BASE_URL + "/api/v1/status", timeout=1).read()
+            return p
+        except OSError:
+            time.sleep(0.2)
+    p.terminate()
+    raise SystemExit(f"backend did not come up, see {log}")
+
+
+def esp32_status() -> dict:
+    return json.loads(urllib.request.urlopen(BASE_URL + "/api/v1/status", timeout=2).read())["esp32"]
+
+
+def ws_connect() -> Client:
+    ws = Client.connect(WS_URL)
+    t_end = time.time() + 0.3
+    while time.time() < t_end:  # drop the connect-time snapshot
+        ws.receive(timeout=0.1)
+    return ws
+
+
+def pct(q: list, p: float) -> float:
+    return q[max(0, int(p * len(q)) - 1)]
+
+
+def ping_rtts(n: int, tag: str) -> tuple:
+    ws = ws_connect()
+    out, fails = [], 0
+    for i in range(n):
+        rid = f"{tag}{i}"
+        t0 = time.perf_counter()
+        ws.send(json.dumps({"type": "COMMAND", "data": {"target": "esp32", "cmd": "PING", "req_id": rid, "timeout_s": 1.0}}))
+        while True:
+            m = ws.receive(timeout=3)
+            if m is None:
+                fails += 1
+                break
+            if "COMMAND_ACK" in m and rid in m:
+                if json.loads(m)["data"].get("ok"):
+                    out.append((time.perf_counter() - t0) * 1000)
+                else:
+                    fails += 1
+                break
+    ws.close()
+    return out, fails
+
+
+def run_rtt(args: argparse.Namespace, dev: PtyController) -> PtyController:
+    out, fails = ping_rtts(args.count, "p")
+    q = sorted(out)
+    if q:
+        print(f"rtt n={len(q)} fail={fails} p50={statistics.median(q):.2f} ms p95={pct(q, .95):.2f} ms "
+              f"p99={pct(q, .99):.2f} ms max={q[-1]:.2f} ms")
+    else:
+        print(f"rtt: no acks ({fails} failed)")
+    if args.unplug:
+        dev.unplug()
+        time.sleep(2.0)
+        dev = PtyController(args.dev, args.tele_hz)
+        t0 = time.time()
+        while time.time() - t0 < 30:
+            out, _ = ping_rtts(1, f"r{time.time()}")
+            if out:
+                break
+        print(f"reconnect-to-first-ack {time.time() - t0:.2f} s")
+        link = esp32_status().get("link") or {}
+        print("link", {k: link.get(k) for k in ("connected", "connects", "disconnects", "rx", "tx")})
+    return dev
+
+
+def burst(ws: Client, cmds: list, tag: str) -> dict:
+    """Send cmds back to back; req_id -> (ms from the first send to its ack, ok)."""
+    t0 = time.perf_counter()
+    for i, c in enumerate(cmds):
+        ws.send(json.dumps({"type": "COMMAND", "data": {"target": "esp32", "cmd": c, "req_id": f"{tag}{i}", "timeout_s": 1.5}}))
+    got = {}
+    while len(got) < len(cmds):
+        m = ws.receive(timeout=10)
+        if m is None:
+            break
+        if "COMMAND_ACK" in m:
+            d = json.loads(m)["data"]
+            if str(d.get("req_id", "")).startswith(tag):
+                got[d["req_id"]] = ((time.perf_counter() - t0) * 1000, d.get("ok"))
+    return got
+
+
+def run_pipeline(args: argparse.Namespace, dev: PtyController) -> PtyController:
+    ws = ws_connect()
+    g = burst(ws, ["VIDEO_SELECT"] * 20, "b")
+    ok = sum(1 for v in g.values() if v[1])
+    print(f"window={args.window or 'default'} device {args.ack_delay_ms:.0f} ms/cmd: burst of 20 -> acks={len(g)} ok={ok} "
+          f"first={min(v[0] for v in g.values()):.1f} ms last={max(v[0] for v in g.values()):.1f} ms")
+    dev.commands.clear()
+    g = burst(ws, ["FPV_TUNE_FREQ"] * 10 + ["FPV_HOLD_SET"], "u")
+    order = dev.commands.index("FPV_HOLD_SET") if "FPV_HOLD_SET" in dev.commands else -1
+    print(f"hold behind 10 tunes: hold ack {g['u10'][0]:.1f} ms (device saw it {order + 1}/{len(dev.commands)}), "
+          f"last tune {max(v[0] for k, v in g.items() if k != 'u10'):.1f} ms")
+    g = burst(ws, ["FPV_UNLOCK"] + ["VIDEO_SELECT"] * 5, "l")
+    rest = [v for k, v in g.items() if k != "l0"]
+    print(f"lost ack: 5 followers done at {max(v[0] for v in rest):.1f} ms (ok={sum(1 for v in rest if v[1])}), "
+          f"lost one failed at {g['l0'][0]:.1f} ms")
+    ws.close()
+    time.sleep(0.2)
+    print("commands", esp32_status().get("commands"))
+    return dev
+
+
+def next_update(ws: Client, timeout: float, pred=None) -> tuple:
+    """(perf_counter, data) of the first controller TELEMETRY_UPDATE matching pred, or (None, None)."""
+    t_end = time.perf_counter() + timeout
+    while time.perf_counter() < t_end:
+        m = ws.receive(timeout=max(0.01, t_end - time.perf_counter()))
+        if not m or "TELEMETRY_UPDATE" not in m:
+            continue
+        d = json.loads(m)["data"]
+        if "fpv" in d and (pred is None or pred(d)):
+            return time.perf_counter(), d
+    return None, None
+
+
+def run_telemetry(args: argparse.Namespace, dev: PtyController) -> PtyController:
+    ws = ws_connect()
+    dev.jitter = True
+    n, t_end = 0, time.perf_counter() + args.seconds
+    while next_update(ws, t_end - time.perf_counter())[0] is not None:
+        n += 1
+    print(f"input {args.tele_hz:.0f} lines/s with RSSI jitter: {n / args.seconds:.1f} TELEMETRY_UPDATE/s")
+
+    dev.jitter = False
+    next_update(ws, 1.0)
+    dev.paused = True
+    time.sleep(0.5)
+    next_update(ws, 0.05)
+    dev.send_telemetry(0, dict(dev.vrx, r=125))  # goes out at once (slot open) ...
+    t0 = time.perf_counter()
+    time.sleep(0.01)
+    dev.send_telemetry(0, dict(dev.vrx, r=130))  # ... this one is coalesced, then the stream pauses
+    t1, _ = next_update(ws, 3.0, lambda d: d["fpv"].get("rssi_raw") == 130)
+    print(f"coalesced change with no further lines: delivered after {(t1 - t0) * 1000:.0f} ms" if t1 else
+          "coalesced change with no further lines: not delivered within 3 s")
+    dev.vrx["r"] = 130
+    dev.paused = False
+
+    next_update(ws, 1.0)
+    gaps, last, t_end = [], time.perf_counter(), time.perf_counter() + args.seconds
+    while True:
+        t, _ = next_update(ws, t_end - time.perf_counter())
+        if t is None:
+            break
+        gaps.append(t - last)
+        last = t
+    print(f"unchanged state: {len(gaps)} updates in {args.seconds:.0f} s, max gap {max(gaps, default=0):.2f} s")
+
+    t0 = time.perf_counter()
+    dev.vrx.update(lock=1, scan=0)
+    t, _ = next_update(ws, 3.0, lambda d: d["fpv"].get("locked_channels"))
+    print(f"lock -> WS {(t - t0) * 1000:.1f} ms" if t else "lock never reached the WS")
+    print("telemetry", esp32_status().get("telemetry"))
+
+    t0 = time.perf_counter()
+    dev.unplug()
+    t, d = next_update(ws, 5.0, lambda d: d["esp32"].get("status") == "DISCONNECTED")
+    print(f"unplug -> DISCONNECTED on the WS {(t - t0) * 1000:.1f} ms" if t else "DISCONNECTED never reached the WS")
+    ws.close()
+    return dev
+
+
+def run_spectrum(args: argparse.Namespace, dev: PtyController) -> PtyController:
+    ws = ws_connect()
+    # seed from REST like a connecting UI, then apply the pushes: freq -> current
+    rest = json.loads(urllib.request.urlopen(BASE_URL + "/api/v1/fpv/spectrum", timeout=5).read())
+    have, version = {b[0]: b[1] for b in rest["bins"]}, rest["version"]
+    msgs = keyframes = entries = nbytes = skipped = 0
+    t_end = time.perf_counter() + args.seconds
+    while True:
+        left = t_end - time.perf_counter()
+        if left <= 0 and not dev.paused:
+            dev.paused = True  # stop the sweep, then take the last pushes
+            t_end = time.perf_counter() + 1.5
+            continue
+        if left <= 0:
+            break
+        m = ws.receive(timeout=left)
+        if not m or "fpv_spectrum" not in m:
+            continue
+        spec = json.loads(m)["data"]["fpv_spectrum"]
+        msgs += 1
+        nbytes += len(m)
+        entries += len(spec["bins"])
+        since = spec.get("since")
+        if since is None:
+            keyframes += 1
+            have = {}
+        elif since > version:
+            skipped += 1
+            continue
+        have.update((b[0], b[1]) for b in spec["bins"])
+        version = spec["version"]
+    ws.close()
+    rest = json.loads(urllib.request.urlopen(BASE_URL + "/api/v1/fpv/spectrum", timeout=5).read())
+    want = {b[0]: b[1] for b in rest["bins"]}
+    wrong = sum(1 for f, r in want.items() if have.get(f) != r)
+    secs = args.seconds + 1.5
+    print(f"{args.tele_hz:.0f} lines/s sweeping {len(dev.sweep)} bins: {msgs / secs:.1f} pushes/s "
+          f"({keyframes} keyframes), {entries / secs:.0f} entries/s, {nbytes / secs / 1024:.1f} KiB/s")
+    print(f"client view vs REST: {len(want)} live bins, {wrong} differ, {skipped} deltas skipped")
+    return dev
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("mode", choices=("rtt", "pipeline", "telemetry", "spectrum"))
+    ap.add_argument("--dev", default="/tmp/ndefender-ctrl-pty", help="symlink handed to the backend as NDEFENDER_CTRL_DEV")
+    ap.add_argument("--split", action="store_true", help="run the backend with NDEFENDER_PROCESS_MODE=split")
+    ap.add_argument("--log", default="/tmp/ndefender-ctrl-pty.log", help="backend stdout/stderr")
+    ap.add_argument("--tele-hz", type=float, default=10.0, help="controller telemetry lines per second")
+    ap.add_argument("--count", type=int, default=200, help="rtt: PING commands")
+    ap.add_argument("--unplug", action="store_true", help="rtt: also measure reconnect after the device vanishes")
+    ap.add_argument("--ack-delay-ms", type=float, default=20.0, help="pipeline: device time per command")
+    ap.add_argument("--window", type=int, default=0, help="pipeline: NDEFENDER_CTRL_CMD_WINDOW (0 = backend default)")
+    ap.add_argument("--seconds", type=float, default=6.0, help="telemetry/spectrum: length of each measuring window")
+    args = ap.parse_args()
+
+    env = {}
+    if args.mode == "pipeline":
+        dev = PtyController(args.dev, args.tele_hz, args.ack_delay_ms / 1000.0, lose=("FPV_UNLOCK",))
+        if args.window:
+            env["NDEFENDER_CTRL_CMD_WINDOW"] = str(args.window)
+    else:
+        dev = PtyController(args.dev, args.tele_hz)
+    if args.mode == "spectrum":
+        carriers = (5658, 5732, 5806, 5880)
+        dev.sweep = [(f, 180 if f in carriers else 60) for f in range(5300, 6001)]
+    p = start_backend(args.dev, args.split, args.log, env)
+    try:
+        time.sleep(1.0)  # let the link open the pty
+        dev = {"rtt": run_rtt, "pipeline": run_pipeline, "telemetry": run_telemetry, "spectrum": run_spectrum}[args.mode](args, dev)
+    finally:
+        p.terminate()
+        p.wait(10)
+        try:
+            os.unlink(args.dev)
+        except OSError:
+            pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Load generator for the backend's datagram sensor ingest (UDP / Unix).
+
+Sends Remote ID location records and/or RF_CONTACT_* events at a fixed rate,
+several newline-separated objects per datagram, then reports what the backend
+accepted.
+
+  # against a running backend (reads /api/v1/status for the ingest counters)
+  tools/dgram_loadgen.py --udp 127.0.0.1:9750 --rate 20000 --seconds 5
+  tools/dgram_loadgen.py --unix /run/ndefender/ingest.sock --kind mix
+
+  # self-contained: start the listener + ingest stage in this process
+  tools/dgram_loadgen.py --inproc --rate 20000 --seconds 2
+"""
+import argparse, json, os, random, socket, sys, threading, time, urllib.request
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend")
+
+
+def make_event(kind: str, i: int, contacts: int) -> dict:
+    n = i % contacts
+    if kind == "rf" or (kind == "mix" and i % 4 == 0):
+        return {
+            "type": "RF_CONTACT_UPDATE", "id": f"lg{n}",
+            "freq_hz": 2_400_000_000 + n * 1_000_000, "bandwidth_hz": 1_000_000,
+            "snr_db": 10 + random.random() * 10, "ts_ms": int(time.time() * 1000),
+        }
+    return {
+        "source": "udp", "msg_type": "location", "basic_id": f"LOADGEN{n:05d}",
+        "msg_counter": (i // contacts) % 256,
+        "lat": 12.9 + n * 1e-4 + i * 1e-7, "lon": 77.5 + n * 1e-4, "alt_m": 100.0 + (i % 50),
+    }
+
+
+def fetch_ingest(url: str) -> dict:
+    try:
+        with urllib.request.urlopen(url, timeout=2) as r:
+            snap = json.loads(r.read())
+    except Exception as e:
+        return {"error": str(e)}
+    return (snap.get("remote_id") or {}).get("ingest") or snap.get("ingest") or {}
+
+
+def summarize(ingest: dict) -> dict:
+    out = {k: ingest.get(k) for k in ("depth", "max_depth", "enqueued", "processed", "dropped_total", "errors_total")}
+    out["senders"] = {
+        k: {kk: v.get(kk) for kk in ("datagrams", "events", "bad", "events_per_s")}
+        for k, v in ((ingest.get("datagram") or {}).get("senders") or {}).items()
+    }
+    return out
+
+
+def start_inproc(args: argparse.Namespace):
+    if args.unix:
+        os.environ["NDEFENDER_INGEST_UNIX_PATH"] = args.unix
+    else:
+        os.environ["NDEFENDER_INGEST_UDP_BIND"] = args.udp
+    sys.path.insert(0, BACKEND_DIR)
+    import app
+    app.ws_broadcast = lambda obj: None
+    tracker = app.ContactTracker(15)
+    app._TRACKER = tracker
+    threading.Thread(target=app.ingest_worker, args=(tracker,), daemon=True).start()
+    threading.Thread(target=app.unix_ingest_worker if args.unix else app.udp_ingest_worker, daemon=True).start()
+    time.sleep(0.3)
+    return app, tracker
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--udp", default="127.0.0.1:9750", help="UDP target host:port")
+    ap.add_argument("--unix", default="", help="Unix datagram socket path (overrides --udp)")
+    ap.add_argument("--rate", type=float, default=20000.0, help="events per second")
+    ap.add_argument("--seconds", type=float, default=2.0)
+    ap.add_argument("--per-datagram", type=int, default=20, help="JSON objects per datagram")
+    ap.add_argument("--contacts", type=int, default=500, help="distinct emitters to cycle through")
+    ap.add_argument("--kind", choices=("rid", "rf", "mix"), default="rid")
+    ap.add_argument("--status-url", default="http://127.0.0.1:8000/api/v1/status")
+    ap.add_argument("--inproc", action="store_true", help="run the listener in this process instead")
+    args = ap.parse_args()
+
+    app = tracker = None
+    if args.inproc:
+        app, tracker = start_inproc(args)
+    before = None if args.inproc else fetch_ingest(args.status_url)
+
+    if args.unix:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        target = args.unix
+    else:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        host, _, port = args.udp.rpartition(":")
+        target = (host or "127.0.0.1", int(port))
+
+    total = int(args.rate * args.seconds)
+    per = max(1, args.per_datagram)
+    sent = send_err = i = 0
+    t0 = time.perf_counter()
+    while i < total:
+        lines = "\n".join(json.dumps(make_event(args.kind, i + j, args.contacts)) for j in range(min(per, total - i)))
+        try:
+            sock.sendto(lines.encode(), target)
+            sent += min(per, total - i)
+        except (BlockingIOError, ConnectionRefusedError, OSError):
+            send_err += 1
+        i += per
+        ahead = i / args.rate - (time.perf_counter() - t0)
+        if ahead > 0.002:
+            time.sleep(ahead)
+    elapsed = time.perf_counter() - t0
+    time.sleep(1.0)
+
+    print(f"sent events={sent} in {elapsed:.2f}s ({sent / elapsed:.0f}/s) per_datagram={per} send_errors={send_err}")
+    if args.inproc:
+        print("ingest", summarize(dict(app._INGEST_QUEUE.stats(), datagram=app.dgram_ingest_snapshot())))
+        print("tracker", {k: v for k, v in tracker.stats().items() if k in ("targets", "msgs_60s")})
+    else:
+        print("before", summarize(before))
+        print("after ", summarize(fetch_ingest(args.status_url)))
+
+
+if __name__ == "__main__":
+    main()
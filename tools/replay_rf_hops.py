@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Replay synthetic frequency-hopping sequences through the UNKNOWN_RF path.
+
+Each scenario feeds RF_CONTACT_* events to _handle_antsdr_event on a simulated
+monotonic clock (no sleeping) and reports what the hop clusterer made of them:
+
+  hoppers    a 2.4 GHz emitter at 50 hops/s and a 915 MHz one at 25 hops/s, next
+             to a stationary 2.437 GHz carrier and a 5.8 GHz video carrier
+             -> one hopping contact per emitter, carriers left alone
+  no-snr     the 2.4 GHz hopper plus detections that carry no SNR
+             -> the SNR-less detections are never absorbed
+  off-cadence  the 2.4 GHz hopper stops; sporadic detections with a matching SNR
+             keep arriving every ~0.7 s -> not absorbed into the hopper's cluster
+  moving     a hopper spends 10 s on 2402-2420 MHz, then moves to 2440-2480 MHz
+             -> the reported span follows it instead of only growing
+
+  tools/replay_rf_hops.py               # all scenarios
+  tools/replay_rf_hops.py moving --seed 3
+"""
+import argparse, collections, os, random, sys, time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+import app  # noqa: E402
+
+
+class SimClock:
+    """Stands in for the time module inside app: monotonic()/time() follow `now`."""
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def time(self) -> float:
+        return 1.7e9 + self.now
+
+    def __getattr__(self, k):
+        return getattr(time, k)
+
+
+def hopper(evs, t0, t1, f0, step, channels, rate_hz, snr, dwell_frac=0.9):
+    t = t0
+    while t < t1:
+        f = f0 + step * random.randrange(channels)
+        evs.append((t, "RF_CONTACT_NEW", f, snr + random.gauss(0, 1.5)))
+        evs.append((t + dwell_frac / rate_hz, "RF_CONTACT_LOST", f, None))
+        t += 1.0 / rate_hz
+
+
+def carriers(evs, t1):
+    t = 0.0
+    while t < t1:
+        evs.append((t, "RF_CONTACT_UPDATE", 2437.1e6, 19.0))
+        evs.append((t + 0.1, "RF_CONTACT_UPDATE", 5800e6, 25.0))
+        t += 0.2
+
+
+def scenario(name):
+    evs = []
+    if name == "hoppers":
+        hopper(evs, 0.0, 30.0, 2402e6, 2e6, 40, 50.0, 20.0)
+        hopper(evs, 0.005, 30.0, 903e6, 0.4e6, 50, 25.0, 6.0)
+        carriers(evs, 30.0)
+    elif name == "no-snr":
+        hopper(evs, 0.0, 30.0, 2402e6, 2e6, 40, 50.0, 20.0)
+        t = 0.013
+        while t < 30.0:
+            f = 2403e6 + 2e6 * random.randrange(40)
+            evs.append((t, "RF_CONTACT_NEW", f, None))
+            evs.append((t + 0.01, "RF_CONTACT_LOST", f, None))
+            t += 0.3
+    elif name == "off-cadence":
+        hopper(evs, 0.0, 10.0, 2402e6, 2e6, 40, 50.0, 20.0)
+        t = 10.5
+        while t < 30.0:
+            f = 2403e6 + 2e6 * random.randrange(40)
+            evs.append((t, "RF_CONTACT_NEW", f, 20.0 + random.gauss(0, 1.0)))
+            evs.append((t + 0.01, "RF_CONTACT_LOST", f, None))
+            t += random.uniform(0.5, 0.9)
+    elif name == "moving":
+        hopper(evs, 0.0, 10.0, 2402e6, 1e6, 18, 50.0, 20.0)
+        hopper(evs, 10.0, 20.0, 2440e6, 1e6, 40, 50.0, 20.0)
+    evs.sort(key=lambda e: e[0])
+    return evs
+
+
+def run(name, clock, seed):
+    random.seed(seed)
+    base = clock.now + 100.0  # time only moves forward across scenarios
+    app._HOP = app.HopClusterer()
+    app._RF_MERGE = app.RfMergeIndex()
+    app._RF_EXPIRY = app.ExpiryWheel()
+    app._RF_CADENCE = app.CadenceTtl(7, 2, 30)
+    app._RF_CHURN = app.ChurnStats()
+    app.UNKNOWN_RF_CONTACTS.clear()
+    sent = collections.Counter()
+    app.ws_broadcast = lambda ev: sent.update([ev["type"]])
+    app.fusion_observe = lambda *a, **k: None
+    app.fusion_drop = lambda *a, **k: None
+
+    evs = scenario(name)
+    absorbed = []  # (time, had snr) of every detection the clusterer absorbed
+    purge_t = 0.0
+    t_start = time.perf_counter()
+    for et, kind, f, snr in evs:
+        clock.now = base + et
+        before = app._HOP.absorbed_total
+        app._handle_antsdr_event({"type": kind, "id": f"rf:{int(f)}", "ts_ms": int(clock.time() * 1000),
+                                  "data": {"center_hz": f, "snr_db": snr}})
+        if app._HOP.absorbed_total > before:
+            absorbed.append((et, snr is not None))
+        if et - purge_t >= 0.5:
+            app._purge_unknown_rf_contacts()
+            purge_t = et
+    us = (time.perf_counter() - t_start) * 1e6 / max(1, len(evs))
+
+    hops = [c for c in app.UNKNOWN_RF_CONTACTS.values() if c["unknown_rf"].get("hopping")]
+    plain = [c for c in app.UNKNOWN_RF_CONTACTS.values() if not c["unknown_rf"].get("hopping")]
+    print(f"{name}: events={len(evs)} broadcasts={sum(sent.values())} {dict(sent)} {us:.1f} us/event")
+    print(f"  stats {app._HOP.stats()}")
+    print(f"  live: {len(hops)} hopping, {len(plain)} plain ({', '.join(sorted(c['id'] for c in plain)[:6])})")
+    for c in hops:
+        u = c["unknown_rf"]
+        print(f"    {c['id']}: span {u['hop_lo_hz'] / 1e6:.0f}-{u['hop_hi_hz'] / 1e6:.0f} MHz "
+              f"channels={u['hop_channels']} rate={u['hop_rate_hz']}/s interval={u.get('hop_interval_ms')} ms "
+              f"snr={u['snr_db']}")
+    if name == "no-snr":
+        print(f"  SNR-less detections absorbed: {sum(1 for _, had_snr in absorbed if not had_snr)}")
+    if name == "off-cadence":
+        late = sum(1 for et, kind, *_ in evs if et >= 10.5 and kind == "RF_CONTACT_NEW")
+        print(f"  sporadic detections after the hopper stopped: {late}, "
+              f"absorbed: {sum(1 for et, _ in absorbed if et >= 10.5)}")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("scenarios", nargs="*", default=["hoppers", "no-snr", "off-cadence", "moving"])
+    ap.add_argument("--seed", type=int, default=7)
+    args = ap.parse_args()
+    clock = SimClock()
+    app.time = clock
+    for name in args.scenarios:
+        run(name, clock, args.seed)
+
+
+if __name__ == "__main__":
+    main()
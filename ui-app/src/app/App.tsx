@@ -160,7 +160,8 @@ const mapIncomingContact = (incoming: any, envelope?: any) => {
   const firstSeen = coerceMs(payload.first_seen_ts) ?? lastSeen;
   const source = normalizeSource(payload.source ?? envelope?.source);
 
-  if (payload.type === 'UNKNOWN_RF' || payload.unknown_rf) {
+  // a fused contact is typed after its primary member and may also carry an unknown_rf block
+  if (payload.type === 'UNKNOWN_RF' || (!payload.type && payload.unknown_rf)) {
     return {
       id: payload.id ?? `rf:${payload.unknown_rf?.center_hz ?? 'unknown'}`,
       type: 'UNKNOWN_RF',